@@ -4,11 +4,24 @@ from flask_jwt_extended import JWTManager
 from flask_limiter import RateLimitExceeded
 from .auth.models import TokenBlocklist
 from dotenv import load_dotenv
-from sqlalchemy import text
 
-from .config import DevConfig, ProdConfig, TestConfig
+from .config import config_for_env
 from .extensions import db, migrate, jwt, cors, limiter
 from .common.errors import register_error_handlers
+from .common.db import engine_options, register_pipeline_capture, register_pool_liveness
+from .common.routing import init_replicas
+from .common.compression import init_compression
+from .common.health import HealthMonitor, register_health_routes
+from .audit.writer import init_audit
+from .auth.keys import init_keyring
+from .auth.breached import init_breached_passwords
+from .common.idempotency import init_idempotency
+from .notes.cache import init_note_cache
+from .notes.events import init_note_events
+from .jobs.queue import init_jobs
+from .common.mailer import init_mailer
+from .profiling.profiler import init_profiling
+from .attachments.blobs import init_blob_store
 from .common.logging import setup_json_logging, register_request_logging
 
 
@@ -20,21 +33,32 @@ def create_app():
 
     # Choix config selon env
     env = os.getenv("APP_ENV") or os.getenv("FLASK_ENV", "development")
-    if env in ("test", "testing"):
-        app.config.from_object(TestConfig)
-    elif env == "production":
-        app.config.from_object(ProdConfig)
-    else:
-        app.config.from_object(DevConfig)
+    app.config.from_object(config_for_env(env))
 
     
     # Init extensions
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
     db.init_app(app)
+    with app.app_context():
+        register_pool_liveness(db.engine, app.config)
+        register_pipeline_capture(db.engine)
+    init_replicas(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    init_keyring(app)  # RS256/EdDSA + /.well-known/jwks.json si JWT_KEYS_DIR
+    init_breached_passwords(app)  # mmap ouvert avant le fork (preload): partagé par les workers
 
     setup_json_logging(app)
     register_request_logging(app)
+    init_compression(app)
+    init_audit(app)
+    init_idempotency(app)
+    init_note_cache(app)
+    init_note_events(app)
+    init_mailer(app)
+    init_jobs(app)
+    init_blob_store(app)
+    init_profiling(app)  # no-op si PROFILING_ENABLED est faux
 
     # --- CORS: autoriser Authorization header ---
     cors.init_app(app, resources={
@@ -56,6 +80,12 @@ def create_app():
     from .users import models as users_models  # noqa: F401
     from .notes import models as notes_models  # noqa: F401
     from .auth import models as auth_models    # noqa: F401
+    from .audit import models as audit_models  # noqa: F401
+    from .attachments import models as attachments_models  # noqa: F401
+    # Idem pour les jobs: l'import enregistre les handlers (@job)
+    from .auth import jobs as auth_jobs        # noqa: F401
+    from .attachments import jobs as attachments_jobs  # noqa: F401
+    from .users import deletion as users_deletion      # noqa: F401
 
     # Enregistrer les handlers d'erreurs JSON uniformes (ValidationError, ApiError, HTTPException, Exception)
     register_error_handlers(app)
@@ -65,12 +95,12 @@ def create_app():
     from flask_jwt_extended import verify_jwt_in_request
     from flask_jwt_extended import get_jwt
     from flask import jsonify
-    from .auth.models import TokenBlocklist
+    from .auth.service import token_revoked_statement
 
     @jwt.token_in_blocklist_loader
     def is_token_revoked(jwt_header, jwt_payload: dict) -> bool:
-        jti = jwt_payload["jti"]
-        return TokenBlocklist.query.filter_by(jti=jti).first() is not None
+        # jti révoqué ou compte supprimé (suppression logique): une seule requête
+        return bool(db.session.execute(token_revoked_statement(jwt_payload)).scalar())
 
     @jwt.revoked_token_loader
     def revoked_token_callback(jwt_header, jwt_payload):
@@ -99,31 +129,37 @@ def create_app():
     from .auth.routes import bp as auth_bp
     app.register_blueprint(auth_bp, url_prefix="/api/v1/auth")
 
+    # CLI: flask auth import-breached ...
+    from .auth.cli import auth_cli
+    app.cli.add_command(auth_cli)
+
     from .users.routes import bp as users_bp
     app.register_blueprint(users_bp, url_prefix="/api/v1/users")
 
+    # CLI: flask users import ...
+    from .users.cli import users_cli
+    app.cli.add_command(users_cli)
+
     from .notes.routes import bp as notes_bp
     app.register_blueprint(notes_bp, url_prefix="/api/v1/notes")
+
+    from .attachments.routes import bp as attachments_bp
+    app.register_blueprint(attachments_bp, url_prefix="/api/v1/notes")
+
+    # CLI: flask notes rebuild-stats
+    from .notes.cli import notes_cli
+    app.cli.add_command(notes_cli)
+
+    from .audit.routes import bp as audit_bp
+    app.register_blueprint(audit_bp, url_prefix="/api/v1/audit")
     
 
     # Appliquer un rate limit par défaut sur tout le blueprint Notes (ex: 60/min)
     from .notes.routes import bp as notes_bp_ref
     limiter.limit("60/minute")(notes_bp_ref)
 
-    # Healthcheck simple + ping DB
-    @app.get("/healthz")
-    def healthz():
-        db_status = "up"
-        try:
-            with db.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-        except Exception:
-            db_status = "down"
-        return jsonify({
-            "status": "ok",
-            "env": env,
-            "db": db_status
-        })
+    # Santé: /livez, /readyz, /healthz servis depuis le cache des probes de fond
+    register_health_routes(app, HealthMonitor(app, limiter), env)
 
     # --- Route Factice de validation (pour tests Étape 5) ---
     from .auth.schemas import RegisterSchema
@@ -0,0 +1,155 @@
+# app/asgi/app.py
+import logging
+import os
+import re
+import time
+import uuid
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app import create_app
+from app.common.errors import ApiError
+from app.common.db import engine_options, register_pool_liveness
+from app.common.compression import choose_encoding, skip_compression
+from .http import Request, StreamingResponse, error_response
+from .handlers import NativeHandlers
+
+_UUID = r"(?P<note_id>[0-9a-fA-F-]{36})"
+
+
+def async_database_url(url: str) -> str:
+    """URL SQLAlchemy sync -> équivalent async (psycopg 3 async / aiosqlite)."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    if url.startswith("sqlite://") and not url.startswith("sqlite+"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+class AsgiApp:
+    """
+    App ASGI: routes de lecture chaudes en natif async, le reste relayé à Flask
+    via un pool de threads (a2wsgi). Un worker tient ainsi des milliers de
+    connexions HTTP inactives sans bloquer un thread par connexion.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        cfg = flask_app.config
+        url = async_database_url(cfg.get("ASYNC_DATABASE_URL") or cfg["SQLALCHEMY_DATABASE_URI"])
+        engine_kwargs = {"pool_recycle": 1800}
+        if not url.startswith("sqlite"):
+            engine_kwargs.update(
+                pool_size=cfg["ASGI_DB_POOL_SIZE"],
+                max_overflow=cfg["ASGI_DB_MAX_OVERFLOW"],
+                pool_timeout=cfg["ASGI_DB_POOL_TIMEOUT"],
+                connect_args=engine_options({**cfg, "SQLALCHEMY_DATABASE_URI": url}).get("connect_args", {}),
+            )
+        self.engine = create_async_engine(url, **engine_kwargs)
+        register_pool_liveness(self.engine.sync_engine, cfg)
+        sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        env = os.getenv("APP_ENV") or os.getenv("FLASK_ENV", "development")
+        self.handlers = NativeHandlers(flask_app, sessionmaker, env, self.engine.dialect.name)
+        self.wsgi = WSGIMiddleware(flask_app, workers=cfg["ASGI_WSGI_THREADS"])
+        self.routes = [
+            ("GET", re.compile(r"^/livez$"), self.handlers.livez),
+            ("GET", re.compile(r"^/readyz$"), self.handlers.readyz),
+            ("GET", re.compile(r"^/healthz$"), self.handlers.healthz),
+            ("GET", re.compile(r"^/api/v1/auth/me$"), self.handlers.me),
+            ("GET", re.compile(r"^/api/v1/notes/$"), self.handlers.list_notes),
+            ("GET", re.compile(r"^/api/v1/notes/search$"), self.handlers.search_notes),
+            ("GET", re.compile(r"^/api/v1/notes/events$"), self.handlers.note_events),
+            ("GET", re.compile(rf"^/api/v1/notes/{_UUID}$"), self.handlers.get_note),
+        ]
+        self.log = logging.getLogger("app.request")
+
+    def _match(self, method, path):
+        for m, pattern, handler in self.routes:
+            if m != method:
+                continue
+            found = pattern.match(path)
+            if found:
+                return handler, found.groupdict()
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+        handler, params = self._match(scope["method"], scope["path"])
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+        await self._dispatch(handler, params, scope, send, receive)
+
+    async def _dispatch(self, handler, params, scope, send, receive=None):
+        request = Request(scope)
+        rid = request.headers.get("x-request-id") or str(uuid.uuid4())
+        start = time.time()
+        try:
+            if "note_id" in params:
+                try:
+                    params["note_id"] = uuid.UUID(params["note_id"])
+                except ValueError:
+                    raise ApiError("The requested URL was not found on the server.", 404, "http_error")
+            resp = await handler(request, **params)
+        except ApiError as e:
+            resp = error_response(e.message, e.status_code, e.code, e.details)
+        except Exception:
+            logging.getLogger("app.error").exception("unhandled_exception", extra={"request_id": rid})
+            resp = error_response("Internal server error.", 500, "internal_error")
+
+        # Mêmes en-têtes que les hooks after_request de create_app
+        resp.headers.setdefault("X-Request-Id", rid)
+        resp.headers.setdefault("X-Content-Type-Options", "nosniff")
+        resp.headers.setdefault("X-Frame-Options", "DENY")
+        resp.headers.setdefault("Referrer-Policy", "no-referrer")
+        resp.headers.setdefault("Content-Security-Policy", "default-src 'none'; frame-ancestors 'none'; base-uri 'none'")
+        if self.flask_app.config.get("ENFORCE_HTTPS") and (
+            request.is_secure or request.headers.get("x-forwarded-proto", "") == "https"
+        ):
+            resp.headers.setdefault("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload")
+        self._compress(request, resp)
+        await resp.send(send, receive)
+
+        self.log.info("http_request", extra={
+            "request_id": rid,
+            "method": request.method,
+            "path": request.path,
+            "status": resp.status,
+            "latency_ms": int((time.time() - start) * 1000),
+        })
+
+    def _compress(self, request, resp):
+        # Même politique que init_compression côté Flask
+        cfg = self.flask_app.config
+        cache = self.flask_app.extensions.get("compression_cache")
+        mimetype = resp.headers.get("Content-Type", "").split(";")[0].strip()
+        if (cache is None or request.method == "HEAD" or isinstance(resp, StreamingResponse)
+                or skip_compression(resp.status, resp.headers, mimetype, cfg)):
+            return
+        resp.headers["Vary"] = "Accept-Encoding"
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        if encoding is None or len(resp.body) < cfg["COMPRESS_MIN_SIZE"]:
+            return
+        resp.body = cache.get_or_compress(resp.body, encoding, cfg)
+        resp.headers["Content-Encoding"] = encoding
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.flask_app.extensions["health"].ensure_started()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.flask_app.extensions["audit"].close()
+                await self.flask_app.extensions["note_events"].aclose()
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app():
+    return AsgiApp(create_app())
@@ -0,0 +1,257 @@
+# app/asgi/handlers.py
+# Routes "chaudes" en lecture servies nativement en async (engine async + psycopg async).
+# Elles réutilisent modèles, requêtes Core (app.notes.queries) et schémas marshmallow
+# de l'app Flask; tout le reste est relayé à l'app WSGI.
+import asyncio
+import json
+import time
+import uuid
+from jwt import ExpiredSignatureError, InvalidTokenError
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from limits import parse as parse_limit
+from limits.aio.strategies import FixedWindowRateLimiter
+from limits.storage import storage_from_string
+from sqlalchemy import func, select
+
+from app.common.errors import ApiError
+from app.common.health import readiness_body, healthz_body
+from app.auth.service import token_revoked_statement
+from app.auth.schemas import MeOut
+from app.users.models import User
+from app.notes.models import Note, NoteChange
+from app.notes.schemas import NoteOut, NoteSearchOut, NoteChangeOut
+from app.notes.queries import (parse_pagination, parse_projection, parse_scope, parse_keyset, projection_schema,
+                               list_statements, shared_list_statement, keyset_page, get_statement)
+from app.notes.search import parse_search_args, search_statement, search_page
+from app.notes.changes import parse_changes_args, changes_statement, changes_page
+from app.notes.events import RESYNC
+from app.common.utils import encode_cursor
+from .http import json_response, StreamingResponse
+
+me_out = MeOut()
+note_out = NoteOut()
+note_search_out_many = NoteSearchOut(many=True)
+note_change_out_many = NoteChangeOut(many=True)
+
+REPLAY_BATCH = 500
+
+
+def _sse(event: str, data: dict, seq: int) -> str:
+    # id = curseur de /notes/changes: Last-Event-ID et ?since= sont interchangeables
+    return f"id: {encode_cursor([seq])}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+# Même limite que le blueprint Notes côté Flask
+NOTES_LIMIT = parse_limit("60/minute")
+
+
+class NativeHandlers:
+    def __init__(self, flask_app, sessionmaker, env: str, dialect: str):
+        self.flask_app = flask_app
+        self.sessionmaker = sessionmaker
+        self.dialect = dialect
+        self.env = env
+        uri = flask_app.config.get("RATELIMIT_STORAGE_URI") or "memory://"
+        self.rate_limit_enabled = flask_app.config.get("RATELIMIT_ENABLED", True)
+        self.rate_limiter = FixedWindowRateLimiter(storage_from_string(f"async+{uri}"))
+
+    # --- Auth (mêmes codes d'erreur que les callbacks JWT de create_app) ---
+    def _decode(self, request) -> dict:
+        header = request.headers.get("authorization")
+        if not header:
+            raise ApiError("Missing Authorization Header", 401, "authorization_required")
+        parts = header.split()
+        if len(parts) != 2 or parts[0] != "Bearer":
+            raise ApiError("Bad Authorization header. Expected 'Authorization: Bearer <JWT>'", 401,
+                           "authorization_required")
+        try:
+            # decode_token lit la config JWT de l'app (clé, algorithmes, leeway)
+            with self.flask_app.app_context():
+                claims = decode_token(parts[1])
+        except ExpiredSignatureError:
+            raise ApiError("Token has expired", 401, "token_expired")
+        except (InvalidTokenError, JWTExtendedException) as e:
+            raise ApiError(str(e), 422, "token_invalid")
+        if claims.get("type") != "access":
+            raise ApiError("Only non-refresh tokens are allowed", 422, "token_invalid")
+        return claims
+
+    async def _authenticate(self, request, session) -> dict:
+        claims = self._decode(request)
+        if await session.scalar(token_revoked_statement(claims)):
+            raise ApiError("Token has been revoked", 401, "token_revoked")
+        return claims
+
+    @staticmethod
+    def _subject(claims) -> uuid.UUID:
+        try:
+            return uuid.UUID(claims["sub"])
+        except Exception:
+            raise ApiError("Invalid token subject.", 422, "token_invalid_sub")
+
+    async def _rate_limit_notes(self, request):
+        if self.rate_limit_enabled and not await self.rate_limiter.hit(NOTES_LIMIT, "notes", request.remote_addr):
+            raise ApiError("Rate limit exceeded.", 429, "rate_limited")
+
+    # --- Routes ---
+    # Santé: lecture du cache de HealthMonitor, jamais de connexion du pool async
+    async def livez(self, request):
+        return json_response({"status": "ok"})
+
+    async def readyz(self, request):
+        monitor = self.flask_app.extensions["health"]
+        monitor.ensure_started()
+        body, status = readiness_body(monitor)
+        return json_response(body, status)
+
+    async def healthz(self, request):
+        monitor = self.flask_app.extensions["health"]
+        monitor.ensure_started()
+        return json_response(healthz_body(monitor, self.env))
+
+    async def me(self, request):
+        async with self.sessionmaker() as session:
+            claims = await self._authenticate(request, session)
+            uid = self._subject(claims)
+            row = (await session.execute(
+                select(User.id, User.email, User.role, User.is_active, User.email_verified_at, User.created_at)
+                .where(User.id == uid)
+            )).mappings().first()
+        if not row:
+            raise ApiError("User not found.", 404, "not_found")
+        return json_response(me_out.dump(row))
+
+    async def list_notes(self, request):
+        await self._rate_limit_notes(request)
+        async with self.sessionmaker() as session:
+            claims = await self._authenticate(request, session)
+            user_id = self._subject(claims)
+            page, per_page = parse_pagination(request.args)
+            fields = parse_projection(request.args)
+            scope = parse_scope(request.args)
+            if scope != "own":
+                stmt = shared_list_statement(self.dialect, user_id, scope, per_page, fields, parse_keyset(request.args))
+                page = keyset_page((await session.execute(stmt)).mappings(), per_page)
+                return json_response({
+                    "status": "success",
+                    "data": projection_schema(fields + ("access",)).dump(page["items"]),
+                    "meta": {"per_page": per_page, "scope": scope, "next_cursor": page["next_cursor"],
+                             "has_more": page["has_more"]},
+                })
+            count_stmt, page_stmt = list_statements(user_id, claims.get("role") == "admin", page, per_page, fields)
+            total = (await session.execute(count_stmt)).scalar_one()
+            items = (await session.execute(page_stmt)).mappings().all()
+        return json_response({
+            "status": "success",
+            "data": projection_schema(fields).dump(items),
+            "meta": {"page": page, "per_page": per_page, "total": total},
+        })
+
+    async def search_notes(self, request):
+        await self._rate_limit_notes(request)
+        async with self.sessionmaker() as session:
+            claims = await self._authenticate(request, session)
+            user_id = self._subject(claims)
+            q, per_page, after = parse_search_args(request.args)
+            stmt = search_statement(self.dialect, user_id, claims.get("role") == "admin", q, per_page, after)
+            page = search_page((await session.execute(stmt)).mappings(), per_page)
+        return json_response({
+            "status": "success",
+            "data": note_search_out_many.dump(page["items"]),
+            "meta": {"per_page": per_page, "next_cursor": page["next_cursor"]},
+        })
+
+    async def get_note(self, request, note_id: uuid.UUID):
+        await self._rate_limit_notes(request)
+        async with self.sessionmaker() as session:
+            claims = await self._authenticate(request, session)
+            user_id = self._subject(claims)
+            # ACL dans le WHERE (cf. app.notes.shares); un refus seul relit pour choisir 404/403
+            is_admin = claims.get("role") == "admin"
+            note = (await session.execute(get_statement(note_id, None if is_admin else user_id))).mappings().first()
+            exists = note is not None or (await session.scalar(select(Note.id).where(Note.id == note_id))) is not None
+        if not exists:
+            raise ApiError("Note not found.", 404, "not_found")
+        if not note:
+            raise ApiError("Forbidden: you do not have access to this note.", 403, "forbidden",
+                           details={"note_id": str(note_id)})
+        return json_response(note_out.dump(note))
+
+    # --- Flux SSE (app.notes.events) ---
+    async def note_events(self, request):
+        """
+        GET /api/v1/notes/events: changements de ses notes en Server-Sent Events.
+        Connexion DB le temps de l'auth (et des relectures), jamais pour toute la durée du flux;
+        pas de thread: le flux est une coroutine qui attend sa file d'abonné.
+        """
+        await self._rate_limit_notes(request)
+        last_event_id = request.headers.get("last-event-id") or request.args.get("last_event_id")
+        since = parse_changes_args({"since": last_event_id})[0] if last_event_id else None
+        async with self.sessionmaker() as session:
+            claims = await self._authenticate(request, session)
+            user_id = self._subject(claims)
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # pas de buffering nginx
+        return StreamingResponse(self._event_stream(user_id, since, last_event_id is not None, claims.get("exp")),
+                                 headers=headers, content_type="text/event-stream")
+
+    async def _replay(self, user_id: uuid.UUID, since: int):
+        """Changements après since lus dans note_changes, par lots, une session courte par lot."""
+        cfg = self.flask_app.config
+        sent = 0
+        while True:
+            async with self.sessionmaker() as session:
+                rows = (await session.execute(changes_statement(user_id, since, REPLAY_BATCH))).mappings()
+                page = changes_page(rows, since, REPLAY_BATCH)
+            for item in note_change_out_many.dump(page["items"]):
+                yield _sse("note", item, item["seq"]), item["seq"]
+            since = page["items"][-1]["seq"] if page["items"] else since
+            sent += len(page["items"])
+            if not page["has_more"]:
+                return
+            if sent >= cfg["NOTES_EVENTS_REPLAY_MAX"]:
+                # Trop de retard pour un flux: le client rattrape via GET /notes/changes?since=
+                async with self.sessionmaker() as session:
+                    head = await session.scalar(
+                        select(func.max(NoteChange.seq)).where(NoteChange.owner_id == user_id))
+                yield _sse("resync", {"since": encode_cursor([since])}, head), head
+                return
+
+    async def _event_stream(self, user_id: uuid.UUID, since: int | None, resume: bool, exp: int | None):
+        cfg = self.flask_app.config
+        broker = self.flask_app.extensions["note_events"]
+        heartbeat = cfg["NOTES_EVENTS_HEARTBEAT_SECONDS"]
+        async with broker.subscribe(str(user_id)) as queue:
+            # Abonné avant de lire la position ou de relire: rien ne passe entre les deux
+            # (un changement déjà couvert par la position/relecture est filtré par seq)
+            if since is None:
+                # Position courante: un flux sans Last-Event-ID sait aussi reprendre
+                async with self.sessionmaker() as session:
+                    since = await session.scalar(
+                        select(func.coalesce(func.max(NoteChange.seq), 0)).where(NoteChange.owner_id == user_id))
+            yield f"retry: {cfg['NOTES_EVENTS_RETRY_MS']}\nid: {encode_cursor([since])}\n\n"
+            last = replayed = since
+            if resume:
+                async for chunk, last in self._replay(user_id, since):
+                    yield chunk
+                replayed = last
+            while True:
+                # Jeton expiré: fin du flux, le client se reconnecte avec un jeton frais + Last-Event-ID
+                remaining = heartbeat if exp is None else min(heartbeat, exp - time.time())
+                if remaining <= 0:
+                    return
+                try:
+                    message = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is RESYNC:
+                    async for chunk, last in self._replay(user_id, last):
+                        yield chunk
+                    replayed = last
+                    continue
+                event = json.loads(message)
+                # Déjà envoyé par une relecture (note_changes est visible dans l'ordre des seq)
+                if event["seq"] <= replayed:
+                    continue
+                last = max(last, event["seq"])
+                yield _sse("note", event, event["seq"])
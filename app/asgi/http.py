@@ -0,0 +1,86 @@
+# app/asgi/http.py
+# Petits helpers HTTP pour les routes ASGI natives (pas de framework: ASGI brut)
+import asyncio
+import json
+from urllib.parse import parse_qsl
+
+
+class Request:
+    def __init__(self, scope):
+        self.scope = scope
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {k.decode("latin1").lower(): v.decode("latin1") for k, v in scope.get("headers", [])}
+        self.args = dict(parse_qsl(scope.get("query_string", b"").decode("latin1")))
+        client = scope.get("client")
+        self.remote_addr = client[0] if client else "127.0.0.1"
+        self.is_secure = scope.get("scheme") == "https"
+
+
+class Response:
+    def __init__(self, body: bytes = b"", status: int = 200, headers: dict | None = None,
+                 content_type: str = "application/json"):
+        self.body = body
+        self.status = status
+        self.headers = dict(headers or {})
+        if content_type:
+            self.headers.setdefault("Content-Type", content_type)
+
+    async def send(self, send, receive=None):
+        headers = dict(self.headers)
+        headers["Content-Length"] = str(len(self.body))
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [(k.lower().encode("latin1"), str(v).encode("latin1")) for k, v in headers.items()],
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+
+class StreamingResponse(Response):
+    """Corps produit par un générateur async (chaînes), envoyé au fil de l'eau sans Content-Length."""
+
+    def __init__(self, chunks, status: int = 200, headers: dict | None = None, content_type: str = "text/plain"):
+        super().__init__(b"", status, headers, content_type)
+        self.chunks = chunks
+
+    async def _pump(self, send):
+        async for chunk in self.chunks:
+            await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(self, send, receive=None):
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": [(k.lower().encode("latin1"), str(v).encode("latin1")) for k, v in self.headers.items()],
+        })
+        pump = asyncio.ensure_future(self._pump(send))
+        waiters = {pump}
+        if receive is not None:
+            # Déconnexion du client: le générateur est interrompu (et ses ressources libérées)
+            waiters.add(asyncio.ensure_future(_disconnected(receive)))
+        try:
+            done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in waiters:
+                task.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+            await self.chunks.aclose()
+        if pump in done:
+            pump.result()
+
+
+async def _disconnected(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def json_response(payload, status: int = 200, headers: dict | None = None) -> Response:
+    # Même rendu que flask.jsonify (clés triées, compact)
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8") + b"\n"
+    return Response(body, status, headers)
+
+
+def error_response(message, status, code, details=None) -> Response:
+    return json_response({"error": {"code": code, "message": message, "details": details or {}}}, status)
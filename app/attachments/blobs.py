@@ -0,0 +1,155 @@
+# app/attachments/blobs.py
+# Stockage des pièces jointes, interchangeable selon ATTACHMENTS_STORAGE_URI:
+#   file:///var/lib/app/attachments  -> LocalBlobStore (disque local ou volume partagé)
+#   s3://bucket/prefix               -> S3BlobStore (AWS, MinIO... via ATTACHMENTS_S3_ENDPOINT_URL)
+#
+# Upload reprenable en morceaux: begin() ouvre l'upload, write() copie un morceau
+# depuis le flux de la requête (jamais le fichier entier en mémoire), complete()
+# le rend visible. Un morceau rejoué (même offset / même numéro de part) écrase
+# le précédent: un retry après une coupure est sans effet de bord.
+import os
+import tempfile
+from urllib.parse import quote, urlparse
+
+COPY_BUFFER = 256 * 1024
+
+
+class IncompleteChunk(Exception):
+    """Le client a coupé avant d'envoyer Content-Length octets."""
+
+
+def copy_stream(stream, dst, length: int) -> None:
+    remaining = length
+    while remaining:
+        buf = stream.read(min(COPY_BUFFER, remaining))
+        if not buf:
+            raise IncompleteChunk(f"{length - remaining}/{length} bytes received")
+        dst.write(buf)
+        remaining -= len(buf)
+
+
+def content_disposition(filename: str) -> str:
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+class LocalBlobStore:
+    """Fichier <key>.part pendant l'upload, renommé en <key> à la fin. Téléchargement: sendfile."""
+
+    min_part_bytes = 0
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return path
+
+    def begin(self, key: str) -> str | None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path + ".part", "wb").close()
+        return None
+
+    def write(self, key: str, token: str | None, part_number: int, offset: int, stream, length: int) -> None:
+        with open(self._path(key) + ".part", "r+b") as f:
+            f.seek(offset)
+            copy_stream(stream, f, length)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())  # l'offset enregistré en base doit survivre à un crash
+
+    def complete(self, key: str, token: str | None) -> None:
+        path = self._path(key)
+        os.replace(path + ".part", path)
+
+    def abort(self, key: str, token: str | None) -> None:
+        self._remove(self._path(key) + ".part")
+
+    def delete(self, key: str) -> None:
+        self._remove(self._path(key))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> str | None:
+        return self._path(key)
+
+    def download_url(self, key: str, filename: str, content_type: str, ttl: int) -> str | None:
+        return None
+
+
+class S3BlobStore:
+    """
+    Multipart upload S3: un PUT client = une part (5 Mio minimum sauf la dernière).
+    Le morceau transite par un fichier temporaire (mémoire bornée) car l'upload de
+    part veut un corps rejouable. Téléchargement: redirection vers une URL présignée.
+    Dépendance optionnelle: boto3.
+    """
+
+    min_part_bytes = 5 * 1024 * 1024
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str | None = None):
+        try:
+            import boto3
+        except ImportError as e:  # optionnel
+            raise RuntimeError("ATTACHMENTS_STORAGE_URI=s3://... requires boto3") from e
+        self._s3 = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def begin(self, key: str) -> str | None:
+        return self._s3.create_multipart_upload(Bucket=self.bucket, Key=self._key(key))["UploadId"]
+
+    def write(self, key: str, token: str | None, part_number: int, offset: int, stream, length: int) -> None:
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+            copy_stream(stream, spool, length)
+            spool.seek(0)
+            self._s3.upload_part(Bucket=self.bucket, Key=self._key(key), UploadId=token,
+                                 PartNumber=part_number, Body=spool, ContentLength=length)
+
+    def complete(self, key: str, token: str | None) -> None:
+        parts = []
+        pages = self._s3.get_paginator("list_parts").paginate(Bucket=self.bucket, Key=self._key(key), UploadId=token)
+        for page in pages:
+            parts += [{"ETag": p["ETag"], "PartNumber": p["PartNumber"]} for p in page.get("Parts", [])]
+        self._s3.complete_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=token,
+                                           MultipartUpload={"Parts": parts})
+
+    def abort(self, key: str, token: str | None) -> None:
+        if token:
+            self._s3.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=token)
+
+    def delete(self, key: str) -> None:
+        self._s3.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def local_path(self, key: str) -> str | None:
+        return None
+
+    def download_url(self, key: str, filename: str, content_type: str, ttl: int) -> str | None:
+        return self._s3.generate_presigned_url("get_object", ExpiresIn=ttl, Params={
+            "Bucket": self.bucket, "Key": self._key(key), "ResponseContentType": content_type,
+            "ResponseContentDisposition": content_disposition(filename),
+        })
+
+
+def blob_store_from_uri(uri: str, endpoint_url: str | None = None):
+    parsed = urlparse(uri)
+    if parsed.scheme == "file":
+        return LocalBlobStore(parsed.path)
+    if parsed.scheme == "s3":
+        return S3BlobStore(parsed.netloc, parsed.path, endpoint_url)
+    raise ValueError(f"Unsupported ATTACHMENTS_STORAGE_URI: {uri!r} (file:// or s3://)")
+
+
+def init_blob_store(app) -> None:
+    uri = app.config.get("ATTACHMENTS_STORAGE_URI") or f"file://{os.path.join(app.instance_path, 'attachments')}"
+    app.extensions["blob_store"] = blob_store_from_uri(uri, app.config.get("ATTACHMENTS_S3_ENDPOINT_URL"))
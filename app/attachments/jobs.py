@@ -0,0 +1,62 @@
+# app/attachments/jobs.py
+# Nettoyage du blob store hors requête (voir app.jobs.queue): les lignes partent
+# avec la note (cascade), les octets sont supprimés ensuite par un job.
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from app.extensions import db
+from app.attachments.models import Attachment, UPLOADING
+from app.jobs.queue import enqueue, job
+
+
+def _ref(row, uploading: bool) -> list:
+    return [f"{row.owner_id}/{row.note_id}/{row.id}", row.upload_token if uploading else None]
+
+
+def blob_refs(*criteria) -> list[list]:
+    """[clé, jeton d'upload en cours] des pièces jointes visées, à lire AVANT de supprimer les lignes."""
+    rows = db.session.execute(
+        select(Attachment.id, Attachment.note_id, Attachment.owner_id, Attachment.upload_token, Attachment.status)
+        .where(*criteria)
+    )
+    return [_ref(r, r.status == UPLOADING) for r in rows]
+
+
+def discard_blobs(refs: list[list]) -> None:
+    """À appeler après le commit qui a supprimé les lignes."""
+    if refs:
+        enqueue("attachments.delete_blobs", refs=refs)
+
+
+@job("attachments.delete_blobs")
+def delete_blobs(refs: list[list]) -> None:
+    store = current_app.extensions["blob_store"]
+    for key, upload_token in refs:
+        store.abort(key, upload_token)
+        store.delete(key)
+
+
+@job("attachments.prune_uploads", every="ATTACHMENTS_PRUNE_INTERVAL")
+def prune_uploads(batch_size: int = 500) -> None:
+    """Uploads jamais terminés après ATTACHMENTS_UPLOAD_EXPIRY_HOURS: ligne et morceaux supprimés."""
+    hours = current_app.config["ATTACHMENTS_UPLOAD_EXPIRY_HOURS"]
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    while True:
+        ids = db.session.execute(
+            select(Attachment.id).where(Attachment.status == UPLOADING, Attachment.created_at < cutoff)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return
+        # RETURNING: un upload terminé entre-temps n'est ni supprimé ni nettoyé
+        deleted = db.session.execute(
+            delete(Attachment).where(Attachment.id.in_(ids), Attachment.status == UPLOADING)
+            .returning(Attachment.id, Attachment.note_id, Attachment.owner_id, Attachment.upload_token)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        delete_blobs([_ref(r, True) for r in deleted])
+        if len(ids) < batch_size:
+            return
@@ -0,0 +1,41 @@
+import uuid
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import func, BigInteger, ForeignKeyConstraint, Index
+from app.extensions import db
+
+UPLOADING = "uploading"
+READY = "ready"
+
+
+class Attachment(db.Model):
+    """
+    Pièce jointe d'une note. Les octets vivent dans le blob store (app.attachments.blobs),
+    la ligne ne porte que les métadonnées et l'avancement de l'upload (received).
+    FK composite (note_id, owner_id): la PK des notes partitionnées, et la pièce
+    jointe suit l'owner de sa note (suppression en cascade).
+    """
+    __tablename__ = "note_attachments"
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    note_id = db.Column(UUID(as_uuid=True), nullable=False)
+    owner_id = db.Column(UUID(as_uuid=True), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(255), nullable=False)
+    size = db.Column(BigInteger, nullable=False)                  # taille annoncée à la création
+    received = db.Column(BigInteger, nullable=False, default=0)   # octets écrits (offset de reprise)
+    parts = db.Column(db.Integer, nullable=False, default=0)      # morceaux acceptés
+    upload_token = db.Column(db.String(255), nullable=True)       # S3: UploadId du multipart
+    status = db.Column(db.String(16), nullable=False, default=UPLOADING)
+
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    completed_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        ForeignKeyConstraint(["note_id", "owner_id"], ["notes.id", "notes.owner_id"], ondelete="CASCADE"),
+        Index("ix_note_attachments_note_id", "note_id"),
+        Index("ix_note_attachments_status_created_at", "status", "created_at"),
+    )
+
+    @property
+    def storage_key(self) -> str:
+        return f"{self.owner_id}/{self.note_id}/{self.id}"
@@ -0,0 +1,224 @@
+# app/attachments/routes.py
+# Pièces jointes des notes: /api/v1/notes/<note_id>/attachments
+#
+#   POST   .../attachments                 {filename, content_type?, size} -> 201 (upload ouvert)
+#   PUT    .../attachments/<id>/content    un morceau, Content-Range: bytes <début>-<fin>/<taille>
+#                                           (sans Content-Range: fichier entier en une fois)
+#   GET    .../attachments/<id>            métadonnées; "received" = offset de reprise
+#   GET    .../attachments/<id>/content    téléchargement (Range, sendfile / X-Accel-Redirect / URL S3)
+#   DELETE .../attachments/<id>
+#
+# Le corps d'un PUT est copié du flux WSGI par blocs: la taille d'un morceau est bornée
+# par ATTACHMENTS_CHUNK_MAX_BYTES, pas par MAX_CONTENT_LENGTH. La lecture du client (lente)
+# se fait hors transaction, dans un fichier temporaire; seule l'écriture dans le blob store
+# et l'avance de l'offset se font sous verrou.
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+from flask import Blueprint, current_app, jsonify, redirect, request, send_file, url_for
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from sqlalchemy import func, select, update
+from werkzeug.http import parse_content_range_header
+
+from app.extensions import db
+from app.notes.models import Note, SHARE_READ, SHARE_WRITE
+from app.notes.shares import accessible_note
+from app.attachments.models import Attachment, READY, UPLOADING
+from app.attachments.schemas import AttachmentIn, AttachmentOut
+from app.attachments.blobs import IncompleteChunk, content_disposition, copy_stream
+from app.attachments.jobs import blob_refs, discard_blobs
+from app.common.errors import ApiError
+
+bp = Blueprint("attachments", __name__)
+
+attachment_in = AttachmentIn()
+attachment_out = AttachmentOut()
+attachment_out_many = AttachmentOut(many=True)
+
+
+def _store():
+    return current_app.extensions["blob_store"]
+
+
+def _note_for_request(note_id: uuid.UUID, permission: str = SHARE_READ) -> Note:
+    # Lecture: partage read suffit; upload/suppression: partage write
+    is_admin = (get_jwt() or {}).get("role") == "admin"
+    return accessible_note(note_id, uuid.UUID(get_jwt_identity()), is_admin, permission)
+
+
+def _attachment(note: Note, attachment_id: uuid.UUID, lock: bool = False) -> Attachment:
+    stmt = select(Attachment).where(Attachment.id == attachment_id, Attachment.note_id == note.id)
+    if lock:
+        # Un seul PUT à la fois par upload (les morceaux doivent arriver dans l'ordre)
+        stmt = stmt.with_for_update()
+    attachment = db.session.execute(stmt).scalar_one_or_none()
+    if attachment is None:
+        raise ApiError("Attachment not found.", 404, "not_found")
+    return attachment
+
+
+def _chunk_range(attachment: Attachment) -> tuple[int, int]:
+    """(offset, longueur) du morceau envoyé, validés contre l'état de l'upload."""
+    length = request.content_length
+    if length is None:
+        raise ApiError("Content-Length is required.", 411, "length_required")
+    header = request.headers.get("Content-Range")
+    if header:
+        rng = parse_content_range_header(header)
+        if rng is None or rng.units != "bytes" or rng.start is None:
+            raise ApiError("Invalid Content-Range.", 400, "validation_error", details={"Content-Range": header})
+        if rng.length is not None and rng.length != attachment.size:
+            raise ApiError("Content-Range total does not match the declared size.", 400, "validation_error",
+                           details={"size": attachment.size})
+        if rng.stop - rng.start != length:
+            raise ApiError("Content-Range does not match Content-Length.", 400, "validation_error")
+        start = rng.start
+    else:
+        start = 0
+        if length != attachment.size:
+            raise ApiError("Send the whole file or use Content-Range.", 400, "validation_error",
+                           details={"size": attachment.size})
+    if start != attachment.received:
+        # Reprise: le client repart de l'offset renvoyé
+        raise ApiError("Chunk does not start at the current upload offset.", 409, "upload_offset_mismatch",
+                       details={"offset": attachment.received})
+    if length < 1 or start + length > attachment.size:
+        raise ApiError("Chunk exceeds the declared size.", 400, "validation_error", details={"size": attachment.size})
+    max_chunk = current_app.config["ATTACHMENTS_CHUNK_MAX_BYTES"]
+    if length > max_chunk:
+        raise ApiError("Chunk too large.", 413, "payload_too_large", details={"max_chunk_bytes": max_chunk})
+    if start + length < attachment.size and length < _store().min_part_bytes:
+        raise ApiError("Chunk too small for this storage backend.", 400, "validation_error",
+                       details={"min_chunk_bytes": _store().min_part_bytes})
+    return start, length
+
+
+@bp.post("/<uuid:note_id>/attachments")
+@jwt_required()
+def create_attachment(note_id):
+    note = _note_for_request(note_id, SHARE_WRITE)
+    data = attachment_in.load(request.get_json(silent=True) or {})
+    cfg = current_app.config
+    if data["size"] > cfg["ATTACHMENTS_MAX_BYTES"]:
+        raise ApiError("Attachment too large.", 413, "payload_too_large",
+                       details={"max_bytes": cfg["ATTACHMENTS_MAX_BYTES"]})
+    count = db.session.execute(select(func.count()).where(Attachment.note_id == note.id)).scalar_one()
+    if count >= cfg["ATTACHMENTS_MAX_PER_NOTE"]:
+        raise ApiError("Too many attachments on this note.", 409, "too_many_attachments",
+                       details={"max": cfg["ATTACHMENTS_MAX_PER_NOTE"]})
+
+    attachment = Attachment(id=uuid.uuid4(), note_id=note.id, owner_id=note.owner_id, filename=data["filename"],
+                            content_type=data["content_type"], size=data["size"], received=0, parts=0)
+    attachment.upload_token = _store().begin(attachment.storage_key)
+    db.session.add(attachment)
+    db.session.commit()
+    upload_url = url_for(".upload_content", note_id=note.id, attachment_id=attachment.id)
+    return jsonify({**attachment_out.dump(attachment), "upload_url": upload_url}), 201, {"Location": upload_url}
+
+
+@bp.get("/<uuid:note_id>/attachments")
+@jwt_required()
+def list_attachments(note_id):
+    note = _note_for_request(note_id)
+    rows = db.session.execute(
+        select(Attachment).where(Attachment.note_id == note.id).order_by(Attachment.created_at)
+    ).scalars().all()
+    return jsonify({"status": "success", "data": attachment_out_many.dump(rows)}), 200
+
+
+@bp.get("/<uuid:note_id>/attachments/<uuid:attachment_id>")
+@jwt_required()
+def get_attachment(note_id, attachment_id):
+    attachment = _attachment(_note_for_request(note_id), attachment_id)
+    return jsonify(attachment_out.dump(attachment)), 200
+
+
+@bp.put("/<uuid:note_id>/attachments/<uuid:attachment_id>/content")
+@jwt_required()
+def upload_content(note_id, attachment_id):
+    note = _note_for_request(note_id, SHARE_WRITE)
+    attachment = _attachment(note, attachment_id)
+    if attachment.status != UPLOADING:
+        raise ApiError("Upload already completed.", 409, "upload_completed")
+    start, length = _chunk_range(attachment)
+    request.max_content_length = current_app.config["ATTACHMENTS_CHUNK_MAX_BYTES"]
+    # Fin de transaction: ni verrou ni connexion du pool pendant la lecture du corps
+    db.session.rollback()
+
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as chunk:
+        try:
+            copy_stream(request.stream, chunk, length)
+        except IncompleteChunk:
+            raise ApiError("Incomplete chunk, resume from the current offset.", 400, "incomplete_chunk",
+                           details={"offset": start})
+        chunk.seek(0)
+
+        # Section courte: l'offset est revalidé sous verrou avant de toucher au blob, un PUT
+        # concurrent au même offset ne peut donc pas écraser un morceau déjà accepté
+        attachment = _attachment(note, attachment_id, lock=True)
+        if attachment.status != UPLOADING or attachment.received != start:
+            db.session.rollback()
+            raise ApiError("Chunk does not start at the current upload offset.", 409, "upload_offset_mismatch",
+                           details={"offset": attachment.received})
+        store = _store()
+        store.write(attachment.storage_key, attachment.upload_token, attachment.parts + 1, start, chunk, length)
+
+    # Avance conditionnelle (SQLite n'a pas de FOR UPDATE): 0 ligne = un autre PUT est passé
+    advanced = db.session.execute(
+        update(Attachment)
+        .where(Attachment.id == attachment.id, Attachment.received == start)
+        .values(received=start + length, parts=Attachment.parts + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not advanced:
+        db.session.rollback()
+        raise ApiError("Chunk does not start at the current upload offset.", 409, "upload_offset_mismatch",
+                       details={"offset": db.session.get(Attachment, attachment_id).received})
+    db.session.refresh(attachment)
+    if attachment.received == attachment.size:
+        store.complete(attachment.storage_key, attachment.upload_token)
+        attachment.status = READY
+        attachment.completed_at = datetime.now(timezone.utc)
+    db.session.commit()
+    return jsonify(attachment_out.dump(attachment)), 200, {"Upload-Offset": str(attachment.received)}
+
+
+@bp.get("/<uuid:note_id>/attachments/<uuid:attachment_id>/content")
+@jwt_required()
+def download_content(note_id, attachment_id):
+    attachment = _attachment(_note_for_request(note_id), attachment_id)
+    if attachment.status != READY:
+        raise ApiError("Upload not completed.", 409, "upload_incomplete", details={"offset": attachment.received})
+    cfg = current_app.config
+    store = _store()
+    key = attachment.storage_key
+
+    path = store.local_path(key)
+    if path is None:
+        # Blob distant: le client télécharge directement (Range géré par le stockage)
+        return redirect(store.download_url(key, attachment.filename, attachment.content_type,
+                                           cfg["ATTACHMENTS_URL_TTL"]), 302)
+    if cfg["ATTACHMENTS_ACCEL_REDIRECT"]:
+        # nginx sert le fichier lui-même (sendfile + Range) depuis une location internal
+        resp = current_app.response_class(mimetype=attachment.content_type)
+        resp.headers["Content-Disposition"] = content_disposition(attachment.filename)
+        resp.headers["X-Accel-Redirect"] = f"{cfg['ATTACHMENTS_ACCEL_REDIRECT'].rstrip('/')}/{key}"
+    else:
+        # Chemin de fichier: wsgi.file_wrapper (os.sendfile sous gunicorn), Range/If-Range/ETag gérés
+        resp = send_file(path, mimetype=attachment.content_type, as_attachment=True,
+                         download_name=attachment.filename, conditional=True,
+                         etag=f"{attachment.id}-{attachment.size}", last_modified=attachment.completed_at)
+    resp.cache_control.private = True
+    return resp
+
+
+@bp.delete("/<uuid:note_id>/attachments/<uuid:attachment_id>")
+@jwt_required()
+def delete_attachment(note_id, attachment_id):
+    attachment = _attachment(_note_for_request(note_id, SHARE_WRITE), attachment_id, lock=True)
+    refs = blob_refs(Attachment.id == attachment.id)
+    db.session.delete(attachment)
+    db.session.commit()
+    discard_blobs(refs)
+    return ("", 204)
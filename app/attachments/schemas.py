@@ -0,0 +1,18 @@
+from marshmallow import Schema, fields, validate
+
+class AttachmentIn(Schema):
+    filename = fields.String(required=True, validate=validate.Length(min=1, max=255))
+    content_type = fields.String(load_default="application/octet-stream",
+                                 validate=validate.Regexp(r"^[\w.+-]+/[\w.+-]+$"))
+    size = fields.Integer(required=True, strict=True, validate=validate.Range(min=1))
+
+class AttachmentOut(Schema):
+    id = fields.UUID(required=True)
+    note_id = fields.UUID(required=True)
+    filename = fields.String(required=True)
+    content_type = fields.String(required=True)
+    size = fields.Integer(required=True)
+    received = fields.Integer(required=True)
+    status = fields.String(required=True)
+    created_at = fields.DateTime(required=True)
+    completed_at = fields.DateTime(allow_none=True)
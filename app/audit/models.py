@@ -0,0 +1,38 @@
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Integer, Index
+from app.extensions import db
+
+# Types d'événements
+LOGIN = "login"
+LOGIN_FAILED = "login_failed"
+REFRESH = "refresh"
+LOGOUT = "logout"
+PASSWORD_RESET = "password_reset"
+EVENT_TYPES = (LOGIN, LOGIN_FAILED, REFRESH, LOGOUT, PASSWORD_RESET)
+
+
+class AuthEvent(db.Model):
+    """
+    Journal d'audit auth (append-only), alimenté en write-behind par app.audit.writer.
+    Pas de FK vers users: un échec de login peut viser un email inconnu,
+    et l'historique doit survivre à la suppression du compte.
+    """
+    __tablename__ = "auth_events"
+
+    id = db.Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    occurred_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    event = db.Column(db.String(32), nullable=False)
+    user_id = db.Column(UUID(as_uuid=True), nullable=True)
+    email = db.Column(db.String(320), nullable=True)
+    ip = db.Column(db.String(45), nullable=True)
+    user_agent = db.Column(db.String(255), nullable=True)
+    reason = db.Column(db.String(64), nullable=True)  # code d'erreur pour login_failed
+    jti = db.Column(db.String(36), nullable=True)
+
+    # Requêtes admin: par user / email / type, toujours triées par date desc
+    __table_args__ = (
+        Index("ix_auth_events_occurred_at", "occurred_at"),
+        Index("ix_auth_events_user_id_occurred_at", "user_id", "occurred_at"),
+        Index("ix_auth_events_email_occurred_at", "email", "occurred_at"),
+        Index("ix_auth_events_event_occurred_at", "event", "occurred_at"),
+    )
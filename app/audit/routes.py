@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select, or_, and_
+from app.extensions import db
+from app.audit.models import AuthEvent, EVENT_TYPES
+from app.audit.schemas import AuthEventOut
+from app.common.authz import roles_required
+from app.common.errors import ApiError
+from app.common.utils import decode_cursor, encode_cursor
+
+bp = Blueprint("audit", __name__)
+events_out = AuthEventOut(many=True)
+
+
+def _parse_dt(name: str):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ApiError("Invalid datetime.", 400, "validation_error", details={name: value})
+
+
+@bp.get("/events")
+@roles_required("admin")
+def list_events():
+    """Historique auth, plus récent d'abord; filtres user_id/email/event/since/until, pagination keyset."""
+    args = request.args
+    try:
+        per_page = min(max(int(args.get("per_page", 50)), 1), 200)
+    except ValueError:
+        raise ApiError("Invalid pagination params.", 400, "validation_error")
+
+    stmt = select(AuthEvent)
+    if args.get("user_id"):
+        try:
+            stmt = stmt.where(AuthEvent.user_id == uuid.UUID(args["user_id"]))
+        except ValueError:
+            raise ApiError("Invalid user_id.", 400, "validation_error", details={"user_id": args["user_id"]})
+    if args.get("email"):
+        stmt = stmt.where(AuthEvent.email == args["email"].strip().lower())
+    if args.get("event"):
+        if args["event"] not in EVENT_TYPES:
+            raise ApiError("Invalid event type.", 400, "validation_error", details={"event": list(EVENT_TYPES)})
+        stmt = stmt.where(AuthEvent.event == args["event"])
+    since, until = _parse_dt("since"), _parse_dt("until")
+    if since:
+        stmt = stmt.where(AuthEvent.occurred_at >= since)
+    if until:
+        stmt = stmt.where(AuthEvent.occurred_at < until)
+    if args.get("cursor"):
+        occurred_at, event_id = decode_cursor(args["cursor"], 2)
+        try:
+            occurred_at = datetime.fromisoformat(occurred_at)
+        except (TypeError, ValueError):
+            occurred_at = None
+        if occurred_at is None or type(event_id) is not int:  # bool exclu
+            raise ApiError("Invalid cursor.", 400, "validation_error", details={"cursor": args["cursor"]})
+        stmt = stmt.where(or_(
+            AuthEvent.occurred_at < occurred_at,
+            and_(AuthEvent.occurred_at == occurred_at, AuthEvent.id < event_id),
+        ))
+
+    rows = db.session.scalars(
+        stmt.order_by(AuthEvent.occurred_at.desc(), AuthEvent.id.desc()).limit(per_page)
+    ).all()
+    next_cursor = None
+    if len(rows) == per_page:
+        last = rows[-1]
+        next_cursor = encode_cursor([last.occurred_at.isoformat(), last.id])
+    return jsonify({
+        "status": "success",
+        "data": events_out.dump(rows),
+        "meta": {"per_page": per_page, "next_cursor": next_cursor},
+    }), 200
@@ -0,0 +1,13 @@
+from marshmallow import Schema, fields
+
+
+class AuthEventOut(Schema):
+    id = fields.Integer(required=True)
+    occurred_at = fields.DateTime(required=True)
+    event = fields.String(required=True)
+    user_id = fields.UUID(allow_none=True)
+    email = fields.String(allow_none=True)
+    ip = fields.String(allow_none=True)
+    user_agent = fields.String(allow_none=True)
+    reason = fields.String(allow_none=True)
+    jti = fields.String(allow_none=True)
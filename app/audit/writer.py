@@ -0,0 +1,162 @@
+# app/audit/writer.py
+# Write-behind: les routes auth empilent un événement en mémoire (O(1), sans I/O)
+# et un thread de fond les insère par lots (COPY sous psycopg, INSERT multi-lignes sinon).
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app, request, has_request_context
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.audit.models import AuthEvent
+
+log = logging.getLogger("app.audit")
+
+COLUMNS = ("occurred_at", "event", "user_id", "email", "ip", "user_agent", "reason", "jti")
+# Longueurs des colonnes texte: une valeur fournie par le client (email d'un login raté,
+# User-Agent) est coupée, sinon elle ferait échouer tout le lot sous Postgres
+MAX_LENGTHS = {c.name: c.type.length for c in AuthEvent.__table__.columns
+               if c.name in COLUMNS and getattr(c.type, "length", None)}
+_STOP = object()
+
+
+class AuditWriter:
+    def __init__(self, app):
+        cfg = app.config
+        self.app = app
+        self.mode = cfg["AUDIT_MODE"]  # "async" | "sync" | "off"
+        self.batch_size = cfg["AUDIT_BATCH_SIZE"]
+        self.flush_interval = cfg["AUDIT_FLUSH_INTERVAL"]
+        self.queue_max = cfg["AUDIT_QUEUE_MAX"]
+        self.dropped = 0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    # --- Producteur (chemin requête) ---
+    def record(self, row: dict) -> None:
+        if self.mode == "off":
+            return
+        if self.mode == "sync":
+            self.write([row])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Mémoire bornée: on perd l'événement plutôt que de ralentir la requête
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                log.warning("audit_queue_full", extra={"dropped": self.dropped})
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Nouveau process (ou worker forké): file et thread propres à ce process
+            self._queue = queue.Queue(maxsize=self.queue_max)
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            atexit.register(self.close)
+
+    # --- Consommateur ---
+    def _run(self) -> None:
+        q = self._queue
+        batch, deadline, stopping = [], None, False
+        while not stopping:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = q.get(timeout=timeout)
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                    deadline = deadline or time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self.write(batch)
+                batch, deadline = [], None
+
+    def write(self, rows: list[dict]) -> None:
+        rows = [{c: _fit(c, row.get(c)) for c in COLUMNS} for row in rows]
+        try:
+            self._insert(rows)
+            return
+        except Exception:
+            if len(rows) == 1:
+                # Audit best-effort: un événement perdu ne doit jamais casser l'auth
+                log.exception("audit_flush_failed", extra={"events": 1})
+                return
+            log.warning("audit_batch_failed", exc_info=True, extra={"events": len(rows)})
+        # Lot refusé: ligne par ligne, seules les lignes fautives sont perdues
+        failed = 0
+        for row in rows:
+            try:
+                self._insert([row])
+            except Exception:
+                failed += 1
+        if failed:
+            log.error("audit_flush_failed", extra={"events": failed, "batch": len(rows)})
+
+    def _insert(self, rows: list[dict]) -> None:
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                if conn.dialect.driver == "psycopg":
+                    raw = conn.connection.driver_connection
+                    with raw.cursor() as cur:
+                        with cur.copy(f"COPY {AuthEvent.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                            for row in rows:
+                                copy.write_row(tuple(row.values()))
+                else:
+                    conn.execute(insert(AuthEvent.__table__), rows)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Vide la file (arrêt du worker): dernier lot écrit avant la sortie du process."""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            log.warning("audit_close_queue_full")
+            return
+        self._thread.join(timeout)
+
+
+def _fit(column: str, value):
+    limit = MAX_LENGTHS.get(column)
+    return value[:limit] if limit and isinstance(value, str) else value
+
+
+def record_auth_event(event: str, user_id=None, email: str | None = None,
+                      reason: str | None = None, jti: str | None = None) -> None:
+    writer = current_app.extensions.get("audit")
+    if writer is None:
+        return
+    row = {
+        "occurred_at": datetime.now(timezone.utc),
+        "event": event,
+        "user_id": user_id,
+        "email": email,
+        "ip": None,
+        "user_agent": None,
+        "reason": reason,
+        "jti": jti,
+    }
+    if has_request_context():
+        row["ip"] = request.remote_addr
+        row["user_agent"] = request.headers.get("User-Agent") or None
+    writer.record(row)
+
+
+def init_audit(app) -> None:
+    app.extensions["audit"] = AuditWriter(app)
@@ -0,0 +1,240 @@
+# app/auth/breached.py
+# Mots de passe compromis, vérifiés hors ligne (aucun appel à un service externe).
+#
+# BREACHED_PASSWORDS_PATH: fichier binaire construit par `flask auth import-breached`
+# depuis le téléchargement HIBP "ordered by hash" (lignes SHA1HEX:COUNT):
+#   - en-tête (32 octets): magic, version, taille d'enregistrement, min_count, nombre,
+#     identifiant d'import (aléatoire, recopié dans le Bloom du même import);
+#   - table fanout: 65536 compteurs cumulés (uint64) indexés par les 2 premiers octets;
+#   - enregistrements triés: SHA-1 (20 octets) ou son préfixe (--prefix-bytes, >= 8).
+# Le fichier est ouvert en mmap lecture seule au démarrage: en preload gunicorn les
+# workers héritent du mapping, et de toute façon les pages viennent du page cache,
+# partagées par tous les process. Un contrôle = SHA-1 + fanout + recherche dichotomique
+# dans ~n/65536 enregistrements (14 sondes pour ~900M hashes): quelques microsecondes.
+#
+# Filtre de Bloom optionnel (<path>.bloom, ou BREACHED_PASSWORDS_BLOOM_PATH), mmappé
+# aussi: 1,8 à 3,6 octets par hash à 0,1 % de faux positifs, il reste en mémoire là où le
+# gros fichier est froid -> un mot de passe absent ne touche pas le fichier trié.
+# Un Bloom d'un autre import (identifiant différent) est ignoré: il donnerait des faux
+# négatifs, donc des mots de passe compromis acceptés.
+# Un nouvel import remplace les fichiers (os.replace): pris en compte au redémarrage.
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+from array import array
+
+from flask import current_app, has_app_context
+from marshmallow import ValidationError
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"BPWSHA1\0"
+BLOOM_MAGIC = b"BPWBLOOM"
+VERSION = 2
+HEADER = struct.Struct("<8sHHIQ8s")        # magic, version, record_size, min_count, count, build_id
+BLOOM_HEADER = struct.Struct("<8sHH4xQ8s")  # magic, version, k, m (bits, puissance de 2), build_id
+FANOUT = struct.Struct("<Q")
+FANOUT_SIZE = 1 << 16
+DATA_OFFSET = HEADER.size + FANOUT_SIZE * FANOUT.size
+MIN_RECORD_SIZE = 8  # 64 bits: ~n/2^64 de faux positifs, négligeable
+
+
+def _bloom_positions(digest: bytes, k: int, mask: int):
+    # Double hachage (Kirsch-Mitzenmacher) sur deux tranches du SHA-1
+    h1 = int.from_bytes(digest[0:8], "little")
+    h2 = int.from_bytes(digest[8:16], "little") | 1
+    for i in range(k):
+        yield (h1 + i * h2) & mask
+
+
+class BreachedPasswords:
+    """Lecture seule, thread-safe: mmap + recherche dichotomique (+ Bloom devant)."""
+
+    def __init__(self, path: str, bloom_path: str | None = None):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.record_size, self.min_count, self.count, self.build_id = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a breached-passwords file (flask auth import-breached)")
+        if len(self._mm) != DATA_OFFSET + self.count * self.record_size:
+            raise ValueError(f"{path}: truncated file")
+        if hasattr(mmap, "MADV_RANDOM"):
+            self._mm.madvise(mmap.MADV_RANDOM)  # accès dispersés: pas de readahead inutile
+        self._bloom = None
+        if bloom_path:
+            with open(bloom_path, "rb") as f:
+                bloom = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self.bloom_k, bits, build_id = BLOOM_HEADER.unpack_from(bloom, 0)
+            if magic != BLOOM_MAGIC or version != VERSION or len(bloom) != BLOOM_HEADER.size + bits // 8:
+                raise ValueError(f"{bloom_path}: not a bloom filter for breached passwords")
+            if build_id != self.build_id:
+                log.warning("breached_passwords_bloom_mismatch", extra={"path": bloom_path})
+                bloom.close()
+            else:
+                self._bloom, self._bloom_mask = bloom, bits - 1
+
+    def contains_digest(self, digest: bytes) -> bool:
+        mm = self._mm
+        if self._bloom is not None:
+            bloom, offset, mask = self._bloom, BLOOM_HEADER.size, self._bloom_mask
+            h1 = int.from_bytes(digest[0:8], "little")
+            h2 = int.from_bytes(digest[8:16], "little") | 1
+            for i in range(self.bloom_k):  # mêmes positions que _bloom_positions, sans générateur
+                pos = (h1 + i * h2) & mask
+                if not bloom[offset + (pos >> 3)] & (1 << (pos & 7)):
+                    return False
+        size = self.record_size
+        key = digest[:size]
+        bucket = int.from_bytes(digest[:2], "big")
+        lo = FANOUT.unpack_from(mm, HEADER.size + (bucket - 1) * FANOUT.size)[0] if bucket else 0
+        hi = FANOUT.unpack_from(mm, HEADER.size + bucket * FANOUT.size)[0]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = DATA_OFFSET + mid * size
+            record = mm[start:start + size]
+            if record < key:
+                lo = mid + 1
+            elif record > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def is_breached(self, password: str) -> bool:
+        return self.contains_digest(hashlib.sha1(password.encode("utf-8")).digest())
+
+    def close(self) -> None:
+        self._mm.close()
+        if self._bloom is not None:
+            self._bloom.close()
+
+
+def bloom_size(expected: int, fpr: float) -> tuple[int, int]:
+    """(m bits arrondi à une puissance de 2, k) pour `expected` éléments au taux `fpr`."""
+    bits = max(64, math.ceil(-expected * math.log(fpr) / math.log(2) ** 2))
+    bits = 1 << (bits - 1).bit_length()
+    # k optimal pour fpr (m arrondi vers le haut ne fait que baisser le taux réel)
+    k = max(1, min(16, math.ceil(-math.log2(fpr))))
+    return bits, k
+
+
+def build_breached_file(lines, path: str, record_size: int = 20, min_count: int = 1,
+                        bloom_path: str | None = None, expected: int | None = None,
+                        bloom_fpr: float = 0.001, progress=None) -> dict:
+    """Écrit le fichier trié (et le Bloom) depuis des lignes HIBP SHA1HEX[:COUNT] triées.
+
+    Écriture en flux (mémoire constante hors Bloom) dans des fichiers temporaires,
+    remplacés atomiquement à la fin. `expected` (borne haute du nombre de hashes)
+    dimensionne le Bloom; la CLI l'estime d'après la taille du fichier source.
+    """
+    if not MIN_RECORD_SIZE <= record_size <= 20:
+        raise ValueError(f"record_size must be between {MIN_RECORD_SIZE} and 20")
+    if bloom_path and not expected:
+        raise ValueError("expected is required to size the bloom filter")
+    counts = array("Q", bytes(FANOUT_SIZE * FANOUT.size))
+    build_id = os.urandom(8)
+    stats = {"records": 0, "skipped": 0}
+    bloom = bloom_file = None
+    if bloom_path:
+        bits, k = bloom_size(expected, bloom_fpr)
+        bloom_file = open(bloom_path + ".tmp", "wb+")
+        bloom_file.truncate(BLOOM_HEADER.size + bits // 8)
+        bloom = mmap.mmap(bloom_file.fileno(), 0)
+        bloom[:BLOOM_HEADER.size] = BLOOM_HEADER.pack(BLOOM_MAGIC, VERSION, k, bits, build_id)
+        stats.update(bloom_bits=bits, bloom_k=k)
+    try:
+        with open(path + ".tmp", "wb") as out:
+            out.seek(DATA_OFFSET)
+            buffer = bytearray()
+            previous, last_record = b"", None
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                hexdigest, _, count = line.partition(":")
+                if len(hexdigest) != 40:
+                    raise ValueError(f"line {number}: expected a SHA-1 hash (40 hex digits)")
+                digest = bytes.fromhex(hexdigest)
+                if digest < previous:
+                    raise ValueError(f"line {number}: input is not sorted by hash "
+                                     "(use the HIBP 'ordered by hash' download)")
+                previous = digest
+                if count and int(count) < min_count:
+                    stats["skipped"] += 1
+                    continue
+                if bloom is not None:
+                    offset = BLOOM_HEADER.size
+                    for pos in _bloom_positions(digest, k, bits - 1):
+                        bloom[offset + (pos >> 3)] |= 1 << (pos & 7)
+                record = digest[:record_size]
+                if record == last_record:  # même préfixe après troncature
+                    continue
+                last_record = record
+                buffer += record
+                counts[int.from_bytes(digest[:2], "big")] += 1
+                stats["records"] += 1
+                if len(buffer) >= 1 << 20:
+                    out.write(buffer)
+                    buffer.clear()
+                if progress and number % 10_000_000 == 0:
+                    progress(number, stats)
+            out.write(buffer)
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, VERSION, record_size, min_count, stats["records"], build_id))
+            total = 0
+            for i in range(FANOUT_SIZE):
+                total += counts[i]
+                counts[i] = total
+            out.write(struct.pack(f"<{FANOUT_SIZE}Q", *counts))
+            out.flush()
+            os.fsync(out.fileno())
+        if bloom is not None:
+            bloom.flush()
+            bloom.close()
+            bloom = None
+            os.fsync(bloom_file.fileno())
+            bloom_file.close()
+            os.replace(bloom_path + ".tmp", bloom_path)
+        os.replace(path + ".tmp", path)
+    except BaseException:
+        for tmp in (path + ".tmp", bloom_path and bloom_path + ".tmp"):
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+    finally:
+        if bloom is not None:
+            bloom.close()
+        if bloom_file is not None and not bloom_file.closed:
+            bloom_file.close()
+    stats["bytes"] = DATA_OFFSET + stats["records"] * record_size
+    return stats
+
+
+def init_breached_passwords(app) -> BreachedPasswords | None:
+    """Ouvre BREACHED_PASSWORDS_PATH (mmap) au démarrage; non défini = pas de contrôle."""
+    path = app.config.get("BREACHED_PASSWORDS_PATH")
+    if not path:
+        return None
+    if not os.path.exists(path):
+        # Pas d'échec au démarrage: `flask auth import-breached` doit pouvoir le créer
+        log.warning("breached_passwords_missing", extra={"path": path})
+        return None
+    bloom_path = app.config.get("BREACHED_PASSWORDS_BLOOM_PATH") or path + ".bloom"
+    checker = BreachedPasswords(path, bloom_path if os.path.exists(bloom_path) else None)
+    app.extensions["breached_passwords"] = checker
+    return checker
+
+
+def is_breached(password: str) -> bool:
+    checker = current_app.extensions.get("breached_passwords") if has_app_context() else None
+    return checker is not None and checker.is_breached(password)
+
+
+def not_breached(password: str) -> None:
+    """Validateur marshmallow des champs "nouveau mot de passe" (register, reset, import...)."""
+    if is_breached(password):
+        raise ValidationError("This password has appeared in a data breach; choose a different one.")
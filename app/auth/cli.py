@@ -0,0 +1,62 @@
+# app/auth/cli.py
+# Commandes "flask auth ..." (enregistrées dans create_app).
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.auth.breached import MIN_RECORD_SIZE, build_breached_file
+
+auth_cli = AppGroup("auth", help="Authentification et politique de mots de passe.")
+
+HIBP_MIN_LINE = 43  # 40 hex + ":" + 1 chiffre + "\n": borne haute du nombre de lignes
+
+
+@auth_cli.command("import-breached")
+@click.argument("source", type=click.File("r", encoding="ascii"))
+@click.option("--out", "out", type=click.Path(dir_okay=False), default=None,
+              help="Fichier à écrire (défaut: BREACHED_PASSWORDS_PATH).")
+@click.option("--prefix-bytes", type=click.IntRange(MIN_RECORD_SIZE, 20), default=20, show_default=True,
+              help="Octets du SHA-1 gardés par hash (8 = fichier 2,5x plus petit).")
+@click.option("--min-count", default=1, show_default=True, help="Ignorer les hashes vus moins de N fois.")
+@click.option("--bloom/--no-bloom", default=True, show_default=True, help="Écrire aussi <out>.bloom.")
+@click.option("--bloom-fpr", type=click.FloatRange(0, 1, min_open=True, max_open=True), default=0.001,
+              show_default=True, help="Taux de faux positifs visé du filtre de Bloom.")
+@click.option("--expected", type=int, default=None,
+              help="Nombre max de hashes (dimensionne le Bloom; défaut: estimé d'après la taille de SOURCE).")
+def import_breached(source, out, prefix_bytes, min_count, bloom, bloom_fpr, expected):
+    """Construit le fichier de mots de passe compromis depuis SOURCE (HIBP "ordered by hash",
+    lignes SHA1HEX:COUNT; "-" = stdin, ex: 7z x -so pwned-passwords-sha1-ordered-by-hash.7z)."""
+    out = out or current_app.config.get("BREACHED_PASSWORDS_PATH")
+    if not out:
+        raise click.UsageError("--out is required when BREACHED_PASSWORDS_PATH is not set.")
+    default_bloom = current_app.config.get("BREACHED_PASSWORDS_BLOOM_PATH") or out + ".bloom"
+    bloom_path = default_bloom if bloom else None
+    if bloom_path and not expected:
+        try:
+            size = os.fstat(source.fileno()).st_size  # 0 pour un pipe
+        except (OSError, ValueError):
+            size = 0
+        expected = -(-size // HIBP_MIN_LINE)
+        if not expected:
+            raise click.UsageError("--expected is required to size the bloom filter when reading a stream.")
+
+    t0 = time.perf_counter()
+
+    def progress(lines, stats):
+        click.echo(f"[auth import-breached] {lines} lines, {stats['records']} records", err=True)
+
+    try:
+        stats = build_breached_file(source, out, record_size=prefix_bytes, min_count=min_count,
+                                    bloom_path=bloom_path, expected=expected, bloom_fpr=bloom_fpr,
+                                    progress=progress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if not bloom and os.path.exists(default_bloom):
+        # Le filtre d'un import précédent ne couvre pas ce fichier (il serait ignoré de toute façon)
+        os.remove(default_bloom)
+    stats["seconds"] = round(time.perf_counter() - t0, 1)
+    click.echo(f"[auth import-breached] done: {out} " + " ".join(f"{k}={v}" for k, v in stats.items()))
+    click.echo("[auth import-breached] restart the app to load the new file.")
@@ -0,0 +1,70 @@
+# app/auth/introspection.py
+# Introspection de tokens (style RFC 7662) pour la gateway: vérification de signature
+# et d'expiration en local, révocation (jti, comptes supprimés) vérifiée pour tout le lot
+# par requêtes IN (...).
+# Du user seul deleted_at est lu: on renvoie les claims compacts portés par le token.
+import hmac
+import uuid
+from flask import current_app, request
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import InvalidTokenError
+from sqlalchemy import select
+
+from app.extensions import db
+from app.auth.models import TokenBlocklist
+from app.users.models import User
+from app.common.errors import ApiError
+from app.auth.service import token_epoch
+
+INACTIVE = {"active": False}
+CLAIMS = ("sub", "jti", "exp", "iat", "nbf", "iss", "aud", "role", "is_active", "fresh")
+
+
+def require_introspection_key() -> None:
+    """Appelant authentifié par clé d'API (INTROSPECTION_API_KEYS); désactivé si aucune clé."""
+    keys = current_app.config.get("INTROSPECTION_API_KEYS") or []
+    if not keys:
+        raise ApiError("Introspection is disabled.", 403, "forbidden")
+    given = request.headers.get("X-Introspection-Key", "")
+    # compare_digest sur chaque clé: temps constant, rotation possible (plusieurs clés)
+    if not any(hmac.compare_digest(given.encode(), key.encode()) for key in keys):
+        raise ApiError("Invalid introspection key.", 401, "invalid_client")
+
+
+def _decode(token: str) -> dict | None:
+    try:
+        return decode_token(token)
+    except (InvalidTokenError, JWTExtendedException, ValueError):
+        return None  # signature, expiration, format: simplement inactif
+
+
+def _user_id(claims: dict) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(claims.get("sub"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def introspect_tokens(tokens: list[str]) -> list[dict]:
+    decoded = [_decode(t) for t in tokens]
+    jtis = {c["jti"] for c in decoded if c and c.get("jti")}
+    revoked = set()
+    if jtis:
+        revoked = set(db.session.scalars(select(TokenBlocklist.jti).where(TokenBlocklist.jti.in_(jtis))))
+    subs = {_user_id(c) for c in decoded if c} - {None}
+    epochs = {}
+    if subs:
+        # Comptes supprimés (deleted_at posé ou ligne purgée): tous leurs tokens sont inactifs
+        epochs = dict(db.session.execute(
+            select(User.id, User.token_epoch).where(User.id.in_(subs), User.deleted_at.is_(None))).all())
+    results = []
+    for claims in decoded:
+        if (claims is None or claims.get("jti") in revoked
+                or epochs.get(_user_id(claims), -1) != token_epoch(claims)):
+            results.append(dict(INACTIVE))
+            continue
+        out = {"active": True, "token_type": claims.get("type")}
+        out.update((k, claims[k]) for k in CLAIMS if k in claims)
+        results.append(out)
+    return results
@@ -0,0 +1,58 @@
+# app/auth/jobs.py
+# Jobs auth exécutés hors requête (voir app.jobs.queue).
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from app.extensions import db
+from app.users.models import User
+from app.auth.models import TokenBlocklist
+from app.auth.service import make_email_verification_token, make_password_reset_token
+from app.common.mailer import send_mail
+from app.jobs.queue import job
+
+
+def _link(path: str, token: str) -> str:
+    return f"{current_app.config['APP_PUBLIC_URL'].rstrip('/')}{path}?token={quote(token)}"
+
+
+@job("auth.send_verification_email")
+def send_verification_email(user_id: str) -> None:
+    user = db.session.get(User, uuid.UUID(user_id))
+    if user is None or user.email_verified_at is not None:
+        return
+    hours = current_app.config["EMAIL_VERIFY_TOKEN_HOURS"]
+    send_mail(user.email, "Confirm your email address",
+              f"Confirm your email address (link valid {hours} h):\n\n"
+              f"{_link('/verify-email', make_email_verification_token(user))}\n")
+
+
+@job("auth.send_password_reset")
+def send_password_reset(email: str) -> None:
+    # Email inconnu, compte désactivé ou supprimé: rien (la route a déjà répondu 202 dans tous les cas)
+    user = User.query.filter_by(email=email).filter(User.deleted_at.is_(None)).first()
+    if user is None or not user.is_active:
+        return
+    minutes = current_app.config["PASSWORD_RESET_TOKEN_MINUTES"]
+    send_mail(user.email, "Reset your password",
+              f"Reset your password (link valid {minutes} min, single use):\n\n"
+              f"{_link('/reset-password', make_password_reset_token(user))}\n"
+              "If you did not ask for this, ignore this email.\n")
+
+
+@job("auth.prune_blocklist", every="TOKEN_BLOCKLIST_PRUNE_INTERVAL")
+def prune_blocklist(batch_size: int = 1000) -> None:
+    """Supprime les JTI révoqués dont le token a de toute façon expiré (par lots)."""
+    cfg = current_app.config
+    lifetime = max(cfg["JWT_ACCESS_TOKEN_EXPIRES"], cfg["JWT_REFRESH_TOKEN_EXPIRES"])
+    cutoff = datetime.now(timezone.utc) - lifetime - timedelta(hours=1)  # marge d'horloge
+    while True:
+        ids = select(TokenBlocklist.id).where(TokenBlocklist.revoked_at < cutoff).limit(batch_size)
+        stmt = delete(TokenBlocklist).where(TokenBlocklist.id.in_(ids)).execution_options(synchronize_session=False)
+        deleted = db.session.execute(stmt).rowcount
+        db.session.commit()
+        if deleted < batch_size:
+            return
@@ -0,0 +1,149 @@
+# app/auth/keys.py
+# Signature asymétrique des JWT (RS256 / EdDSA) avec rotation de clés + JWKS public.
+#
+# JWT_KEYS_DIR contient un fichier PEM par clé, nommé <kid>.pem:
+#   - clé privée  -> peut signer (la clé active: JWT_ACTIVE_KID, défaut = plus grand kid privé)
+#   - clé publique -> vérification seule (ancienne clé retirée de la signature)
+# Toutes les clés sont publiées dans /.well-known/jwks.json: les autres services
+# vérifient les tokens localement (kid du header -> clé) sans appeler /auth/me.
+#
+# Rotation: déposer la nouvelle clé, attendre JWKS_MAX_AGE (caches des consommateurs),
+# basculer JWT_ACTIVE_KID, puis retirer l'ancienne après JWT_REFRESH_DAYS.
+# Génération: openssl genpkey -algorithm ed25519 -out 2026-10.pem
+#             (ou -algorithm RSA -pkeyopt rsa_keygen_bits:2048)
+# Sans JWT_KEYS_DIR: HS256 + JWT_SECRET_KEY comme avant, JWKS vide.
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from flask import Response, current_app, request
+from jwt import InvalidTokenError
+from jwt.algorithms import get_default_algorithms
+
+from app.extensions import jwt
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    alg: str                 # "RS256" | "EdDSA"
+    public_key: object
+    private_key: object | None = None
+
+
+def _alg_for(public_key) -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    raise ValueError(f"Unsupported key type: {type(public_key).__name__} (RSA or Ed25519 expected)")
+
+
+def load_key(kid: str, pem: bytes) -> SigningKey:
+    if b"PRIVATE KEY" in pem:
+        private_key = serialization.load_pem_private_key(pem, password=None)
+        public_key = private_key.public_key()
+    else:
+        private_key, public_key = None, serialization.load_pem_public_key(pem)
+    return SigningKey(kid=kid, alg=_alg_for(public_key), public_key=public_key, private_key=private_key)
+
+
+class KeyRing:
+    def __init__(self, keys: list[SigningKey], active_kid: str | None = None):
+        self.keys = {k.kid: k for k in keys}
+        signers = sorted(k.kid for k in keys if k.private_key is not None)
+        if active_kid and active_kid not in signers:
+            raise ValueError(f"JWT_ACTIVE_KID={active_kid!r}: no private key with this kid")
+        self.active = self.keys[active_kid or signers[-1]] if signers else None
+        self._jwks = self._build_jwks()
+
+    @classmethod
+    def from_dir(cls, path: str, active_kid: str | None = None) -> "KeyRing":
+        keys = []
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".pem"):
+                with open(os.path.join(path, name), "rb") as f:
+                    keys.append(load_key(name[:-4], f.read()))
+        return cls(keys, active_kid)
+
+    @property
+    def algorithms(self) -> list[str]:
+        return sorted({k.alg for k in self.keys.values()})
+
+    def _build_jwks(self) -> tuple[bytes, str]:
+        # Calculé une fois: la réponse est servie telle quelle (+ ETag)
+        algorithms = get_default_algorithms()
+        jwks = []
+        for key in self.keys.values():
+            jwk = algorithms[key.alg].to_jwk(key.public_key, as_dict=True)
+            jwk.update(kid=key.kid, alg=key.alg, use="sig")
+            jwks.append(jwk)
+        body = json.dumps({"keys": jwks}, separators=(",", ":"), sort_keys=True).encode()
+        return body, hashlib.sha256(body).hexdigest()[:32]
+
+    def jwks(self) -> tuple[bytes, str]:
+        return self._jwks
+
+    def verification_key(self, header: dict):
+        kid = header.get("kid")
+        if kid is None:
+            # Tokens HS256 émis avant le passage aux clés asymétriques (transition)
+            if header.get("alg") == "HS256" and current_app.config.get("JWT_ACCEPT_LEGACY_HS256"):
+                return current_app.config["JWT_SECRET_KEY"]
+            raise InvalidTokenError("Missing key id (kid) in token header")
+        key = self.keys.get(kid)
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        if header.get("alg") != key.alg:
+            # Pas de confusion d'algorithme: le kid fixe l'algorithme attendu
+            raise InvalidTokenError("Token algorithm does not match its key")
+        return key.public_key
+
+
+def _keyring() -> KeyRing | None:
+    return current_app.extensions.get("jwt_keyring")
+
+
+@jwt.encode_key_loader
+def _encode_key(identity):
+    ring = _keyring()
+    return ring.active.private_key if ring else current_app.config["JWT_SECRET_KEY"]
+
+
+@jwt.decode_key_loader
+def _decode_key(jwt_header, jwt_payload):
+    ring = _keyring()
+    return ring.verification_key(jwt_header) if ring else current_app.config["JWT_SECRET_KEY"]
+
+
+@jwt.additional_headers_loader
+def _kid_header(identity) -> dict:
+    ring = _keyring()
+    return {"kid": ring.active.kid} if ring else {}
+
+
+def init_keyring(app) -> KeyRing | None:
+    """Charge JWT_KEYS_DIR (si défini), règle les algorithmes JWT et expose le JWKS."""
+    path = app.config.get("JWT_KEYS_DIR")
+    ring = None
+    if path:
+        ring = KeyRing.from_dir(path, app.config.get("JWT_ACTIVE_KID"))
+        if ring.active is None:
+            raise RuntimeError(f"JWT_KEYS_DIR={path}: no private key to sign with")
+        app.config["JWT_ALGORITHM"] = ring.active.alg
+        decode = ring.algorithms + (["HS256"] if app.config.get("JWT_ACCEPT_LEGACY_HS256") else [])
+        app.config["JWT_DECODE_ALGORITHMS"] = decode
+        app.extensions["jwt_keyring"] = ring
+
+    @app.get("/.well-known/jwks.json")
+    def jwks():
+        body, etag = ring.jwks() if ring else (b'{"keys":[]}', "empty")
+        resp = Response(body, mimetype="application/json")
+        resp.headers["Cache-Control"] = f"public, max-age={app.config.get('JWKS_MAX_AGE', 300)}"
+        resp.set_etag(etag)
+        return resp.make_conditional(request)  # If-None-Match -> 304
+
+    return ring
@@ -6,8 +6,16 @@ from flask_jwt_extended import (
 from app.extensions import db, limiter
 from app.users.models import User
 from app.auth.models import TokenBlocklist
-from app.auth.schemas import RegisterSchema, LoginSchema, TokensOut, MeOut
+from app.auth.schemas import (RegisterSchema, LoginSchema, TokensOut, MeOut, IntrospectSchema, TokenSchema,
+                              PasswordResetRequestSchema, PasswordResetConfirmSchema)
+from app.auth.service import confirm_email, normalize_email, reset_password, token_claims
+from app.jobs.queue import enqueue
+from app.auth.introspection import introspect_tokens, require_introspection_key
 from app.common.errors import ApiError
+from app.common.routing import mark_primary_reads
+from app.common.idempotency import idempotent
+from app.audit import models as audit
+from app.audit.writer import record_auth_event
 from datetime import datetime, timezone
 import uuid
 from app.extensions import db
@@ -18,10 +26,14 @@ register_schema = RegisterSchema()
 login_schema = LoginSchema()
 tokens_out = TokensOut()
 me_out = MeOut()
+introspect_schema = IntrospectSchema()
+token_schema = TokenSchema()
+reset_request_schema = PasswordResetRequestSchema()
+reset_confirm_schema = PasswordResetConfirmSchema()
 
 def _issue_tokens(user: User, fresh: bool = True) -> dict:
     identity = str(user.id)
-    claims = {"role": user.role, "is_active": user.is_active}
+    claims = token_claims(user)
     access_token = create_access_token(identity=identity, additional_claims=claims, fresh=fresh)
     refresh_token = create_refresh_token(identity=identity, additional_claims=claims)
     return {"access_token": access_token, "refresh_token": refresh_token}
@@ -30,6 +42,7 @@ from sqlalchemy.exc import IntegrityError
 
 @bp.post("/register")
 @limiter.limit("10 per hour")
+@idempotent("auth.register", replay_body=False)  # réponse = JWT: jamais stockée
 def register():
     payload = request.get_json(silent=True) or {}
     data = register_schema.load(payload)
@@ -41,18 +54,24 @@ def register():
     except IntegrityError:
         db.session.rollback()
         raise ApiError("Email already exists.", 409, "conflict", details={"email": user.email})
-    access_token = create_access_token(identity=str(user.id), additional_claims={"role": user.role, "is_active": user.is_active}, fresh=True)
-    refresh_token = create_refresh_token(identity=str(user.id))
-    return jsonify({"access_token": access_token, "refresh_token": refresh_token}), 201
+    # Le client enchaîne souvent sur /me: lire ce user sur le primaire
+    mark_primary_reads(user.id)
+    enqueue("auth.send_verification_email", user_id=str(user.id))
+    return jsonify(_issue_tokens(user, fresh=True)), 201
 
 @bp.post("/login")
 @limiter.limit("5 per minute")  # anti brute force
 def login():
     payload = request.get_json(silent=True) or {}
     data = login_schema.load(payload)
-    from app.auth.service import authenticate_user
-    user = authenticate_user(data["email"], data["password"])
+    from app.auth.service import authenticate_user, normalize_email
+    try:
+        user = authenticate_user(data["email"], data["password"])
+    except ApiError as e:
+        record_auth_event(audit.LOGIN_FAILED, email=normalize_email(data["email"]), reason=e.code)
+        raise
     toks = _issue_tokens(user, fresh=True)
+    record_auth_event(audit.LOGIN, user_id=user.id, email=user.email)
     return jsonify(tokens_out.dump(toks)), 200
 
 @bp.post("/refresh")
@@ -69,8 +88,8 @@ def refresh():
     if not user or not user.is_active:
         raise ApiError("User not found or inactive.", 403, "user_inactive")
 
-    claims = {"role": user.role, "is_active": user.is_active}
-    access_token = create_access_token(identity=identity, additional_claims=claims, fresh=False)
+    access_token = create_access_token(identity=identity, additional_claims=token_claims(user), fresh=False)
+    record_auth_event(audit.REFRESH, user_id=user.id, jti=j["jti"])
     return jsonify({"access_token": access_token}), 200
 
 
@@ -92,6 +111,7 @@ def me():
         "email": user.email,
         "role": user.role,
         "is_active": user.is_active,
+        "email_verified_at": user.email_verified_at,
         "created_at": user.created_at,
     }
     return jsonify(me_out.dump(data)), 200
@@ -104,4 +124,64 @@ def logout():
     ttype = j["type"]  # "access" ou "refresh"
     db.session.add(TokenBlocklist(jti=jti, token_type=ttype, revoked_at=datetime.now(timezone.utc)))
     db.session.commit()
+    try:
+        uid = uuid.UUID(j["sub"])
+    except Exception:
+        uid = None
+    record_auth_event(audit.LOGOUT, user_id=uid, jti=jti)
     return jsonify({"status": "success", "message": f"{ttype} token revoked"}), 200
+
+
+@bp.post("/introspect")
+def introspect():
+    """
+    Body JSON ou form: {"token": "..."} -> {"active": ...}
+                       {"tokens": [...]} -> {"results": [{"active": ...}, ...]} (même ordre)
+    """
+    require_introspection_key()
+    payload = request.get_json(silent=True)
+    if payload is None:
+        payload = {"token": request.form["token"]} if "token" in request.form else {}
+    data = introspect_schema.load(payload)
+    if "token" in data:
+        body = introspect_tokens([data["token"]])[0]
+    else:
+        body = {"results": introspect_tokens(data["tokens"])}
+    resp = jsonify(body)
+    resp.headers["Cache-Control"] = "no-store"  # RFC 7662: la gateway gère son propre cache
+    return resp, 200
+
+
+# --- Vérification d'email / reset de mot de passe: mails envoyés par un job ---
+@bp.post("/verify-email")
+@jwt_required()
+@limiter.limit("5 per hour")
+def request_email_verification():
+    enqueue("auth.send_verification_email", user_id=get_jwt_identity())
+    return jsonify({"status": "accepted"}), 202
+
+@bp.post("/verify-email/confirm")
+@limiter.limit("20 per hour")
+def confirm_email_verification():
+    data = token_schema.load(request.get_json(silent=True) or {})
+    user = confirm_email(data["token"])
+    return jsonify({"status": "success", "email_verified_at": user.email_verified_at.isoformat()}), 200
+
+@bp.post("/password-reset")
+@limiter.limit("5 per hour")
+def request_password_reset():
+    payload = request.get_json(silent=True) or {}
+    if isinstance(payload.get("email"), str):
+        payload["email"] = normalize_email(payload["email"])  # avant validation (espaces, casse)
+    data = reset_request_schema.load(payload)
+    # Toujours 202, sans lecture DB: ne révèle pas si l'email existe
+    enqueue("auth.send_password_reset", email=data["email"])
+    return jsonify({"status": "accepted"}), 202
+
+@bp.post("/password-reset/confirm")
+@limiter.limit("10 per hour")
+def confirm_password_reset():
+    data = reset_confirm_schema.load(request.get_json(silent=True) or {})
+    user = reset_password(data["token"], data["password"])
+    record_auth_event(audit.PASSWORD_RESET, user_id=user.id, email=user.email)
+    return jsonify({"status": "success"}), 200
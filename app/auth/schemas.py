@@ -1,11 +1,16 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
+
+from app.auth.breached import not_breached
+
+# Tout champ "nouveau mot de passe" (register, reset, import, futur changement) passe par ici
+NEW_PASSWORD_RULES = [validate.Length(min=8, max=128), not_breached]
 
 class RegisterSchema(Schema):
     email = fields.Email(required=True, validate=validate.Length(max=320))
-    password = fields.String(required=True, load_only=True, validate=validate.Length(min=8, max=128))
+    password = fields.String(required=True, load_only=True, validate=NEW_PASSWORD_RULES)
 
 class LoginSchema(Schema):
-    email = fields.Email(required=True)
+    email = fields.Email(required=True, validate=validate.Length(max=320))
     password = fields.String(required=True, load_only=True)
 
 class TokensOut(Schema):
@@ -17,4 +22,25 @@ class MeOut(Schema):
     email = fields.Email(required=True)
     role = fields.String(required=True)
     is_active = fields.Boolean(required=True)
+    email_verified_at = fields.DateTime(allow_none=True)
     created_at = fields.DateTime(required=True)
+
+class IntrospectSchema(Schema):
+    # RFC 7662: "token"; extension batch: "tokens" (une seule requête pour la gateway)
+    token = fields.String(validate=validate.Length(min=1, max=8192))
+    tokens = fields.List(fields.String(validate=validate.Length(min=1, max=8192)),
+                         validate=validate.Length(min=1, max=100))
+
+    @validates_schema
+    def _one_of(self, data, **kwargs):
+        if ("token" in data) == ("tokens" in data):
+            raise ValidationError("Provide either 'token' or 'tokens'.", "_schema")
+
+class TokenSchema(Schema):
+    token = fields.String(required=True, validate=validate.Length(min=1, max=1024))
+
+class PasswordResetRequestSchema(Schema):
+    email = fields.Email(required=True, validate=validate.Length(max=320))
+
+class PasswordResetConfirmSchema(TokenSchema):
+    password = fields.String(required=True, load_only=True, validate=NEW_PASSWORD_RULES)
@@ -1,6 +1,14 @@
+import hashlib
+import hmac
+import uuid
+from datetime import datetime, timezone
+from flask import current_app
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from sqlalchemy import exists, literal, or_, select
 from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.users.models import User
+from app.auth.models import TokenBlocklist
 from app.common.errors import ApiError
 
 def normalize_email(email: str) -> str:
@@ -26,6 +34,101 @@ def authenticate_user(email: str, password: str) -> User:
     user: User | None = User.query.filter_by(email=email_n).first()
     if not user or not user.check_password(password):
         raise ApiError("Invalid credentials.", 401, "invalid_credentials")
+    if user.deleted_at is not None:
+        raise ApiError("Invalid credentials.", 401, "invalid_credentials")
     if not user.is_active:
         raise ApiError("User is deactivated.", 403, "user_inactive")
     return user
+
+
+EPOCH_CLAIM = "epoch"
+
+
+def token_claims(user: User) -> dict:
+    """Claims additionnels des access et refresh tokens."""
+    return {"role": user.role, "is_active": user.is_active, EPOCH_CLAIM: user.token_epoch}
+
+
+def token_epoch(claims: dict) -> int | None:
+    # Tokens émis avant l'introduction du claim: epoch 0
+    try:
+        return int(claims.get(EPOCH_CLAIM, 0))
+    except (TypeError, ValueError):
+        return None
+
+
+def token_revoked_statement(claims: dict):
+    """
+    SELECT booléen pour le contrôle de révocation de chaque requête authentifiée:
+    jti dans la blocklist OU compte supprimé (users.deleted_at posé, ou ligne déjà
+    purgée) OU mot de passe changé depuis l'émission (users.token_epoch), en un aller-retour.
+    """
+    revoked = exists().where(TokenBlocklist.jti == claims.get("jti"))
+    try:
+        user_id = uuid.UUID(claims.get("sub"))
+    except (TypeError, ValueError, AttributeError):
+        return select(revoked)
+    epoch = token_epoch(claims)
+    if epoch is None:
+        return select(literal(True))
+    alive = exists().where(User.id == user_id, User.deleted_at.is_(None), User.token_epoch == epoch)
+    return select(or_(revoked, ~alive))
+
+
+# --- Vérification d'email / reset de mot de passe (liens signés, sans table) ---
+_VERIFY_SALT = "email-verify"
+_RESET_SALT = "password-reset"
+
+
+def _serializer(salt: str) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt=salt)
+
+
+def _load_token(salt: str, token: str, max_age: int) -> dict:
+    try:
+        return _serializer(salt).loads(token, max_age=max_age)
+    except SignatureExpired:
+        raise ApiError("Token has expired.", 400, "token_expired")
+    except BadSignature:
+        raise ApiError("Invalid token.", 400, "token_invalid")
+
+
+def _password_fingerprint(user: User) -> str:
+    # Change avec le mot de passe: un lien de reset ne sert qu'une fois
+    return hashlib.sha256(user.password_hash.encode()).hexdigest()[:16]
+
+
+def make_email_verification_token(user: User) -> str:
+    return _serializer(_VERIFY_SALT).dumps({"uid": str(user.id), "email": user.email})
+
+
+def confirm_email(token: str) -> User:
+    data = _load_token(_VERIFY_SALT, token, current_app.config["EMAIL_VERIFY_TOKEN_HOURS"] * 3600)
+    user = db.session.get(User, uuid.UUID(data["uid"]))
+    if not user or user.email != data["email"]:
+        raise ApiError("Invalid token.", 400, "token_invalid")
+    if user.email_verified_at is None:
+        user.email_verified_at = datetime.now(timezone.utc)
+        db.session.commit()
+    return user
+
+
+def make_password_reset_token(user: User) -> str:
+    return _serializer(_RESET_SALT).dumps({"uid": str(user.id), "pw": _password_fingerprint(user)})
+
+
+def reset_password(token: str, new_password: str) -> User:
+    data = _load_token(_RESET_SALT, token, current_app.config["PASSWORD_RESET_TOKEN_MINUTES"] * 60)
+    user = db.session.get(User, uuid.UUID(data["uid"]))
+    if (not user or user.deleted_at is not None
+            or not hmac.compare_digest(_password_fingerprint(user), data["pw"])):
+        raise ApiError("Invalid token.", 400, "token_invalid")
+    change_password(user, new_password)
+    db.session.commit()
+    return user
+
+
+def change_password(user: User, new_password: str) -> None:
+    """Nouveau hash + révocation de tous les tokens existants, dans la transaction de l'appelant."""
+    user.set_password(new_password)
+    user.token_epoch = User.token_epoch + 1  # incrément SQL: pas de perte sur deux resets concurrents
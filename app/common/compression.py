@@ -0,0 +1,181 @@
+# app/common/compression.py
+# Compression des réponses (zstd / br / gzip selon Accept-Encoding).
+# Brotli et zstd sont optionnels: activés seulement si les modules sont installés.
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # optionnel
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optionnel
+    zstandard = None
+
+# Préférence serveur à qualité égale: zstd et br compressent mieux que gzip pour moins de CPU
+AVAILABLE_ENCODINGS = tuple(
+    name for name, module in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if module is not None
+)
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(AVAILABLE_ENCODINGS)
+
+
+def _compressor(encoding: str, config):
+    """Objet avec .compress(bytes) / .sync() (bloc terminé, décodable tel quel) / .flush() (fin)."""
+    if encoding == "gzip":
+        return _GzipStream(zlib.compressobj(config["COMPRESS_GZIP_LEVEL"], zlib.DEFLATED, 31))
+    if encoding == "br":
+        return _BrotliStream(brotli.Compressor(quality=config["COMPRESS_BROTLI_QUALITY"]))
+    if encoding == "zstd":
+        return _ZstdStream(zstandard.ZstdCompressor(level=config["COMPRESS_ZSTD_LEVEL"]).compressobj())
+    raise ValueError(encoding)
+
+
+class _GzipStream:
+    def __init__(self, c):
+        self._c = c
+
+    def compress(self, data):
+        return self._c.compress(data)
+
+    def sync(self):
+        return self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def flush(self):
+        return self._c.flush()
+
+
+class _BrotliStream:
+    def __init__(self, c):
+        self._c = c
+
+    def compress(self, data):
+        return self._c.process(data)
+
+    def sync(self):
+        return self._c.flush()
+
+    def flush(self):
+        return self._c.finish()
+
+
+class _ZstdStream:
+    def __init__(self, c):
+        self._c = c
+
+    def compress(self, data):
+        return self._c.compress(data)
+
+    def sync(self):
+        return self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def flush(self):
+        return self._c.flush()
+
+
+def compress_bytes(data: bytes, encoding: str, config) -> bytes:
+    c = _compressor(encoding, config)
+    return c.compress(data) + c.flush()
+
+
+def compress_stream(chunks, encoding: str, config):
+    # Chaque chunk produit est flushé pour que le client reçoive les données au fil de l'eau
+    c = _compressor(encoding, config)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        out = c.compress(chunk) + c.sync()
+        if out:
+            yield out
+    tail = c.flush()
+    if tail:
+        yield tail
+
+
+class CompressedCache:
+    """LRU des corps déjà compressés, clé = (encoding, empreinte du corps), borné en octets."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, data: bytes, encoding: str, config) -> bytes:
+        if self.max_bytes <= 0:
+            return compress_bytes(data, encoding, config)
+        key = (encoding, hashlib.blake2b(data, digest_size=16).digest())
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None:
+                self._items.move_to_end(key)
+                return hit
+        out = compress_bytes(data, encoding, config)
+        with self._lock:
+            if key not in self._items and len(out) <= self.max_bytes:
+                self._items[key] = out
+                self._size += len(out)
+                while self._size > self.max_bytes:
+                    _, old = self._items.popitem(last=False)
+                    self._size -= len(old)
+        return out
+
+
+def is_compressible(mimetype: str | None, config) -> bool:
+    return bool(mimetype) and mimetype in config["COMPRESS_MIMETYPES"]
+
+
+def skip_compression(status: int, headers, mimetype: str | None, config) -> bool:
+    """Réponses jamais compressées (Flask et ASGI): sans corps, partielles, déjà encodées..."""
+    return (
+        status < 200 or status in (204, 206, 304)
+        or "Content-Encoding" in headers
+        or not is_compressible(mimetype, config)
+        or "no-transform" in headers.get("Cache-Control", "")
+    )
+
+
+def init_compression(app):
+    if not app.config.get("COMPRESS_ENABLED"):
+        return
+    cache = CompressedCache(app.config["COMPRESS_CACHE_BYTES"])
+    app.extensions["compression_cache"] = cache
+
+    @app.after_request
+    def _compress_response(resp):
+        cfg = app.config
+        if (
+            request.method == "HEAD"
+            or resp.direct_passthrough  # send_file: on garde le sendfile/zero-copy
+            or skip_compression(resp.status_code, resp.headers, resp.mimetype, cfg)
+        ):
+            return resp
+        resp.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return resp
+
+        if resp.is_streamed:
+            resp.response = compress_stream(resp.response, encoding, cfg)
+            resp.headers.pop("Content-Length", None)
+        else:
+            data = resp.get_data()
+            if len(data) < cfg["COMPRESS_MIN_SIZE"]:
+                return resp
+            resp.set_data(cache.get_or_compress(data, encoding, cfg))
+        resp.headers["Content-Encoding"] = encoding
+        etag, weak = resp.get_etag()
+        if etag and not weak:
+            resp.set_etag(etag, weak=True)  # représentation différente de l'original
+        return resp
@@ -0,0 +1,118 @@
+# app/common/db.py
+# Profil d'accès Postgres: prepared statements psycopg 3, pipeline pour les
+# requêtes indépendantes d'une même requête HTTP, liveness du pool sans pre-ping.
+import time
+from flask import current_app
+from sqlalchemy import event, exc
+from app.extensions import db
+
+# Option d'exécution de fetch_all: le statement est compilé par SQLAlchemy (compiled_cache
+# de l'engine, paramètres passés par les bind processors) mais envoyé par le pipeline
+PIPELINE_CAPTURE = "pipeline_capture"
+
+
+def engine_options(config) -> dict:
+    """Construit SQLALCHEMY_ENGINE_OPTIONS selon le driver de SQLALCHEMY_DATABASE_URI."""
+    options = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    # Le ping à chaque checkout coûte un aller-retour: remplacé par register_pool_liveness()
+    options["pool_pre_ping"] = False
+    uri = config.get("SQLALCHEMY_DATABASE_URI") or ""
+    if not uri.startswith(("postgresql", "postgres")):
+        return options
+
+    connect_args = dict(options.get("connect_args") or {})
+    # psycopg prépare côté serveur une requête après N exécutions sur la connexion.
+    # Derrière PgBouncer en mode transaction (< 1.21), les statements nommés cassent: on coupe.
+    connect_args["prepare_threshold"] = None if config.get("DB_PGBOUNCER_MODE") else config.get("DB_PREPARE_THRESHOLD")
+    connect_args.setdefault("connect_timeout", config.get("DB_CONNECT_TIMEOUT"))
+    # Keepalives TCP: le noyau détecte les pairs morts sans requête applicative
+    connect_args.setdefault("keepalives", 1)
+    connect_args.setdefault("keepalives_idle", config.get("DB_KEEPALIVES_IDLE"))
+    connect_args.setdefault("keepalives_interval", 10)
+    connect_args.setdefault("keepalives_count", 3)
+    options["connect_args"] = connect_args
+    return options
+
+
+def register_pool_liveness(engine, config) -> None:
+    """
+    Ping uniquement les connexions restées inactives plus de DB_PING_IDLE_SECONDS
+    dans le pool (au lieu de pool_pre_ping à chaque checkout). Une connexion
+    morte lève DisconnectionError: le pool la jette et en reprend une autre.
+    """
+    idle_limit = config.get("DB_PING_IDLE_SECONDS")
+    prepared_max = config.get("DB_PREPARED_MAX")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        record.info["checked_in_at"] = time.monotonic()
+        if prepared_max is not None and hasattr(dbapi_conn, "prepared_max"):
+            dbapi_conn.prepared_max = prepared_max
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        if idle_limit is None:
+            return
+        idle = time.monotonic() - record.info.get("checked_in_at", 0.0)
+        if idle < idle_limit:
+            return
+        cursor = dbapi_conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            raise exc.DisconnectionError() from e
+        finally:
+            cursor.close()
+
+
+def register_pipeline_capture(engine) -> None:
+    """do_execute de fetch_all: capture SQL et paramètres prêts pour le driver, sans exécuter."""
+
+    @event.listens_for(engine, "do_execute")
+    def _capture(cursor, statement, parameters, context):
+        captured = context.execution_options.get(PIPELINE_CAPTURE)
+        if captured is None:
+            return None
+        captured.append((statement, parameters))
+        return True  # exécution "faite": le résultat SQLAlchemy est vide, le pipeline l'exécute
+
+
+def _row_processors(stmt, description, dialect) -> list:
+    # Mêmes conversions que le résultat SQLAlchemy (result processors des types des colonnes)
+    return [column.type.dialect_impl(dialect).result_processor(dialect, col.type_code)
+            for column, col in zip(stmt.selected_columns, description)]
+
+
+def fetch_all(*statements) -> list[list[dict]]:
+    """
+    Exécute des SELECT indépendants et retourne leurs lignes (dicts).
+    Sous psycopg 3 ils partent en pipeline: un seul aller-retour réseau.
+    """
+    conn = db.session.connection()
+    if conn.dialect.driver != "psycopg" or not current_app.config.get("DB_PIPELINE"):
+        return [[dict(row) for row in conn.execute(stmt).mappings()] for stmt in statements]
+
+    captured = []
+    for stmt in statements:
+        conn.execute(stmt, execution_options={PIPELINE_CAPTURE: captured}).close()
+    raw = conn.connection.driver_connection
+    cursors = []
+    with raw.pipeline():
+        for sql, params in captured:
+            cur = raw.cursor()
+            cur.execute(sql, params)
+            cursors.append(cur)
+    results = []
+    for stmt, cur in zip(statements, cursors):
+        names = [col.name for col in cur.description]
+        processors = _row_processors(stmt, cur.description, conn.dialect)
+        results.append([
+            {name: proc(value) if proc else value for name, proc, value in zip(names, processors, row)}
+            for row in cur.fetchall()
+        ])
+        cur.close()
+    return results
@@ -10,7 +10,8 @@ class ApiError(Exception):
         self.code = code
         self.details = details or {}
 
-def _json_error(message, status, code, details=None):
+def json_error(message, status, code, details=None):
+    """Réponse d'erreur au format de l'API (handlers ci-dessous, décorateurs qui rendent une erreur)."""
     return jsonify({
         "error": {"code": code, "message": message, "details": details or {}}
     }), status
@@ -18,20 +19,20 @@ def _json_error(message, status, code, details=None):
 def register_error_handlers(app):
     @app.errorhandler(ApiError)
     def handle_api_error(e: ApiError):
-        return _json_error(e.message, e.status_code, e.code, e.details)
+        return json_error(e.message, e.status_code, e.code, e.details)
 
     @app.errorhandler(ValidationError)
     def handle_validation_error(e: ValidationError):
-        return _json_error("Invalid request body.", 400, "validation_error", e.messages)
+        return json_error("Invalid request body.", 400, "validation_error", e.messages)
 
     @app.errorhandler(HTTPException)
     def handle_http_exception(e: HTTPException):
         # Ex: 404, 405, 429…
-        return _json_error(e.description or "HTTP error", e.code or 500, "http_error")
+        return json_error(e.description or "HTTP error", e.code or 500, "http_error")
 
     @app.errorhandler(Exception)
     def handle_unexpected(e: Exception):
         if current_app.debug:
             # En dev, laissez le traceback en console; masquez côté client
             pass
-        return _json_error("Internal server error.", 500, "internal_error")
+        return json_error("Internal server error.", 500, "internal_error")
@@ -0,0 +1,158 @@
+# app/common/health.py
+# Probes de dépendances exécutées en tâche de fond; /livez, /readyz et /healthz ne
+# lisent que le dernier résultat en cache (aucune connexion du pool sur le chemin requête).
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import jsonify
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+log = logging.getLogger("app.health")
+
+
+class HealthMonitor:
+    def __init__(self, app, limiter=None):
+        cfg = app.config
+        self.interval = cfg["HEALTH_CHECK_INTERVAL"]
+        self.timeout = cfg["HEALTH_CHECK_TIMEOUT"]
+        self.background = cfg["HEALTH_BACKGROUND"]
+        self.results: dict[str, dict] = {}
+        self.warm = False
+        self._pid = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._executor = None
+
+        uri = cfg["SQLALCHEMY_DATABASE_URI"]
+        connect_args = {"connect_timeout": int(self.timeout)} if uri.startswith(("postgresql", "postgres")) else {}
+        # Engine dédié sans pool: les probes ne consomment jamais une connexion du pool applicatif
+        self._engine = create_engine(uri, poolclass=NullPool, connect_args=connect_args)
+        self._limiter = limiter
+        self._heads = None
+
+        self.probes = {"db": self._probe_db}
+        if limiter is not None and cfg["RATELIMIT_ENABLED"]:  # limiter désactivé = pas de storage
+            self.probes["ratelimit_storage"] = self._probe_limiter
+        if cfg["HEALTH_CHECK_MIGRATIONS"]:
+            self._heads = self._script_heads(app)
+            self.probes["migrations"] = self._probe_migrations
+
+    # --- probes ---
+    def _probe_db(self):
+        with self._engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    def _probe_limiter(self):
+        if not self._limiter.storage.check():
+            raise RuntimeError("storage check failed")
+
+    @staticmethod
+    def _script_heads(app):
+        from alembic.script import ScriptDirectory
+        directory = app.extensions["migrate"].directory
+        if not os.path.isabs(directory):
+            directory = os.path.join(os.path.dirname(app.root_path), directory)
+        return set(ScriptDirectory(directory).get_heads())
+
+    def _probe_migrations(self):
+        with self._engine.connect() as conn:
+            current = {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+        if current != self._heads:
+            raise RuntimeError(f"schema at {sorted(current)}, expected {sorted(self._heads)}")
+
+    # --- exécution ---
+    def run_once(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.probes), thread_name_prefix="health-probe")
+        started = {name: (time.monotonic(), self._executor.submit(fn)) for name, fn in self.probes.items()}
+        results = {}
+        for name, (t0, future) in started.items():
+            error = None
+            try:
+                future.result(timeout=max(self.timeout - (time.monotonic() - t0), 0.01))
+            except FutureTimeout:
+                error = "timeout"
+                log.warning("health_probe_failed", extra={"probe": name, "error": f"timeout after {self.timeout}s"})
+            except Exception as e:
+                # Endpoint public: seulement la classe d'erreur, le détail (hôte, DSN...) va dans les logs
+                error = e.__class__.__name__
+                log.warning("health_probe_failed", extra={"probe": name, "error": str(e)})
+            results[name] = {
+                "ok": error is None,
+                "latency_ms": int((time.monotonic() - t0) * 1000),
+                "error": error,
+                "checked_at": time.time(),
+            }
+        self.results = results
+        if not self.warm and all(r["ok"] for r in results.values()):
+            self.warm = True
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                log.exception("health_monitor_error")
+            time.sleep(self.interval)
+
+    def ensure_started(self) -> None:
+        """Démarre le thread de probes (et le relance dans un worker forké).
+
+        Appelé paresseusement par les endpoints de santé et au démarrage du serveur:
+        les commandes CLI (flask db upgrade...) ne lancent pas de probes.
+        """
+        if not self.background or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._executor = None  # les threads du pool ne survivent pas au fork
+            self._thread = threading.Thread(target=self._loop, name="health-monitor", daemon=True)
+            self._thread.start()
+
+    # --- lecture du cache ---
+    def is_ready(self) -> bool:
+        if not self.warm or not self.results:
+            return False
+        max_age = self.interval * 3 + self.timeout
+        now = time.time()
+        return all(r["ok"] and now - r["checked_at"] <= max_age for r in self.results.values())
+
+    def snapshot(self) -> dict:
+        return {"ready": self.is_ready(), "warm": self.warm, "checks": self.results}
+
+
+def register_health_routes(app, monitor: HealthMonitor, env: str):
+    app.extensions["health"] = monitor
+
+    @app.get("/livez")
+    def livez():
+        # Vivant = le process répond; les dépendances relèvent de /readyz
+        return jsonify({"status": "ok"})
+
+    @app.get("/readyz")
+    def readyz():
+        monitor.ensure_started()
+        body, status = readiness_body(monitor)
+        return jsonify(body), status
+
+    # Healthcheck historique (CI, compose): même forme, valeur DB issue du cache
+    @app.get("/healthz")
+    def healthz():
+        monitor.ensure_started()
+        return jsonify(healthz_body(monitor, env))
+
+
+def readiness_body(monitor: HealthMonitor) -> tuple[dict, int]:
+    snap = monitor.snapshot()
+    return {"status": "ok" if snap["ready"] else "unavailable", **snap}, 200 if snap["ready"] else 503
+
+
+def healthz_body(monitor: HealthMonitor, env: str) -> dict:
+    db_ok = monitor.results.get("db", {}).get("ok")
+    return {"status": "ok", "env": env, "db": "up" if db_ok else "down"}
@@ -0,0 +1,224 @@
+# app/common/idempotency.py
+# En-tête Idempotency-Key sur les POST non idempotents (création de note, register).
+# La 1re requête réserve la clé (in-flight), exécute la vue puis stocke la réponse
+# sérialisée (TTL). Un retry avec la même clé et le même corps rejoue la réponse
+# sans toucher la DB ni bcrypt; un doublon concurrent attend la requête en cours.
+# Clé = scope + user (JWT) ou IP + valeur de l'en-tête. Même clé, autre corps -> 422.
+# Réponses qui délivrent des secrets (register: JWT): replay_body=False, seuls le statut
+# et un hash du corps sont stockés; un retry réussi reçoit 409 au lieu des tokens.
+# Stockage: IDEMPOTENCY_STORAGE_URI (memory:// ou redis://, cf. app.common.storage).
+import base64
+import hashlib
+import json
+import logging
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from app.common.errors import ApiError, json_error
+from app.common.storage import redis_from_uri
+
+log = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+REPLAY_HEADERS = ("Content-Type", "Location")
+POLL_SECONDS = 0.05
+
+
+class MemoryIdempotencyStore:
+    """Stockage local au process (dev/tests, ou worker unique)."""
+
+    def __init__(self):
+        self._records: dict[str, tuple[float, dict]] = {}
+        self._cond = threading.Condition()
+
+    def _get(self, key):
+        item = self._records.get(key)
+        if item is None:
+            return None
+        if item[0] < time.monotonic():
+            del self._records[key]
+            return None
+        return item[1]
+
+    def get(self, key: str) -> dict | None:
+        with self._cond:
+            return self._get(key)
+
+    def claim(self, key: str, record: dict, ttl: float) -> bool:
+        with self._cond:
+            if self._get(key) is not None:
+                return False
+            self._records[key] = (time.monotonic() + ttl, record)
+            return True
+
+    def complete(self, key: str, record: dict, ttl: float) -> None:
+        with self._cond:
+            self._records[key] = (time.monotonic() + ttl, record)
+            self._cond.notify_all()
+
+    def release(self, key: str) -> None:
+        with self._cond:
+            self._records.pop(key, None)
+            self._cond.notify_all()
+
+    def wait(self, key: str, timeout: float) -> dict | None:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                record = self._get(key)
+                remaining = deadline - time.monotonic()
+                if record is None or record["state"] == "done" or remaining <= 0:
+                    return record
+                self._cond.wait(remaining)
+
+
+class RedisIdempotencyStore:
+    """Redis partagé entre workers: SET NX pour la réservation, polling court pour l'attente."""
+
+    def __init__(self, client, prefix: str = "idem:"):
+        self._redis = client
+        self._prefix = prefix
+
+    def get(self, key: str) -> dict | None:
+        raw = self._redis.get(self._prefix + key)
+        return json.loads(raw) if raw else None
+
+    def claim(self, key: str, record: dict, ttl: float) -> bool:
+        return bool(self._redis.set(self._prefix + key, json.dumps(record), nx=True, px=int(ttl * 1000)))
+
+    def complete(self, key: str, record: dict, ttl: float) -> None:
+        self._redis.set(self._prefix + key, json.dumps(record), px=int(ttl * 1000))
+
+    def release(self, key: str) -> None:
+        self._redis.delete(self._prefix + key)
+
+    def wait(self, key: str, timeout: float) -> dict | None:
+        deadline = time.monotonic() + timeout
+        while True:
+            record = self.get(key)
+            if record is None or record["state"] == "done" or time.monotonic() >= deadline:
+                return record
+            time.sleep(POLL_SECONDS)
+
+
+def init_idempotency(app) -> None:
+    client = redis_from_uri(app.config.get("IDEMPOTENCY_STORAGE_URI"))
+    app.extensions["idempotency"] = RedisIdempotencyStore(client) if client else MemoryIdempotencyStore()
+
+
+def _principal() -> str:
+    verify_jwt_in_request(optional=True)  # déjà vérifié si la vue est sous @jwt_required
+    identity = get_jwt_identity()
+    return f"user:{identity}" if identity else f"ip:{request.remote_addr}"
+
+
+def _fingerprint() -> str:
+    h = hashlib.sha256()
+    h.update(f"{request.method} {request.path}\n".encode())
+    h.update(request.get_data(cache=True))
+    return h.hexdigest()
+
+
+def _serialize(resp, fp: str, replay_body: bool) -> dict:
+    if not replay_body and resp.status_code < 300:
+        # Jamais de tokens en clair dans le store: statut + empreinte du corps seulement
+        return {"state": "done", "fp": fp, "status": resp.status_code,
+                "body_sha256": hashlib.sha256(resp.get_data()).hexdigest()}
+    return {
+        "state": "done",
+        "fp": fp,
+        "status": resp.status_code,
+        "headers": [[k, resp.headers[k]] for k in REPLAY_HEADERS if k in resp.headers],
+        "body": base64.b64encode(resp.get_data()).decode("ascii"),
+    }
+
+
+def _replay(record: dict):
+    if "body" not in record:
+        raise ApiError("A request with this Idempotency-Key already succeeded; its response is not stored.",
+                       409, "idempotency_replay_unavailable", details={"status": record["status"]})
+    resp = make_response(base64.b64decode(record["body"]), record["status"])
+    for k, v in record["headers"]:
+        resp.headers[k] = v
+    resp.headers[REPLAYED_HEADER] = "true"
+    return resp
+
+
+def _check_fingerprint(record: dict, fp: str) -> None:
+    if record["fp"] != fp:
+        raise ApiError("Idempotency-Key already used with a different request.", 422,
+                       "idempotency_key_reused")
+
+
+def idempotent(scope: str, replay_body: bool = True):
+    """
+    Ex: @bp.post("/")
+        @jwt_required()
+        @idempotent("notes.create")
+    Sans en-tête Idempotency-Key: comportement inchangé.
+    replay_body=False pour les vues qui délivrent des tokens: succès non rejoués (409).
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            value = request.headers.get(HEADER)
+            if not value:
+                return fn(*args, **kwargs)
+            if len(value) > 255:
+                raise ApiError("Idempotency-Key is too long.", 400, "validation_error")
+            cfg = current_app.config
+            store = current_app.extensions["idempotency"]
+            key = f"{scope}:{_principal()}:{hashlib.sha256(value.encode()).hexdigest()}"
+            fp = _fingerprint()
+            pending = {"state": "pending", "fp": fp}
+            lock_ttl = cfg["IDEMPOTENCY_LOCK_SECONDS"]
+            try:
+                record = None
+                claimed = store.claim(key, pending, lock_ttl)
+                if not claimed:
+                    record = store.get(key)
+                    if record is not None and record["state"] == "pending":
+                        _check_fingerprint(record, fp)
+                        record = store.wait(key, cfg["IDEMPOTENCY_WAIT_SECONDS"])
+                    if record is None:  # expirée, ou la requête en cours a échoué: clé libre
+                        claimed = store.claim(key, pending, lock_ttl)
+            except ApiError:
+                raise
+            except Exception:
+                # Store indisponible: on sert la requête sans garantie plutôt que d'échouer
+                log.warning("idempotency_store_unavailable", exc_info=True)
+                return fn(*args, **kwargs)
+
+            if not claimed:
+                if record is None or record["state"] == "pending":
+                    raise ApiError("A request with this Idempotency-Key is in progress.", 409,
+                                   "idempotency_in_progress")
+                _check_fingerprint(record, fp)
+                return _replay(record)
+
+            try:
+                resp = make_response(fn(*args, **kwargs))
+            except ApiError as e:
+                if e.status_code >= 500:
+                    store.release(key)
+                    raise
+                # Erreur métier (409 email pris, 400...): rejouée telle quelle, sans refaire le travail
+                resp = make_response(json_error(e.message, e.status_code, e.code, e.details))
+            except BaseException:
+                store.release(key)  # 5xx / exception: un retry doit pouvoir réexécuter
+                raise
+            if resp.status_code >= 500 or resp.is_streamed:
+                store.release(key)
+                return resp
+            try:
+                store.complete(key, _serialize(resp, fp, replay_body), cfg["IDEMPOTENCY_TTL_SECONDS"])
+            except Exception:
+                log.warning("idempotency_store_unavailable", exc_info=True)
+            return resp
+        return inner
+    return wrapper
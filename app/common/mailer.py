@@ -0,0 +1,68 @@
+# app/common/mailer.py
+# Envoi de mails (appelé depuis les jobs, jamais sur le chemin d'une requête).
+#   MAIL_BACKEND=smtp    -> smtplib (STARTTLS/login selon config)
+#   MAIL_BACKEND=console -> destinataire et sujet journalisés, jamais le corps (liens à
+#                           token: reset, vérification); refusé en production (dev)
+#   MAIL_BACKEND=memory  -> boîte d'envoi en mémoire (tests)
+import logging
+import smtplib
+from email.message import EmailMessage
+
+from flask import current_app
+
+log = logging.getLogger("app.mail")
+
+
+class ConsoleMailer:
+    def send(self, msg: EmailMessage) -> None:
+        log.info("mail", extra={"to": msg["To"], "subject": msg["Subject"]})
+
+
+class MemoryMailer:
+    def __init__(self):
+        self.outbox: list[EmailMessage] = []
+
+    def send(self, msg: EmailMessage) -> None:
+        self.outbox.append(msg)
+
+
+class SMTPMailer:
+    def __init__(self, cfg):
+        self.host = cfg["MAIL_SMTP_HOST"]
+        self.port = cfg["MAIL_SMTP_PORT"]
+        self.user = cfg.get("MAIL_SMTP_USER")
+        self.password = cfg.get("MAIL_SMTP_PASSWORD")
+        self.starttls = cfg["MAIL_SMTP_STARTTLS"]
+        self.timeout = cfg["MAIL_SMTP_TIMEOUT"]
+
+    def send(self, msg: EmailMessage) -> None:
+        # Une connexion par mail: les jobs sont peu fréquents, pas de pool à maintenir
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password or "")
+            smtp.send_message(msg)
+
+
+def init_mailer(app) -> None:
+    backend = app.config.get("MAIL_BACKEND")
+    if backend not in ("smtp", "console", "memory"):
+        raise RuntimeError(f"MAIL_BACKEND must be one of smtp, console, memory (got {backend!r})")
+    if backend == "console" and not app.config.get("MAIL_CONSOLE_ALLOWED"):
+        raise RuntimeError("MAIL_BACKEND=console is not allowed here: set MAIL_BACKEND=smtp")
+    if backend == "smtp":
+        app.extensions["mailer"] = SMTPMailer(app.config)
+    elif backend == "memory":
+        app.extensions["mailer"] = MemoryMailer()
+    else:
+        app.extensions["mailer"] = ConsoleMailer()
+
+
+def send_mail(to: str, subject: str, body: str) -> None:
+    msg = EmailMessage()
+    msg["From"] = current_app.config["MAIL_FROM"]
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.set_content(body)
+    current_app.extensions["mailer"].send(msg)
@@ -0,0 +1,196 @@
+# app/common/routing.py
+# Routage lecture/écriture: les GET authentifiés lisent sur un réplica, les
+# écritures (et les lectures d'un user qui vient d'écrire) restent sur le primaire.
+import logging
+import os
+import random
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+
+from app.common.storage import redis_from_uri
+
+log = logging.getLogger("app.db.routing")
+
+SAFE_METHODS = ("GET", "HEAD")
+
+# 0 si le réplica a rejoué tout ce qu'il a reçu (ou si ce n'est pas un standby)
+_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class _Replica:
+    def __init__(self, engine):
+        self.engine = engine
+        self.lag = None          # secondes, None = inconnu/injoignable
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    def __init__(self, engines, window: float, max_lag: float, check_interval: float, sticky_uri: str | None,
+                 background: bool = True):
+        self.replicas = [_Replica(e) for e in engines]
+        self.window = window
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.background = background
+        self._redis = redis_from_uri(sticky_uri)
+        self._sticky: dict[str, float] = {}
+        self._pid = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # --- read-your-writes ---
+    def mark_write(self, user_id) -> None:
+        if self.window <= 0 or user_id is None:
+            return
+        key = str(user_id)
+        if self._redis is not None:
+            try:
+                self._redis.set(f"db:rw:{key}", 1, px=int(self.window * 1000))
+                return
+            except Exception:
+                log.warning("sticky_store_unavailable", exc_info=True)
+        self._sticky[key] = time.monotonic() + self.window
+
+    def is_sticky(self, user_id) -> bool:
+        key = str(user_id)
+        if self._redis is not None:
+            try:
+                return bool(self._redis.exists(f"db:rw:{key}"))
+            except Exception:
+                return True  # store indisponible: on reste sur le primaire
+        until = self._sticky.get(key)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            self._sticky.pop(key, None)
+            return False
+        return True
+
+    # --- santé / lag ---
+    def _refresh(self, replica: _Replica) -> None:
+        try:
+            with replica.engine.connect() as conn:
+                replica.lag = float(conn.execute(_LAG_SQL).scalar() or 0) \
+                    if replica.engine.dialect.name == "postgresql" else 0.0
+        except Exception:
+            replica.lag = None
+            log.warning("replica_unreachable", extra={"replica": replica.engine.url.host})
+        replica.checked_at = time.monotonic()
+
+    def refresh(self) -> None:
+        """Mesure le lag de chaque réplica (thread de fond, ou appel explicite en test)."""
+        for r in self.replicas:
+            self._refresh(r)
+
+    def _loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                log.exception("replica_monitor_error")
+            time.sleep(self.check_interval)
+
+    def ensure_started(self) -> None:
+        """Démarre le thread de mesure (et le relance dans un worker forké), comme HealthMonitor."""
+        if not self.background or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name="replica-health", daemon=True)
+            self._thread.start()
+
+    def healthy(self) -> list:
+        # Lecture du cache seulement: aucune connexion sur le thread de la requête.
+        # Lag inconnu (avant la première mesure, réplica injoignable) -> écarté
+        self.ensure_started()
+        return [r.engine for r in self.replicas if r.lag is not None and r.lag <= self.max_lag]
+
+    def choose(self, user_id):
+        """Engine réplica pour ce user, ou None -> primaire."""
+        if not self.replicas or self.is_sticky(user_id):
+            return None
+        engines = self.healthy()
+        return random.choice(engines) if engines else None
+
+
+def _replica_for_request():
+    if not has_request_context():
+        return None
+    router = current_app.extensions.get("db_replicas")
+    if router is None:
+        return None
+    route = g.get("_db_route")
+    if route is not None:
+        return route or None
+    if request.method not in SAFE_METHODS:
+        g._db_route = False
+        return None
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # JWT pas encore vérifié (ex: contrôle de révocation): primaire, sans figer la décision
+        return None
+    g._db_route = router.choose(identity) or False
+    return g._db_route or None
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, "is_dml", False):
+            replica = _replica_for_request()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def mark_primary_reads(user_id) -> None:
+    """Force les lectures de ce user sur le primaire pendant la fenêtre configurée."""
+    router = current_app.extensions.get("db_replicas")
+    if router is not None:
+        router.mark_write(user_id)
+
+
+def init_replicas(app) -> None:
+    uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or []
+    if not uris:
+        return
+    # import local: app.common.db dépend de app.extensions, qui dépend de ce module
+    from app.common.db import engine_options, register_pipeline_capture, register_pool_liveness
+
+    engines = []
+    for uri in uris:
+        engine = create_engine(uri, **engine_options({**app.config, "SQLALCHEMY_DATABASE_URI": uri}))
+        register_pool_liveness(engine, app.config)
+        register_pipeline_capture(engine)
+        engines.append(engine)
+    router = ReplicaRouter(
+        engines,
+        window=app.config["DB_READ_YOUR_WRITES_SECONDS"],
+        max_lag=app.config["DB_REPLICA_MAX_LAG_SECONDS"],
+        check_interval=app.config["DB_REPLICA_CHECK_INTERVAL"],
+        sticky_uri=app.config.get("DB_STICKY_STORAGE_URI"),
+        background=app.config["HEALTH_BACKGROUND"],
+    )
+    app.extensions["db_replicas"] = router
+
+    @app.after_request
+    def _stick_to_primary_after_write(resp):
+        if request.method not in SAFE_METHODS and resp.status_code < 400:
+            try:
+                router.mark_write(get_jwt_identity())
+            except RuntimeError:
+                pass  # route non authentifiée (register/login)
+        return resp
@@ -0,0 +1,12 @@
+# app/common/storage.py
+# Convention des URI de stockage (comme RATELIMIT_STORAGE_URI):
+#   "memory://"          -> état local au process (dev/tests)
+#   "redis://host:port/n" -> Redis partagé entre workers
+import redis
+
+
+def redis_from_uri(uri: str | None):
+    """Client Redis pour une URI redis://, None pour memory:// (ou vide)."""
+    if not uri or uri.startswith("memory://"):
+        return None
+    return redis.Redis.from_url(uri, socket_timeout=1, socket_connect_timeout=1)
@@ -1,4 +1,22 @@
+import base64
+import json
 from flask import jsonify
+from app.common.errors import ApiError
 
 def success(data=None, message="ok", status=200):
     return jsonify({"status": "success", "message": message, "data": data}), status
+
+# Curseurs opaques pour la pagination keyset (valeurs JSON encodées en base64url)
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise ApiError("Invalid cursor.", 400, "validation_error", details={"cursor": cursor})
+    return values
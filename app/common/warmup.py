@@ -0,0 +1,118 @@
+# app/common/warmup.py
+# Warm-up au démarrage (gunicorn.conf.py): tout ce que les premières requêtes
+# paieraient sinon. En mode preload il tourne dans le master, avant le fork,
+# et les workers héritent du résultat en copy-on-write.
+import gc
+import logging
+import time
+import uuid
+
+from passlib.hash import bcrypt
+
+from app.extensions import db
+
+log = logging.getLogger("app.warmup")
+
+
+def _hot_statements():
+    from app.notes.queries import FULL_FIELDS, SUMMARY_FIELDS, list_statements, shared_list_statement, get_statement
+    from app.notes.search import search_statement
+
+    uid = uuid.uuid4()
+    # Les valeurs sont des paramètres liés: une exécution suffit par forme de requête
+    for fields in (FULL_FIELDS, SUMMARY_FIELDS):
+        for is_admin in (False, True):
+            yield list_statements(uid, is_admin, 1, 10, fields)
+    yield (shared_list_statement(db.engine.dialect.name, uid, "all", 10),)
+    yield (get_statement(uid),)
+    yield (get_statement(uid, uid),)
+    try:
+        yield (search_statement(db.engine.dialect.name, uid, False, "warmup", 10),)
+    except Exception:  # dialecte sans recherche plein texte
+        pass
+
+
+def _warm_sql():
+    """Compile (et exécute à vide) les requêtes chaudes pour remplir les caches de compilation."""
+    from app.common.db import fetch_all
+    from app.auth.service import token_revoked_statement
+    from app.users.models import User
+    from app.notes.models import Note
+
+    try:
+        for statements in _hot_statements():
+            if len(statements) > 1:
+                fetch_all(*statements)
+            else:
+                db.session.execute(statements[0]).all()
+        db.session.execute(token_revoked_statement({"jti": "warmup", "sub": str(uuid.uuid4())})).scalar()
+        db.session.get(User, uuid.uuid4())
+        db.session.get(Note, uuid.uuid4())
+    finally:
+        db.session.remove()
+        # Aucune connexion ouverte ne doit être héritée par les workers
+        # (sauf SQLite en mémoire: la base n'existe que dans sa connexion)
+        if db.engine.url.database not in (None, "", ":memory:"):
+            db.engine.dispose()
+
+
+def _warm_schemas():
+    from app.notes.queries import FULL_FIELDS, SUMMARY_FIELDS, projection_schema
+    from app.docs.spec import build_spec
+
+    projection_schema(FULL_FIELDS)
+    projection_schema(SUMMARY_FIELDS)
+    build_spec()
+
+
+def _warm_bcrypt():
+    # Détection du backend + premier hash (coût minimal: rounds=4)
+    bcrypt.get_backend()
+    bcrypt.verify("warm-up", bcrypt.using(rounds=4).hash("warm-up"))
+
+
+def warm_up(app) -> dict:
+    """Exécute les étapes de warm-up; un échec est loggé mais ne bloque pas le démarrage."""
+    timings = {}
+    with app.app_context():
+        for name, step in (("sql", _warm_sql), ("schemas", _warm_schemas), ("bcrypt", _warm_bcrypt)):
+            t0 = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                log.warning("warmup_step_failed", extra={"step": name, "error": str(e)})
+            timings[name] = int((time.perf_counter() - t0) * 1000)
+    log.info("warmup_done", extra={"timings_ms": timings})
+    return timings
+
+
+def freeze_heap() -> None:
+    """À appeler juste avant le fork: les objets existants sortent du suivi du GC,
+    qui n'écrit plus dans leurs en-têtes -> pages partagées entre workers."""
+    gc.collect()
+    gc.freeze()
+
+
+def reset_after_fork(app) -> None:
+    """Dans le worker: oublie les connexions héritées sans toucher aux sockets du parent."""
+    with app.app_context():
+        db.engine.dispose(close=False)
+    router = app.extensions.get("db_replicas")
+    if router is not None:
+        for replica in router.replicas:
+            replica.engine.dispose(close=False)
+
+
+def memory_usage() -> dict:
+    """RSS / PSS / privé (kB) du process courant, via /proc (Linux)."""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty", "Shared_Clean", "Shared_Dirty"):
+                    usage[key.lower() + "_kb"] = int(value.split()[0])
+    except OSError:
+        import resource
+        usage["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage
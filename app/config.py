@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class BaseConfig:
@@ -15,6 +16,13 @@ class BaseConfig:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv("JWT_ACCESS_MINUTES", "15")))
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv("JWT_REFRESH_DAYS", "7")))
     JWT_COOKIE_SECURE = False               # Passera à True si un jour on utilise les cookies en prod
+    # Signature asymétrique (app.auth.keys): un <kid>.pem par clé; vide = HS256 + JWT_SECRET_KEY
+    JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+    JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")  # défaut: plus grand kid ayant une clé privée
+    JWT_ACCEPT_LEGACY_HS256 = os.getenv("JWT_ACCEPT_LEGACY_HS256", "true").lower() == "true"  # transition
+    JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))  # cache des consommateurs du JWKS
+    # POST /auth/introspect: clés d'API des appelants (gateway), séparées par des virgules; vide = désactivé
+    INTROSPECTION_API_KEYS = [k.strip() for k in os.getenv("INTROSPECTION_API_KEYS", "").split(",") if k.strip()]
 
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
@@ -24,31 +32,170 @@ class BaseConfig:
 
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
-    CORS_ALLOW_HEADERS = os.getenv("CORS_ALLOW_HEADERS", "Content-Type,Authorization")
-    CORS_EXPOSE_HEADERS = os.getenv("CORS_EXPOSE_HEADERS", "Content-Type")
+    CORS_ALLOW_HEADERS = os.getenv("CORS_ALLOW_HEADERS", "Content-Type,Authorization,Content-Range,Range")
+    CORS_EXPOSE_HEADERS = os.getenv("CORS_EXPOSE_HEADERS", "Content-Type,Content-Range,Content-Disposition,Upload-Offset")
 
     # Limites de requêtes
     RATELIMIT_DEFAULT = os.getenv("RATELIMIT_DEFAULT", None)  # ex: "200 per minute" si tu veux un défaut global
     RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "memory://")  # Prod: "redis://localhost:6379/0"
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
 
     # Taille max payload (1 Mo par défaut)
     MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", "1000000"))
 
-    # SQLAlchemy: connexions plus robustes
+    # SQLAlchemy: connexions plus robustes (complété par app.common.db.engine_options)
     SQLALCHEMY_ENGINE_OPTIONS = {
-        "pool_pre_ping": True,
         "pool_recycle": 1800,  # 30 min
     }
 
+    # Postgres / psycopg 3: prepared statements, pipeline, liveness du pool
+    DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "1"))    # 0 = préparer dès la 1re exécution
+    DB_PREPARED_MAX = int(os.getenv("DB_PREPARED_MAX", "100"))            # statements préparés gardés par connexion
+    DB_PGBOUNCER_MODE = os.getenv("DB_PGBOUNCER_MODE", "false").lower() == "true"  # désactive les prepares
+    DB_PIPELINE = os.getenv("DB_PIPELINE", "true").lower() == "true"
+    DB_PING_IDLE_SECONDS = float(os.getenv("DB_PING_IDLE_SECONDS", "30"))  # ping si inactive depuis plus longtemps
+    DB_KEEPALIVES_IDLE = int(os.getenv("DB_KEEPALIVES_IDLE", "30"))
+    DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+    # Réplicas en lecture (GET authentifiés) + read-your-writes par user
+    SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))  # primaire après une écriture
+    DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "2"))
+    DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+    DB_STICKY_STORAGE_URI = os.getenv("DB_STICKY_STORAGE_URI", os.getenv("RATELIMIT_STORAGE_URI", "memory://"))
+
+    # Probes de santé (thread de fond, engine dédié sans pool)
+    HEALTH_BACKGROUND = os.getenv("HEALTH_BACKGROUND", "true").lower() == "true"
+    HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+    HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+    HEALTH_CHECK_MIGRATIONS = os.getenv("HEALTH_CHECK_MIGRATIONS", "true").lower() == "true"  # schéma au head Alembic
+
+    # Audit auth (write-behind): "async" = thread de fond, "sync" = écriture immédiate, "off"
+    AUDIT_MODE = os.getenv("AUDIT_MODE", "async")
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))          # flush dès N événements...
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))  # ...ou N secondes après le 1er
+    AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))          # au-delà: événements perdus (comptés)
+
+    # Idempotency-Key (POST /notes, /auth/register): réponses rejouées pendant le TTL (register: statut seul)
+    IDEMPOTENCY_STORAGE_URI = os.getenv("IDEMPOTENCY_STORAGE_URI", os.getenv("RATELIMIT_STORAGE_URI", "memory://"))
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+    IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "30"))  # réservation in-flight (crash)
+    IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))  # attente d'un doublon concurrent
+
+    # Cache de lecture des notes (app.notes.cache): "auto" = actif seulement avec Redis
+    NOTES_CACHE_ENABLED = os.getenv("NOTES_CACHE_ENABLED", "auto")
+    NOTES_CACHE_URI = os.getenv("NOTES_CACHE_URI", os.getenv("RATELIMIT_STORAGE_URI", "memory://"))
+    NOTES_CACHE_TTL = int(os.getenv("NOTES_CACHE_TTL", "300"))
+    NOTES_CACHE_LOCAL_SIZE = int(os.getenv("NOTES_CACHE_LOCAL_SIZE", "10000"))  # entrées du LRU in-process
+    NOTES_CACHE_LOCAL_TTL = int(os.getenv("NOTES_CACHE_LOCAL_TTL", "30"))
+
+    # Flux SSE des changements (app.notes.events): redis:// entre workers, memory:// = process unique
+    NOTES_EVENTS_URI = os.getenv("NOTES_EVENTS_URI", os.getenv("RATELIMIT_STORAGE_URI", "memory://"))
+    NOTES_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("NOTES_EVENTS_HEARTBEAT_SECONDS", "15"))  # < timeouts proxy
+    NOTES_EVENTS_RETRY_MS = int(os.getenv("NOTES_EVENTS_RETRY_MS", "3000"))       # délai de reconnexion client
+    NOTES_EVENTS_QUEUE_SIZE = int(os.getenv("NOTES_EVENTS_QUEUE_SIZE", "256"))    # par flux; plein = relecture
+    NOTES_EVENTS_REPLAY_MAX = int(os.getenv("NOTES_EVENTS_REPLAY_MAX", "1000"))   # au-delà: event resync
+
+    # Jobs de fond (app.jobs): Redis + `python worker.py` en prod, thread in-process en memory://
+    JOBS_QUEUE_URI = os.getenv("JOBS_QUEUE_URI", os.getenv("RATELIMIT_STORAGE_URI", "memory://"))
+    JOBS_EAGER = os.getenv("JOBS_EAGER", "false").lower() == "true"          # exécution immédiate (tests)
+    JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1"))
+    JOBS_VISIBILITY_TIMEOUT = int(os.getenv("JOBS_VISIBILITY_TIMEOUT", "300"))  # job repris si worker mort
+    JOBS_BACKOFF_BASE = float(os.getenv("JOBS_BACKOFF_BASE", "5"))            # 5s, 10s, 20s... (jitter)
+    JOBS_BACKOFF_MAX = float(os.getenv("JOBS_BACKOFF_MAX", "600"))
+    TOKEN_BLOCKLIST_PRUNE_INTERVAL = int(os.getenv("TOKEN_BLOCKLIST_PRUNE_INTERVAL", "3600"))  # 0 = jamais
+
+    # Mails (app.common.mailer) + liens envoyés (front)
+    MAIL_BACKEND = os.getenv("MAIL_BACKEND", "console")  # "smtp" | "console" | "memory"
+    MAIL_CONSOLE_ALLOWED = True                          # faux en production (cf. ProdConfig)
+    MAIL_FROM = os.getenv("MAIL_FROM", "no-reply@localhost")
+    MAIL_SMTP_HOST = os.getenv("MAIL_SMTP_HOST", "localhost")
+    MAIL_SMTP_PORT = int(os.getenv("MAIL_SMTP_PORT", "587"))
+    MAIL_SMTP_USER = os.getenv("MAIL_SMTP_USER")
+    MAIL_SMTP_PASSWORD = os.getenv("MAIL_SMTP_PASSWORD")
+    MAIL_SMTP_STARTTLS = os.getenv("MAIL_SMTP_STARTTLS", "true").lower() == "true"
+    MAIL_SMTP_TIMEOUT = int(os.getenv("MAIL_SMTP_TIMEOUT", "10"))
+    APP_PUBLIC_URL = os.getenv("APP_PUBLIC_URL", "http://localhost:8000")
+    EMAIL_VERIFY_TOKEN_HOURS = int(os.getenv("EMAIL_VERIFY_TOKEN_HOURS", "48"))
+    PASSWORD_RESET_TOKEN_MINUTES = int(os.getenv("PASSWORD_RESET_TOKEN_MINUTES", "30"))
+
+    # Mots de passe compromis (app.auth.breached): fichier construit par `flask auth import-breached`
+    BREACHED_PASSWORDS_PATH = os.getenv("BREACHED_PASSWORDS_PATH", "")              # vide = pas de contrôle
+    BREACHED_PASSWORDS_BLOOM_PATH = os.getenv("BREACHED_PASSWORDS_BLOOM_PATH", "")  # défaut: <path>.bloom s'il existe
+
+    # Profilage à la demande (app.profiling), admin uniquement; désactivé = rien d'installé
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_STORAGE_URI = os.getenv("PROFILING_STORAGE_URI", os.getenv("RATELIMIT_STORAGE_URI", "memory://"))
+    PROFILING_TOKEN_SECONDS = int(os.getenv("PROFILING_TOKEN_SECONDS", "900"))   # durée max d'un jeton X-Profile
+    PROFILING_PROFILE_TTL = int(os.getenv("PROFILING_PROFILE_TTL", "86400"))     # profils gardés (Redis)
+    PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "50"))
+    PROFILING_SAMPLE_RATES = os.getenv("PROFILING_SAMPLE_RATES", "")  # ex: "notes.list_notes=0.05,*=0"
+    PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+    PROFILING_WINDOW_MINUTES = int(os.getenv("PROFILING_WINDOW_MINUTES", "15"))
+
+    # Suppression de compte (app.users.deletion): purge par lots, throttlée
+    USER_PURGE_BATCH_SIZE = int(os.getenv("USER_PURGE_BATCH_SIZE", "1000"))     # notes par transaction
+    USER_PURGE_PAUSE_MS = int(os.getenv("USER_PURGE_PAUSE_MS", "50"))           # pause entre deux lots
+    USER_PURGE_SLICE_SECONDS = int(os.getenv("USER_PURGE_SLICE_SECONDS", "60"))  # puis le job se ré-empile
+
+    # Pièces jointes (app.attachments): file:///chemin (défaut: instance/attachments) ou s3://bucket/prefix
+    ATTACHMENTS_STORAGE_URI = os.getenv("ATTACHMENTS_STORAGE_URI", "")
+    ATTACHMENTS_S3_ENDPOINT_URL = os.getenv("ATTACHMENTS_S3_ENDPOINT_URL")  # MinIO & co; vide = AWS
+    ATTACHMENTS_MAX_BYTES = int(os.getenv("ATTACHMENTS_MAX_BYTES", str(100 * 1024 * 1024)))
+    ATTACHMENTS_CHUNK_MAX_BYTES = int(os.getenv("ATTACHMENTS_CHUNK_MAX_BYTES", str(16 * 1024 * 1024)))  # par PUT
+    ATTACHMENTS_MAX_PER_NOTE = int(os.getenv("ATTACHMENTS_MAX_PER_NOTE", "20"))
+    ATTACHMENTS_UPLOAD_EXPIRY_HOURS = int(os.getenv("ATTACHMENTS_UPLOAD_EXPIRY_HOURS", "24"))  # uploads abandonnés
+    ATTACHMENTS_PRUNE_INTERVAL = int(os.getenv("ATTACHMENTS_PRUNE_INTERVAL", "3600"))  # 0 = jamais
+    ATTACHMENTS_URL_TTL = int(os.getenv("ATTACHMENTS_URL_TTL", "300"))  # URL présignée S3 (secondes)
+    ATTACHMENTS_ACCEL_REDIRECT = os.getenv("ATTACHMENTS_ACCEL_REDIRECT", "")  # ex: "/_attachments" (nginx internal)
+
     # HTTPS strict (HSTS) si activé ET connexion sécurisée
     ENFORCE_HTTPS = os.getenv("ENFORCE_HTTPS", "false").lower() == "true"
 
+    # Compression des réponses (gzip natif; br/zstd si brotli/zstandard installés)
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))       # octets; en dessous le gain ne paie pas le CPU
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "5"))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+    COMPRESS_ZSTD_LEVEL = int(os.getenv("COMPRESS_ZSTD_LEVEL", "3"))
+    COMPRESS_CACHE_BYTES = int(os.getenv("COMPRESS_CACHE_BYTES", str(8 * 1024 * 1024)))  # 0 = pas de cache
+    COMPRESS_MIMETYPES = ("application/json", "text/plain", "text/html", "text/css",
+                          "application/javascript", "text/javascript", "image/svg+xml", "text/csv",
+                          "application/x-ndjson")
+
+    # Mode ASGI (asgi.py): engine async dédié + pont WSGI pour les routes non natives
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")  # défaut: dérivée de SQLALCHEMY_DATABASE_URI
+    ASGI_DB_POOL_SIZE = int(os.getenv("ASGI_DB_POOL_SIZE", "10"))
+    ASGI_DB_MAX_OVERFLOW = int(os.getenv("ASGI_DB_MAX_OVERFLOW", "10"))
+    ASGI_DB_POOL_TIMEOUT = int(os.getenv("ASGI_DB_POOL_TIMEOUT", "10"))
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "8"))  # threads pour les routes Flask relayées
+
 class DevConfig(BaseConfig):
     DEBUG = True
 
 class ProdConfig(BaseConfig):
     DEBUG = False
+    # Backend explicite (smtp): pas de défaut console, pas de mails journalisés
+    MAIL_BACKEND = os.getenv("MAIL_BACKEND")
+    MAIL_CONSOLE_ALLOWED = False
 
 class TestConfig(BaseConfig):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
+    HEALTH_BACKGROUND = False        # les tests déclenchent run_once() / refresh() explicitement
+    HEALTH_CHECK_MIGRATIONS = False  # schéma créé par create_all, pas par Alembic
+    AUDIT_MODE = "sync"              # événements lisibles dès la réponse
+    INTROSPECTION_API_KEYS = ["test-introspection-key"]
+    NOTES_CACHE_ENABLED = "true"     # LRU local (process unique)
+    JOBS_EAGER = True                # jobs exécutés dans la requête
+    MAIL_BACKEND = "memory"          # mails lisibles dans app.extensions["mailer"].outbox
+    PROFILING_ENABLED = True
+    ATTACHMENTS_STORAGE_URI = f"file://{os.path.join(tempfile.gettempdir(), 'genxtrack-test-attachments')}"
+
+
+def config_for_env(env: str):
+    if env in ("test", "testing"):
+        return TestConfig
+    if env == "production":
+        return ProdConfig
+    return DevConfig
@@ -1,4 +1,5 @@
 # app/docs/spec.py
+from functools import lru_cache
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
 from marshmallow import Schema, fields
@@ -62,6 +63,7 @@ except Exception:
 def _ref(name: str):
     return {"$ref": f"#/components/schemas/{name}"}
 
+@lru_cache(maxsize=1)  # spec statique: construite une fois par process (ou au warm-up)
 def build_spec():
     spec = APISpec(
         title="GenXTrack Auth API",
@@ -116,6 +118,70 @@ def build_spec():
         },
     )
 
+    spec.path(
+        path="/.well-known/jwks.json",
+        operations={
+            "get": {
+                "summary": "Public signing keys (JWKS) to verify access tokens locally",
+                "responses": {
+                    "200": {"description": "JWK Set (kid -> public key), cacheable"},
+                    "304": {"description": "Not modified (If-None-Match)"},
+                },
+            }
+        },
+    )
+
+    spec.path(
+        path="/api/v1/auth/introspect",
+        operations={
+            "post": {
+                "summary": "Token introspection (RFC 7662 style), single or batch",
+                "description": "Caller authenticated with the X-Introspection-Key header.",
+                "parameters": [{"in": "header", "name": "X-Introspection-Key", "required": True,
+                                "schema": {"type": "string"}}],
+                "requestBody": {
+                    "required": True,
+                    "content": {"application/json": {"schema": {
+                        "type": "object",
+                        "properties": {"token": {"type": "string"},
+                                       "tokens": {"type": "array", "items": {"type": "string"}, "maxItems": 100}},
+                    }}},
+                },
+                "responses": {
+                    "200": {"description": "{active, sub, jti, token_type, exp, iat, role, ...} or {results: [...]}"},
+                    "401": {"description": "Invalid introspection key"},
+                },
+            }
+        },
+    )
+
+    spec.path(
+        path="/api/v1/auth/verify-email",
+        operations={"post": {"summary": "Send (again) the email verification link", "security": [{"bearerAuth": []}],
+                             "responses": {"202": {"description": "Accepted, mail sent by a background job"}}}},
+    )
+    spec.path(
+        path="/api/v1/auth/verify-email/confirm",
+        operations={"post": {"summary": "Confirm email with the emailed token",
+                             "requestBody": {"required": True, "content": {"application/json": {"schema": {
+                                 "type": "object", "properties": {"token": {"type": "string"}}}}}},
+                             "responses": {"200": {"description": "Verified"}, "400": {"description": "Invalid or expired token"}}}},
+    )
+    spec.path(
+        path="/api/v1/auth/password-reset",
+        operations={"post": {"summary": "Request a password reset link (always 202)",
+                             "requestBody": {"required": True, "content": {"application/json": {"schema": {
+                                 "type": "object", "properties": {"email": {"type": "string"}}}}}},
+                             "responses": {"202": {"description": "Accepted"}}}},
+    )
+    spec.path(
+        path="/api/v1/auth/password-reset/confirm",
+        operations={"post": {"summary": "Set a new password with the emailed single-use token",
+                             "requestBody": {"required": True, "content": {"application/json": {"schema": {
+                                 "type": "object", "properties": {"token": {"type": "string"}, "password": {"type": "string"}}}}}},
+                             "responses": {"200": {"description": "Password changed"}, "400": {"description": "Invalid or expired token"}}}},
+    )
+
     spec.path(
         path="/api/v1/auth/me",
         operations={
@@ -153,17 +219,94 @@ def build_spec():
                 "responses": {"201": {"content": {"application/json": {"schema": _ref("NoteOut")}}}},
             },
             "get": {
-                "summary": "List my notes (paginated)",
+                "summary": "List my notes (paginated), or notes shared with me (scope=shared|all, keyset)",
                 "security": [{"bearerAuth": []}],
                 "parameters": [
+                    {"in": "query", "name": "scope", "schema": {"type": "string", "enum": ["own", "shared", "all"]},
+                     "description": "own (default, page/total) | shared | all (mine + shared, meta.next_cursor, item.access)"},
+                    {"in": "query", "name": "cursor", "schema": {"type": "string"}, "description": "scope=shared|all only"},
                     {"in": "query", "name": "page", "schema": {"type": "integer"}},
                     {"in": "query", "name": "per_page", "schema": {"type": "integer"}},
+                    {"in": "query", "name": "view", "schema": {"type": "string", "enum": ["full", "summary"]}},
+                    {"in": "query", "name": "fields", "schema": {"type": "string"},
+                     "description": "Comma-separated subset of id,title,content,excerpt,content_length,owner_id,created_at,updated_at"},
                 ],
                 "responses": {"200": {"description": "Paged list"}},
             },
         },
     )
 
+    spec.path(
+        path="/api/v1/notes/search",
+        operations={
+            "get": {
+                "summary": "Full-text search in my notes (ranked, keyset paginated)",
+                "security": [{"bearerAuth": []}],
+                "parameters": [
+                    {"in": "query", "name": "q", "required": True, "schema": {"type": "string"}},
+                    {"in": "query", "name": "per_page", "schema": {"type": "integer"}},
+                    {"in": "query", "name": "cursor", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "Ranked results with highlights and meta.next_cursor"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/notes/changes",
+        operations={
+            "get": {
+                "summary": "Delta sync: my notes created/updated/deleted since a change cursor",
+                "security": [{"bearerAuth": []}],
+                "parameters": [
+                    {"in": "query", "name": "since", "schema": {"type": "string"}},
+                    {"in": "query", "name": "limit", "schema": {"type": "integer"}},
+                ],
+                "responses": {"200": {"description": "Changes (op=upsert|delete) ordered by seq, meta.next_cursor/has_more"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/notes/events",
+        operations={
+            "get": {
+                "summary": "Server-Sent Events stream of my note changes (ASGI app only)",
+                "description": "event: note, data {op: create|update|delete (upsert when replayed), id, seq, note}. "
+                               "Resume with Last-Event-ID (same cursor as /notes/changes?since=); "
+                               "event: resync {since} when too far behind; ': ping' heartbeats.",
+                "security": [{"bearerAuth": []}],
+                "parameters": [
+                    {"in": "header", "name": "Last-Event-ID", "schema": {"type": "string"}},
+                    {"in": "query", "name": "last_event_id", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "text/event-stream"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/notes/stats",
+        operations={
+            "get": {
+                "summary": "My note counters (note_count, content_bytes, last_write_at)",
+                "security": [{"bearerAuth": []}],
+                "responses": {"200": {"description": "Materialized per-owner statistics"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/notes/cache/stats",
+        operations={
+            "get": {
+                "summary": "Read cache hit/miss counters (admin, per process)",
+                "security": [{"bearerAuth": []}],
+                "responses": {"200": {"description": "backend, note/list hits, misses, hit_rate"}},
+            },
+        },
+    )
+
     spec.path(
         path="/api/v1/notes/{id}",
         operations={
@@ -193,6 +336,81 @@ def build_spec():
         },
     )
 
+    spec.path(
+        path="/api/v1/notes/{id}/shares",
+        operations={
+            "post": {
+                "summary": "Share a note ({email, permission: read|write}); sharing again updates the permission",
+                "security": [{"bearerAuth": []}],
+                "parameters": [{"in": "path", "name": "id", "required": True, "schema": {"type": "string"}}],
+                "responses": {"201": {"description": "Share (grantee_id, email, permission)"},
+                              "404": {"description": "Note or user not found"}},
+            },
+            "get": {
+                "summary": "List shares of a note (owner)",
+                "security": [{"bearerAuth": []}],
+                "parameters": [{"in": "path", "name": "id", "required": True, "schema": {"type": "string"}}],
+                "responses": {"200": {"description": "Shares"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/notes/{id}/shares/{grantee_id}",
+        operations={
+            "delete": {
+                "summary": "Revoke a share (owner)",
+                "security": [{"bearerAuth": []}],
+                "parameters": [{"in": "path", "name": "id", "required": True, "schema": {"type": "string"}},
+                               {"in": "path", "name": "grantee_id", "required": True, "schema": {"type": "string"}}],
+                "responses": {"204": {"description": "No content"}},
+            },
+        },
+    )
+
+    # ---- ATTACHMENTS ----
+    _note_param = {"in": "path", "name": "note_id", "required": True, "schema": {"type": "string"}}
+    _attachment_params = [_note_param, {"in": "path", "name": "attachment_id", "required": True, "schema": {"type": "string"}}]
+    spec.path(
+        path="/api/v1/notes/{note_id}/attachments",
+        operations={
+            "post": {
+                "summary": "Open an attachment upload ({filename, content_type?, size})",
+                "security": [{"bearerAuth": []}],
+                "parameters": [_note_param],
+                "responses": {"201": {"description": "Attachment (status=uploading), Location = upload URL"}},
+            },
+            "get": {
+                "summary": "List attachments of a note",
+                "security": [{"bearerAuth": []}],
+                "parameters": [_note_param],
+                "responses": {"200": {"description": "Attachments"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/notes/{note_id}/attachments/{attachment_id}/content",
+        operations={
+            "put": {
+                "summary": "Upload one chunk (Content-Range: bytes start-end/size) or the whole file",
+                "security": [{"bearerAuth": []}],
+                "parameters": _attachment_params,
+                "responses": {
+                    "200": {"description": "Attachment with received offset (status=ready when complete)"},
+                    "409": {"description": "Chunk does not start at the current offset (details.offset)"},
+                },
+            },
+            "get": {
+                "summary": "Download (Range supported)",
+                "security": [{"bearerAuth": []}],
+                "parameters": _attachment_params,
+                "responses": {"200": {"description": "File"}, "206": {"description": "Partial content"},
+                              "302": {"description": "Redirect to the object store"}},
+            },
+        },
+    )
+
     # ---- ADMIN ----
     spec.path(
         path="/api/v1/users/",
@@ -208,4 +426,68 @@ def build_spec():
         },
     )
 
+    spec.path(
+        path="/api/v1/users/{user_id}",
+        operations={
+            "delete": {
+                "summary": "Delete a user (admin): tokens rejected now, data purged in background batches",
+                "security": [{"bearerAuth": []}],
+                "parameters": [{"in": "path", "name": "user_id", "required": True, "schema": {"type": "string"}}],
+                "responses": {"202": {"description": "Deletion status, Location = status URL"},
+                              "404": {"description": "Not found"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/users/{user_id}/deletion",
+        operations={
+            "get": {
+                "summary": "Deletion progress (admin): status, notes_deleted / notes_total",
+                "security": [{"bearerAuth": []}],
+                "parameters": [{"in": "path", "name": "user_id", "required": True, "schema": {"type": "string"}}],
+                "responses": {"200": {"description": "pending | purging | done"}, "404": {"description": "Not found"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/admin/profiling/token",
+        operations={
+            "post": {
+                "summary": "Issue a short-lived X-Profile token (admin; profiling enabled only)",
+                "security": [{"bearerAuth": []}],
+                "responses": {"201": {"description": "token, header, expires_in"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/admin/profiling/profiles/{id}",
+        operations={
+            "get": {
+                "summary": "Stored cProfile of one request (format=text|pstats)",
+                "security": [{"bearerAuth": []}],
+                "parameters": [
+                    {"in": "path", "name": "id", "required": True, "schema": {"type": "string"}},
+                    {"in": "query", "name": "format", "schema": {"type": "string"}},
+                    {"in": "query", "name": "sort", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "Text report or marshalled pstats"}, "404": {"description": "Not found"}},
+            },
+        },
+    )
+
+    spec.path(
+        path="/api/v1/admin/profiling/flamegraph",
+        operations={
+            "get": {
+                "summary": "Folded stacks of sampled requests (flamegraph.pl / speedscope input)",
+                "security": [{"bearerAuth": []}],
+                "parameters": [{"in": "query", "name": "minutes", "schema": {"type": "integer"}}],
+                "responses": {"200": {"description": "text/plain, one 'stack count' per line"}},
+            },
+        },
+    )
+
     return spec.to_dict()
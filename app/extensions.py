@@ -4,8 +4,9 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from app.common.routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})  # lectures GET -> réplicas si configurés
 migrate = Migrate()
 jwt = JWTManager()
 cors = CORS()
@@ -0,0 +1,260 @@
+# app/jobs/queue.py
+# File de jobs légère pour les effets de bord lents (mails, purges): la requête
+# empile un job (après son commit) et répond tout de suite.
+#   JOBS_QUEUE_URI redis://... -> file Redis partagée, consommée par `python worker.py`
+#   JOBS_QUEUE_URI memory://   -> file in-process + thread consommateur (dev, process unique)
+#   JOBS_EAGER=true            -> exécution immédiate dans l'appelant (tests)
+# Échec -> nouvel essai avec backoff exponentiel (jitter) jusqu'à max_attempts,
+# puis file "dead" (consultable, jamais rejouée automatiquement).
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+from flask import current_app
+
+from app.extensions import db
+from app.common.storage import redis_from_uri
+
+log = logging.getLogger("app.jobs")
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    name: str
+    func: Callable
+    max_attempts: int
+    every: str | None  # clé de config (secondes) pour un job périodique
+
+
+JOBS: dict[str, JobSpec] = {}
+
+
+def job(name: str, max_attempts: int = 5, every: str | None = None):
+    """
+    Ex: @job("auth.send_password_reset")
+        def send_password_reset(email): ...
+    Les arguments passent par JSON: types simples uniquement (str, int, ...).
+    """
+    def deco(fn):
+        JOBS[name] = JobSpec(name, fn, max_attempts, every)
+        return fn
+    return deco
+
+
+def new_payload(name: str, args: dict) -> dict:
+    if name not in JOBS:
+        raise KeyError(f"Unknown job: {name}")
+    return {"id": uuid.uuid4().hex, "name": name, "args": args, "attempts": 0, "enqueued_at": time.time()}
+
+
+def backoff(attempts: int, base: float, cap: float) -> float:
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+def execute(app, payload: dict) -> tuple[str, float]:
+    """Exécute un job -> ("done" | "retry" | "dead", délai avant nouvel essai)."""
+    spec = JOBS.get(payload["name"])
+    if spec is None:
+        log.error("job_unknown", extra={"job": payload["name"], "job_id": payload["id"]})
+        return "dead", 0.0
+    payload["attempts"] += 1
+    extra = {"job": spec.name, "job_id": payload["id"], "attempt": payload["attempts"]}
+    t0 = time.monotonic()
+    with app.app_context():
+        try:
+            spec.func(**payload["args"])
+        except Exception as e:
+            db.session.rollback()
+            payload["last_error"] = f"{type(e).__name__}: {e}"[:500]
+            if payload["attempts"] >= spec.max_attempts:
+                log.error("job_failed", extra=extra, exc_info=True)
+                return "dead", 0.0
+            delay = backoff(payload["attempts"], app.config["JOBS_BACKOFF_BASE"], app.config["JOBS_BACKOFF_MAX"])
+            log.warning("job_retry", extra={**extra, "retry_in": round(delay, 1)}, exc_info=True)
+            return "retry", delay
+        finally:
+            db.session.remove()
+    log.info("job_done", extra={**extra, "duration_ms": round((time.monotonic() - t0) * 1000, 1)})
+    return "done", 0.0
+
+
+class RedisQueue:
+    """
+    jobs:ready (liste), jobs:scheduled (zset run_at), jobs:inflight (zset échéance de
+    visibilité), jobs:dead (liste bornée). reserve() est atomique (Lua): promotion des
+    jobs dus, remise en file des jobs d'un worker mort (visibilité dépassée), pop.
+    """
+    RESERVE = """
+    local now = tonumber(ARGV[1])
+    for _, key in ipairs({KEYS[2], KEYS[3]}) do
+        local due = redis.call('ZRANGEBYSCORE', key, '-inf', now, 'LIMIT', 0, 100)
+        for _, raw in ipairs(due) do
+            redis.call('ZREM', key, raw)
+            redis.call('RPUSH', KEYS[1], raw)
+        end
+    end
+    local raw = redis.call('LPOP', KEYS[1])
+    if raw then redis.call('ZADD', KEYS[3], now + tonumber(ARGV[2]), raw) end
+    return raw
+    """
+
+    def __init__(self, client, prefix: str = "jobs:", visibility: float = 300, dead_max: int = 1000):
+        self._redis = client
+        self.visibility = visibility
+        self.dead_max = dead_max
+        self.k_ready, self.k_scheduled = f"{prefix}ready", f"{prefix}scheduled"
+        self.k_inflight, self.k_dead, self.k_periodic = f"{prefix}inflight", f"{prefix}dead", f"{prefix}periodic:"
+        self._reserve = client.register_script(self.RESERVE)
+
+    def push(self, payload: dict, delay: float = 0.0) -> None:
+        raw = json.dumps(payload)
+        if delay > 0:
+            self._redis.zadd(self.k_scheduled, {raw: time.time() + delay})
+        else:
+            self._redis.rpush(self.k_ready, raw)
+
+    def reserve(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            raw = self._reserve(keys=[self.k_ready, self.k_scheduled, self.k_inflight],
+                                args=[time.time(), self.visibility])
+            if raw is not None:
+                return raw, json.loads(raw)
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(min(0.2, timeout))
+
+    def ack(self, raw) -> None:
+        self._redis.zrem(self.k_inflight, raw)
+
+    def retry(self, raw, payload: dict, delay: float) -> None:
+        pipe = self._redis.pipeline()
+        pipe.zrem(self.k_inflight, raw)
+        pipe.zadd(self.k_scheduled, {json.dumps(payload): time.time() + delay})
+        pipe.execute()
+
+    def dead(self, raw, payload: dict) -> None:
+        pipe = self._redis.pipeline()
+        pipe.zrem(self.k_inflight, raw)
+        pipe.lpush(self.k_dead, json.dumps(payload))
+        pipe.ltrim(self.k_dead, 0, self.dead_max - 1)
+        pipe.execute()
+
+    def claim_periodic(self, name: str, every: float) -> bool:
+        # Un seul enqueue par période, quel que soit le nombre de workers
+        return bool(self._redis.set(self.k_periodic + name, 1, nx=True, ex=max(int(every), 1)))
+
+    def stats(self) -> dict:
+        pipe = self._redis.pipeline()
+        pipe.llen(self.k_ready).zcard(self.k_scheduled).zcard(self.k_inflight).llen(self.k_dead)
+        ready, scheduled, inflight, dead = pipe.execute()
+        return {"backend": "redis", "ready": ready, "scheduled": scheduled, "inflight": inflight, "dead": dead}
+
+
+class MemoryQueue:
+    """Même interface, en mémoire du process (tas trié par run_at)."""
+
+    def __init__(self, dead_max: int = 1000):
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._periodic: dict[str, float] = {}
+        self.dead_jobs: deque = deque(maxlen=dead_max)
+
+    def push(self, payload: dict, delay: float = 0.0) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), payload))
+            self._cond.notify()
+
+    def reserve(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    payload = heapq.heappop(self._heap)[2]
+                    return payload, payload
+                if now >= deadline:
+                    return None
+                wake = self._heap[0][0] if self._heap else deadline
+                self._cond.wait(min(wake, deadline) - now)
+
+    def ack(self, raw) -> None:
+        pass
+
+    def retry(self, raw, payload: dict, delay: float) -> None:
+        self.push(payload, delay)
+
+    def dead(self, raw, payload: dict) -> None:
+        self.dead_jobs.appendleft(payload)
+
+    def claim_periodic(self, name: str, every: float) -> bool:
+        now = time.monotonic()
+        if self._periodic.get(name, 0) > now:
+            return False
+        self._periodic[name] = now + every
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            ready = sum(1 for run_at, _, _ in self._heap if run_at <= now)
+            return {"backend": "memory", "ready": ready, "scheduled": len(self._heap) - ready,
+                    "inflight": None, "dead": len(self.dead_jobs)}
+
+
+class JobQueue:
+    def __init__(self, app):
+        cfg = app.config
+        self.app = app
+        self.eager = cfg["JOBS_EAGER"]
+        client = redis_from_uri(cfg.get("JOBS_QUEUE_URI"))
+        self.backend = RedisQueue(client, visibility=cfg["JOBS_VISIBILITY_TIMEOUT"]) if client else MemoryQueue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, name: str, delay: float = 0.0, **args) -> str | None:
+        """Empile name(**args); retourne l'id du job, None si la file est indisponible."""
+        payload = new_payload(name, args)
+        if self.eager:
+            execute(self.app, payload)
+            return payload["id"]
+        if isinstance(self.backend, MemoryQueue):
+            self._ensure_local_worker()
+        try:
+            self.backend.push(payload, delay)
+        except Exception:
+            log.error("job_enqueue_failed", extra={"job": name}, exc_info=True)
+            return None
+        return payload["id"]
+
+    def _ensure_local_worker(self) -> None:
+        # memory://: pas de process worker.py pour consommer -> thread du process (pid-checké)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            from app.jobs.worker import Worker
+            self.backend = MemoryQueue()  # worker forké: file propre à ce process
+            self._thread = threading.Thread(target=Worker(self.app, self).run, name="jobs-worker", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+
+def init_jobs(app) -> None:
+    app.extensions["jobs"] = JobQueue(app)
+
+
+def enqueue(name: str, delay: float = 0.0, **args) -> str | None:
+    return current_app.extensions["jobs"].enqueue(name, delay, **args)
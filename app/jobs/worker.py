@@ -0,0 +1,63 @@
+# app/jobs/worker.py
+# Boucle de consommation: réserve un job, l'exécute, ack / nouvel essai différé / dead.
+# Lancé par worker.py (file Redis) ou en thread du process (memory://).
+import logging
+import threading
+import time
+
+from app.jobs.queue import JOBS, execute, new_payload
+
+log = logging.getLogger("app.jobs")
+
+
+class Worker:
+    def __init__(self, app, jobs=None):
+        self.app = app
+        self.jobs = jobs or app.extensions["jobs"]
+        self.poll_interval = app.config["JOBS_POLL_INTERVAL"]
+        self._stop = threading.Event()
+        self._next_periodic = 0.0
+
+    def stop(self) -> None:
+        """Arrêt propre: le job en cours se termine, aucun nouveau n'est pris."""
+        self._stop.set()
+
+    def _schedule_periodic(self) -> None:
+        now = time.monotonic()
+        if now < self._next_periodic:
+            return
+        self._next_periodic = now + 5
+        for spec in JOBS.values():
+            if spec.every is None:
+                continue
+            every = float(self.app.config[spec.every])
+            if every > 0 and self.jobs.backend.claim_periodic(spec.name, every):
+                self.jobs.backend.push(new_payload(spec.name, {}))
+
+    def run_once(self, timeout: float | None = None) -> bool:
+        """Traite au plus un job; False si rien à faire pendant timeout."""
+        backend = self.jobs.backend
+        reserved = backend.reserve(self.poll_interval if timeout is None else timeout)
+        if reserved is None:
+            return False
+        raw, payload = reserved
+        status, delay = execute(self.app, payload)
+        if status == "done":
+            backend.ack(raw)
+        elif status == "retry":
+            backend.retry(raw, payload, delay)
+        else:
+            backend.dead(raw, payload)
+        return True
+
+    def run(self) -> None:
+        log.info("jobs_worker_started", extra={"backend": type(self.jobs.backend).__name__})
+        while not self._stop.is_set():
+            try:
+                self._schedule_periodic()
+                self.run_once()
+            except Exception:
+                # File indisponible (Redis redémarre...): on réessaie sans mourir
+                log.exception("jobs_worker_error")
+                self._stop.wait(self.poll_interval)
+        log.info("jobs_worker_stopped")
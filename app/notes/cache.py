@@ -0,0 +1,168 @@
+# app/notes/cache.py
+# Cache read-through des lectures chaudes: GET /notes/<id> et 1re page de GET /notes.
+# On stocke le corps JSON déjà sérialisé (ni fetch, ni marshmallow sur un hit).
+#
+# Invalidation par version d'owner: chaque clé embarque la version courante de
+# l'owner; create/update/delete changent la version après commit et toutes les
+# entrées de l'owner deviennent inatteignables d'un coup (elles expirent par TTL).
+# La version est un jeton unique plutôt qu'un compteur: une version évincée ou
+# expirée n'est jamais réutilisée, donc jamais d'ancien corps servi par erreur.
+#
+# Droits: une entrée n'est écrite que dans l'espace de son owner, après le contrôle
+# d'accès, et n'est lue que dans l'espace de l'appelant -> un hit implique la propriété.
+# Les admins (lecture de notes d'autres users, liste globale) ne passent pas par le cache.
+#
+# Tiers: Redis (partagé entre workers) si NOTES_CACHE_URI est redis://, plus un LRU
+# local pour les corps (sûr: la clé porte la version lue dans Redis). En memory://
+# tout est local au process: à réserver à un process unique (dev, tests).
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app
+
+from app.common.storage import redis_from_uri
+
+log = logging.getLogger(__name__)
+
+KINDS = ("note", "list")
+
+
+class _LocalLRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class NoteCache:
+    def __init__(self, redis_client=None, ttl: float = 300, local_size: int = 10000, local_ttl: float = 30,
+                 prefix: str = "nc:"):
+        self._redis = redis_client
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl, ttl)
+        self._prefix = prefix
+        self._bodies = _LocalLRU(local_size)
+        self._versions = _LocalLRU(local_size)  # memory:// uniquement
+        self._stats = {kind: {"hits": 0, "misses": 0} for kind in KINDS}
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    # --- versions par owner ---
+    def version(self, owner_id) -> str:
+        key = f"{self._prefix}v:{owner_id}"
+        if self._redis is None:
+            version = self._versions.get(key)
+            if version is None:
+                version = _new_version()
+                self._versions.set(key, version, float("inf"))
+            return version
+        version = self._redis.get(key)
+        if version is None:
+            # Première lecture (ou version évincée): jeton neuf, jamais un ancien
+            self._redis.set(key, _new_version(), nx=True)
+            version = self._redis.get(key)
+        return version.decode() if isinstance(version, bytes) else version
+
+    def bump(self, owner_id) -> None:
+        """À appeler après le commit d'une écriture sur les notes de owner_id."""
+        key = f"{self._prefix}v:{owner_id}"
+        if self._redis is None:
+            self._versions.set(key, _new_version(), float("inf"))
+            return
+        try:
+            self._redis.set(key, _new_version())
+        except Exception:
+            # Sans bump les lectures resteraient servies jusqu'au TTL: on le signale fort
+            self._count_error()
+            log.error("notes_cache_bump_failed", extra={"owner_id": str(owner_id)}, exc_info=True)
+
+    # --- corps sérialisés ---
+    def lookup(self, kind: str, owner_id, *parts) -> tuple[str | None, bytes | None]:
+        """(clé, corps); corps None = miss. Clé None = cache indisponible (ne pas stocker)."""
+        try:
+            key = ":".join((f"{self._prefix}{kind}", str(owner_id), self.version(owner_id), *map(str, parts)))
+            body = self._bodies.get(key)
+            if body is None and self._redis is not None:
+                body = self._redis.get(key)
+                if body is not None:
+                    self._bodies.set(key, body, self.local_ttl)
+        except Exception:
+            self._count_error()
+            log.warning("notes_cache_unavailable", exc_info=True)
+            return None, None
+        with self._lock:
+            self._stats[kind]["hits" if body is not None else "misses"] += 1
+        return key, body
+
+    def store(self, key: str | None, body: bytes) -> None:
+        if key is None:
+            return
+        self._bodies.set(key, body, self.local_ttl if self._redis is not None else self.ttl)
+        if self._redis is not None:
+            try:
+                self._redis.set(key, body, px=int(self.ttl * 1000))
+            except Exception:
+                self._count_error()
+                log.warning("notes_cache_unavailable", exc_info=True)
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {"backend": self.backend, "pid": os.getpid(), "errors": self._errors}
+            for kind, s in self._stats.items():
+                total = s["hits"] + s["misses"]
+                out[kind] = {**s, "hit_rate": round(s["hits"] / total, 4) if total else None}
+        return out
+
+
+def init_note_cache(app) -> None:
+    uri = app.config.get("NOTES_CACHE_URI")
+    client = redis_from_uri(uri)
+    enabled = str(app.config.get("NOTES_CACHE_ENABLED", "auto")).lower()
+    if enabled == "false" or (enabled == "auto" and client is None):
+        # auto: pas de cache local par défaut (versions non partagées entre workers gunicorn)
+        app.extensions["notes_cache"] = None
+        return
+    app.extensions["notes_cache"] = NoteCache(
+        client,
+        ttl=app.config.get("NOTES_CACHE_TTL", 300),
+        local_size=app.config.get("NOTES_CACHE_LOCAL_SIZE", 10000),
+        local_ttl=app.config.get("NOTES_CACHE_LOCAL_TTL", 30),
+    )
+
+
+def note_cache() -> NoteCache | None:
+    return current_app.extensions.get("notes_cache")
@@ -0,0 +1,83 @@
+# app/notes/changes.py
+# Synchro incrémentale: chaque écriture sur une note réécrit sa ligne note_changes
+# avec un seq croissant; GET /notes/changes?since= ne renvoie que ce qui a bougé.
+import uuid
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from app.extensions import db
+from app.notes.models import Note, NoteChange
+from app.notes.queries import NOTE_COLUMNS
+from app.common.errors import ApiError
+from app.common.utils import decode_cursor, encode_cursor
+
+_seq = NoteChange.__table__.c.seq.default  # Sequence "note_changes_seq" (Postgres)
+
+
+def _owner_lock_key(owner_id: uuid.UUID) -> int:
+    # bigint signé dérivé de l'UUID; une collision ne fait que sérialiser deux owners
+    return int.from_bytes(owner_id.bytes[:8], "big", signed=True)
+
+
+def record_change(note: Note, deleted: bool = False) -> int:
+    """
+    À appeler dans la transaction qui modifie la note, avant commit; retourne le seq attribué.
+    Sous Postgres un verrou advisory par owner (relâché au commit) garantit que
+    les seq d'un même owner deviennent visibles dans l'ordre: un client qui a lu
+    jusqu'à N ne peut pas voir apparaître plus tard un seq < N.
+    """
+    session = db.session
+    dialect = session.get_bind(clause=NoteChange.__table__.insert()).dialect.name
+    values = {"note_id": note.id, "owner_id": note.owner_id, "deleted": deleted, "changed_at": func.now()}
+    if dialect == "postgresql":
+        session.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _owner_lock_key(note.owner_id)})
+        stmt = postgresql.insert(NoteChange).values(seq=_seq.next_value(), **values)
+    elif dialect == "sqlite":
+        # SQLite sérialise les écritures: max + 1 est sûr
+        next_seq = select(func.coalesce(func.max(NoteChange.seq), 0) + 1).scalar_subquery()
+        stmt = sqlite.insert(NoteChange).values(seq=next_seq, **values)
+    else:
+        raise ApiError("Change tracking is not supported on this database.", 501, "not_implemented")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NoteChange.note_id],
+        set_={"seq": stmt.excluded.seq, "deleted": stmt.excluded.deleted, "changed_at": stmt.excluded.changed_at},
+    ).returning(NoteChange.seq)
+    return session.execute(stmt).scalar_one()
+
+
+def parse_changes_args(args) -> tuple[int, int]:
+    since = 0
+    if args.get("since"):
+        (since,) = decode_cursor(args["since"], 1)
+        if not isinstance(since, int) or since < 0:
+            raise ApiError("Invalid cursor.", 400, "validation_error", details={"since": args["since"]})
+    try:
+        limit = int(args.get("limit", 100))
+    except ValueError:
+        raise ApiError("Invalid pagination params.", 400, "validation_error")
+    limit = 1 if limit < 1 else 500 if limit > 500 else limit
+    return since, limit
+
+
+def changes_statement(owner_id: uuid.UUID, since: int, limit: int):
+    """Changements de l'owner après since, par seq croissant (limit + 1 pour détecter la suite)."""
+    return (
+        select(NoteChange.note_id.label("change_note_id"), NoteChange.seq, NoteChange.deleted, *NOTE_COLUMNS)
+        .outerjoin(Note, Note.id == NoteChange.note_id)
+        .where(NoteChange.owner_id == owner_id, NoteChange.seq > since)
+        .order_by(NoteChange.seq)
+        .limit(limit + 1)
+    )
+
+
+def changes_page(rows, since: int, limit: int) -> dict:
+    items = []
+    for row in rows:
+        item = dict(row)
+        item["id"] = item.pop("change_note_id")
+        # Note disparue sans tombstone (ex: cascade à la suppression du user): idem delete
+        item["deleted"] = item["deleted"] or item["title"] is None
+        items.append(item)
+    has_more = len(items) > limit
+    items = items[:limit]
+    last = items[-1]["seq"] if items else since
+    return {"items": items, "next_cursor": encode_cursor([last]), "has_more": has_more}
@@ -0,0 +1,16 @@
+# app/notes/cli.py
+# Commandes "flask notes ..." (enregistrées dans create_app).
+import uuid
+import click
+from flask.cli import AppGroup
+from app.notes.stats import rebuild_stats
+
+notes_cli = AppGroup("notes", help="Maintenance des notes.")
+
+
+@notes_cli.command("rebuild-stats")
+@click.option("--owner", "owner_id", type=click.UUID, default=None, help="Un seul owner (défaut: tous).")
+def rebuild_note_stats(owner_id: uuid.UUID | None):
+    """Recalcule note_stats depuis la table notes (après une dérive ou un import SQL)."""
+    rows = rebuild_stats(owner_id)
+    click.echo(f"[notes rebuild-stats] {rows} owner(s) recomputed")
@@ -0,0 +1,197 @@
+# app/notes/events.py
+# Flux temps réel des changements de notes: GET /api/v1/notes/events (SSE, app ASGI).
+#
+# Les routes d'écriture (Flask) publient après commit un message par changement sur le
+# canal de l'owner; chaque process ASGI relaie les messages de ses abonnés vers leurs
+# flux. Un message porte le seq de note_changes: c'est l'id SSE (même curseur que
+# /notes/changes?since=), donc Last-Event-ID permet de reprendre depuis la base.
+#
+# Brokers (NOTES_EVENTS_URI, convention app.common.storage):
+#   - redis://  : PUBLISH par les workers; côté ASGI UNE connexion pub/sub par process,
+#                 SUBSCRIBE au 1er abonné d'un canal, UNSUBSCRIBE au dernier, fan-out local;
+#   - memory:// : fan-out dans le process (dev mono-process, tests).
+# Un abonné trop lent (file pleine) ou une reconnexion Redis ne perd rien en silence:
+# la file reçoit RESYNC et le flux relit note_changes depuis son dernier seq.
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from flask import current_app
+
+from app.common.storage import redis_from_uri
+
+log = logging.getLogger(__name__)
+
+CREATE, UPDATE, DELETE = "create", "update", "delete"
+RESYNC = None  # élément de file: des messages ont pu être perdus
+
+
+def _offer(queue: asyncio.Queue, message) -> None:
+    """Dans la boucle de l'abonné: file pleine -> vidée, remplacée par RESYNC."""
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+
+class _FanOut:
+    """Abonnés locaux par canal: (boucle, file); publication possible depuis n'importe quel thread."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def add(self, channel: str) -> tuple[asyncio.AbstractEventLoop, asyncio.Queue, bool]:
+        entry = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            first = not self._subscribers[channel]
+            self._subscribers[channel].add(entry)
+        return (*entry, first)
+
+    def remove(self, channel: str, loop, queue) -> bool:
+        with self._lock:
+            subscribers = self._subscribers[channel]
+            subscribers.discard((loop, queue))
+            if subscribers:
+                return False
+            del self._subscribers[channel]
+            return True
+
+    def has(self, channel: str) -> bool:
+        with self._lock:
+            return bool(self._subscribers.get(channel))
+
+    def channels(self) -> list[str]:
+        with self._lock:
+            return list(self._subscribers)
+
+    def deliver(self, channel: str, message) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, message)
+
+    def deliver_all(self, message) -> None:
+        for channel in self.channels():
+            self.deliver(channel, message)
+
+
+class MemoryBroker:
+    backend = "memory"
+
+    def __init__(self, queue_size: int = 256):
+        self._fanout = _FanOut(queue_size)
+
+    def publish(self, channel: str, message: str) -> None:
+        self._fanout.deliver(channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        loop, queue, _ = self._fanout.add(channel)
+        try:
+            yield queue
+        finally:
+            self._fanout.remove(channel, loop, queue)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RedisBroker:
+    backend = "redis"
+
+    def __init__(self, uri: str, queue_size: int = 256, prefix: str = "ne:"):
+        self._uri = uri
+        self._prefix = prefix
+        self._publisher = redis_from_uri(uri)
+        self._fanout = _FanOut(queue_size)
+        self._pubsub = None   # créés dans la boucle ASGI, au 1er abonné
+        self._reader = None
+        self._subscribe_lock = None
+
+    def publish(self, channel: str, message: str) -> None:
+        self._publisher.publish(self._prefix + channel, message)
+
+    async def _ensure_pubsub(self):
+        if self._pubsub is None:
+            import redis.asyncio as aioredis
+            # Pas de socket_timeout: la connexion pub/sub reste muette entre deux messages
+            self._pubsub = aioredis.Redis.from_url(self._uri, socket_connect_timeout=1).pubsub()
+            self._subscribe_lock = asyncio.Lock()
+        return self._pubsub
+
+    async def _read(self) -> None:
+        prefix_len = len(self._prefix)
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # redis-py se reconnecte et se ré-abonne au prochain appel; les messages
+                # publiés entre-temps sont perdus -> chaque flux relit la base
+                log.warning("notes_events_redis_unavailable", exc_info=True)
+                self._fanout.deliver_all(RESYNC)
+                await asyncio.sleep(1)
+                continue
+            if message and message["type"] == "message":
+                channel = message["channel"].decode()[prefix_len:]
+                self._fanout.deliver(channel, message["data"].decode())
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        pubsub = await self._ensure_pubsub()
+        loop, queue, first = self._fanout.add(channel)
+        try:
+            if first:
+                async with self._subscribe_lock:
+                    await pubsub.subscribe(self._prefix + channel)
+                if self._reader is None:
+                    self._reader = asyncio.ensure_future(self._read())
+            yield queue
+        finally:
+            if self._fanout.remove(channel, loop, queue):
+                try:
+                    async with self._subscribe_lock:
+                        # Un nouvel abonné a pu arriver pendant l'attente du verrou
+                        if not self._fanout.has(channel):
+                            await pubsub.unsubscribe(self._prefix + channel)
+                except Exception:
+                    log.warning("notes_events_unsubscribe_failed", exc_info=True)
+
+    async def aclose(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+
+def init_note_events(app) -> None:
+    uri = app.config.get("NOTES_EVENTS_URI") or "memory://"
+    queue_size = app.config.get("NOTES_EVENTS_QUEUE_SIZE", 256)
+    if uri.startswith("memory://"):
+        app.extensions["note_events"] = MemoryBroker(queue_size)
+    else:
+        app.extensions["note_events"] = RedisBroker(uri, queue_size)
+
+
+def publish_note_event(owner_id, op: str, note_id, seq: int, note: dict | None = None) -> None:
+    """À appeler après le commit; un broker indisponible ne fait pas échouer l'écriture."""
+    broker = current_app.extensions.get("note_events")
+    if broker is None:
+        return
+    message = json.dumps({"op": op, "id": str(note_id), "seq": seq, "note": note},
+                         sort_keys=True, separators=(",", ":"))
+    try:
+        broker.publish(str(owner_id), message)
+    except Exception:
+        # Les abonnés ne verront ce changement qu'à leur prochaine reprise (Last-Event-ID)
+        log.warning("notes_events_publish_failed", extra={"owner_id": str(owner_id)}, exc_info=True)
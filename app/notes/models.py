@@ -1,17 +1,151 @@
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import func, ForeignKey
+from sqlalchemy import func, ForeignKey, ForeignKeyConstraint, DDL, event, BigInteger, Integer, Index, Sequence
+from sqlalchemy.orm import validates
 from app.extensions import db
 
+EXCERPT_CHARS = 200
+# Postgres: notes partitionnée par HASH(owner_id) (même valeur que la migration 9d4f6b2e1a87)
+NOTES_PARTITIONS = 16
+
+
+def make_excerpt(content: str) -> str:
+    # Espaces normalisés, tronqué à EXCERPT_CHARS (même règle que le backfill SQL de la migration)
+    text = " ".join((content or "").split())
+    return text if len(text) <= EXCERPT_CHARS else text[:EXCERPT_CHARS - 1] + "…"
+
 class Note(db.Model):
     __tablename__ = "notes"
+    # Sous Postgres la clé primaire doit contenir la clé de partition: PK (id, owner_id).
+    # L'ORM identifie toujours une note par son id seul (db.session.get(Note, note_id)).
+    __table_args__ = (
+        # Listes par owner triées created_at desc, id desc (pagination keyset); remplace ix_notes_owner_id
+        Index("ix_notes_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        {"postgresql_partition_by": "HASH (owner_id)"},
+    )
+    __mapper_args__ = {"primary_key": ["id"]}
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
+    # Dérivés de content, maintenus à l'écriture: la vue summary ne lit jamais content
+    excerpt = db.Column(db.String(EXCERPT_CHARS), nullable=False, default="")
+    content_length = db.Column(db.Integer, nullable=False, default=0)
 
-    owner_id = db.Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    owner_id = db.Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     owner = db.relationship("User", back_populates="notes", lazy="joined")
 
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    @validates("content")
+    def _sync_summary(self, key, value):
+        self.excerpt = make_excerpt(value)
+        self.content_length = len(value or "")
+        return value
+
+
+class NoteChange(db.Model):
+    """
+    Journal de synchro: une ligne par note, réécrite à chaque changement avec un seq
+    croissant. La ligne survit à la suppression de la note (tombstone, deleted=True).
+    """
+    __tablename__ = "note_changes"
+
+    note_id = db.Column(UUID(as_uuid=True), primary_key=True)  # pas de FK: la note peut avoir disparu
+    owner_id = db.Column(UUID(as_uuid=True), nullable=False)
+    seq = db.Column(BigInteger().with_variant(Integer, "sqlite"), Sequence("note_changes_seq"), nullable=False, unique=True)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+    changed_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_note_changes_owner_id_seq", "owner_id", "seq"),
+    )
+
+
+
+class NoteStats(db.Model):
+    """
+    Compteurs par owner maintenus dans la transaction de chaque écriture
+    (cf. app.notes.stats): meta.total et /notes/stats sans COUNT(*) sur notes.
+    """
+    __tablename__ = "note_stats"
+
+    owner_id = db.Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    note_count = db.Column(BigInteger, nullable=False, default=0)
+    content_bytes = db.Column(BigInteger, nullable=False, default=0)  # UTF-8
+    last_write_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+SHARE_READ = "read"
+SHARE_WRITE = "write"
+SHARE_PERMISSIONS = (SHARE_READ, SHARE_WRITE)
+
+
+class NoteShare(db.Model):
+    """
+    ACL de partage: une ligne par (note, destinataire). Les contrôles d'accès sont des
+    EXISTS sur la PK, intégrés au WHERE des lectures/écritures (cf. app.notes.shares).
+    note_created_at recopie notes.created_at (immuable) pour paginer "partagées avec moi"
+    sur l'index du destinataire, sans trier ses notes partagées à chaque page.
+    """
+    __tablename__ = "note_shares"
+
+    note_id = db.Column(UUID(as_uuid=True), primary_key=True)
+    grantee_id = db.Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    owner_id = db.Column(UUID(as_uuid=True), nullable=False)
+    permission = db.Column(db.String(8), nullable=False, default=SHARE_READ)
+    note_created_at = db.Column(db.DateTime(timezone=True), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # FK composite = PK des notes partitionnées; suppression de la note -> partages supprimés
+        ForeignKeyConstraint(["note_id", "owner_id"], ["notes.id", "notes.owner_id"], ondelete="CASCADE"),
+        Index("ix_note_shares_grantee_id_note_created_at", "grantee_id", "note_created_at", "note_id"),
+    )
+
+# --- Recherche plein texte ---
+# Postgres: colonne générée tsvector + index GIN (non mappée: jamais chargée par l'ORM).
+# SQLite (dev/tests): table FTS5 "external content" synchronisée par triggers.
+# Mêmes objets que les migrations 3f1c2a9b7d10 et 8e3b5d7a2c64, pour db.create_all().
+NOTES_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(content, '')), 'B')) STORED",
+        "CREATE INDEX ix_notes_search_vector ON notes USING gin (search_vector)",
+    ],
+    "sqlite": [
+        # Clé FTS stable: notes_fts_keys.key (INTEGER PRIMARY KEY, que VACUUM ne renumérote
+        # pas) pour chaque note.id; le contenu est relu par la vue notes_fts_content.
+        "CREATE TABLE notes_fts_keys (key INTEGER PRIMARY KEY, note_id CHAR(32) NOT NULL UNIQUE)",
+        "CREATE VIEW notes_fts_content AS SELECT k.key, n.title, n.content "
+        "FROM notes_fts_keys k JOIN notes n ON n.id = k.note_id",
+        "CREATE VIRTUAL TABLE notes_fts USING fts5(title, content, content='notes_fts_content', content_rowid='key')",
+        "CREATE TRIGGER notes_fts_ai AFTER INSERT ON notes BEGIN "
+        "INSERT INTO notes_fts_keys(note_id) VALUES (new.id); "
+        "INSERT INTO notes_fts(rowid, title, content) "
+        "SELECT key, new.title, new.content FROM notes_fts_keys WHERE note_id = new.id; END",
+        "CREATE TRIGGER notes_fts_ad AFTER DELETE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+        "SELECT 'delete', key, old.title, old.content FROM notes_fts_keys WHERE note_id = old.id; "
+        "DELETE FROM notes_fts_keys WHERE note_id = old.id; END",
+        "CREATE TRIGGER notes_fts_au AFTER UPDATE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+        "SELECT 'delete', key, old.title, old.content FROM notes_fts_keys WHERE note_id = old.id; "
+        "INSERT INTO notes_fts(rowid, title, content) "
+        "SELECT key, new.title, new.content FROM notes_fts_keys WHERE note_id = new.id; END",
+    ],
+}
+
+# Partitions (Postgres), créées avec la table par db.create_all()
+for _i in range(NOTES_PARTITIONS):
+    event.listen(Note.__table__, "after_create", DDL(
+        f"CREATE TABLE notes_p{_i:02d} PARTITION OF notes FOR VALUES WITH (MODULUS {NOTES_PARTITIONS}, REMAINDER {_i})"
+    ).execute_if(dialect="postgresql"))
+
+for _dialect, _statements in NOTES_SEARCH_DDL.items():
+    for _sql in _statements:
+        event.listen(Note.__table__, "after_create", DDL(_sql).execute_if(dialect=_dialect))
+for _sql in ("DROP TABLE IF EXISTS notes_fts", "DROP VIEW IF EXISTS notes_fts_content",
+             "DROP TABLE IF EXISTS notes_fts_keys"):
+    event.listen(Note.__table__, "before_drop", DDL(_sql).execute_if(dialect="sqlite"))
@@ -0,0 +1,167 @@
+# app/notes/queries.py
+# Requêtes Notes construites en SQLAlchemy Core: exécutées telles quelles par
+# l'app Flask (session sync) et par l'app ASGI (session async).
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import and_, literal, or_, select, union_all, String
+from app.notes.models import Note, NoteShare
+from app.notes.stats import total_statement
+from app.notes.shares import access_predicate, owner_alive
+from app.notes.schemas import NoteOut, NoteProjectionOut
+from app.common.errors import ApiError
+from app.common.utils import decode_cursor, encode_cursor
+
+FULL_FIELDS = ("id", "title", "content", "owner_id", "created_at", "updated_at")
+SUMMARY_FIELDS = ("id", "title", "excerpt", "content_length", "owner_id", "created_at", "updated_at")
+PROJECTABLE_FIELDS = FULL_FIELDS + ("excerpt", "content_length")
+
+NOTE_COLUMNS = tuple(Note.__table__.c[name] for name in FULL_FIELDS)
+
+# ?scope= de GET /notes: own (défaut, pagination par page), shared / all (keyset)
+SCOPES = ("own", "shared", "all")
+OWNER_ACCESS = "owner"
+
+
+def parse_pagination(args) -> tuple[int, int]:
+    # Pagination simple bornée
+    try:
+        page = max(int(args.get("page", 1)), 1)
+        per_page = int(args.get("per_page", 10))
+        per_page = 1 if per_page < 1 else 100 if per_page > 100 else per_page
+    except ValueError:
+        raise ApiError("Invalid pagination params.", 400, "validation_error")
+    return page, per_page
+
+
+def parse_projection(args) -> tuple[str, ...]:
+    """?view=summary|full et/ou ?fields=a,b -> champs à sélectionner (id toujours inclus)."""
+    view = args.get("view", "full")
+    if view not in ("full", "summary"):
+        raise ApiError("Invalid view.", 400, "validation_error", details={"view": ["Must be one of: full, summary."]})
+    if not args.get("fields"):
+        return SUMMARY_FIELDS if view == "summary" else FULL_FIELDS
+    wanted = {f.strip() for f in args["fields"].split(",") if f.strip()}
+    unknown = sorted(wanted - set(PROJECTABLE_FIELDS))
+    if unknown:
+        raise ApiError("Unknown fields.", 400, "validation_error", details={"fields": unknown})
+    wanted.add("id")
+    return tuple(f for f in PROJECTABLE_FIELDS if f in wanted)
+
+
+@lru_cache(maxsize=64)
+def projection_schema(fields: tuple[str, ...]):
+    if fields == FULL_FIELDS:
+        return NoteOut(many=True)
+    return NoteProjectionOut(many=True, only=fields)
+
+
+def list_statements(user_id: uuid.UUID, is_admin: bool, page: int, per_page: int,
+                    fields: tuple[str, ...] = FULL_FIELDS):
+    """
+    Retourne (count_stmt, page_stmt) pour GET /notes; seules les colonnes demandées sont lues.
+    Le total vient de note_stats (compteurs maintenus à l'écriture), pas d'un COUNT(*).
+    """
+    count_stmt = total_statement(user_id, is_admin)
+    page_stmt = select(*(Note.__table__.c[name] for name in fields))
+    if not is_admin:
+        page_stmt = page_stmt.where(Note.owner_id == user_id)
+    page_stmt = page_stmt.order_by(Note.created_at.desc()).limit(per_page).offset((page - 1) * per_page)
+    return count_stmt, page_stmt
+
+
+def parse_scope(args) -> str:
+    scope = args.get("scope", "own")
+    if scope not in SCOPES:
+        raise ApiError("Invalid scope.", 400, "validation_error",
+                       details={"scope": [f"Must be one of: {', '.join(SCOPES)}."]})
+    return scope
+
+
+def parse_keyset(args) -> tuple[datetime, uuid.UUID] | None:
+    """?cursor= des listes shared/all: (created_at, id) de la dernière note reçue."""
+    if not args.get("cursor"):
+        return None
+    created_at, note_id = decode_cursor(args["cursor"], 2)
+    try:
+        return datetime.fromisoformat(created_at), uuid.UUID(note_id)
+    except (TypeError, ValueError):
+        raise ApiError("Invalid cursor.", 400, "validation_error", details={"cursor": args["cursor"]})
+
+
+def _time_param(dialect: str, value: datetime):
+    if dialect == "sqlite":
+        # Texte comparé tel quel: rendu au format de CURRENT_TIMESTAMP (server_default de
+        # created_at), pas à celui de DateTime qui ajoute toujours ".000000"
+        text = value.strftime("%Y-%m-%d %H:%M:%S") + (f".{value.microsecond:06d}" if value.microsecond else "")
+        return literal(text, String)
+    return literal(value, Note.created_at.type)
+
+
+def _before(created_at, note_id, dialect: str, after):
+    t, last_id = after
+    t = _time_param(dialect, t)
+    return or_(created_at < t, and_(created_at == t, note_id < last_id))
+
+
+def _owned_page(columns, user_id, dialect, after, limit):
+    stmt = select(*columns, literal(OWNER_ACCESS, String).label("access")).where(Note.owner_id == user_id)
+    if after:
+        stmt = stmt.where(_before(Note.created_at, Note.id, dialect, after))
+    # Sous-requête: SQLite refuse ORDER BY/LIMIT dans un membre de UNION
+    page = stmt.order_by(Note.created_at.desc(), Note.id.desc()).limit(limit).subquery()
+    return select(*page.c)
+
+
+def _shared_page(columns, user_id, dialect, after, limit):
+    # Propriétaire supprimé: filtré avant le LIMIT (sinon pages courtes et has_more faux)
+    grants = select(NoteShare.note_id, NoteShare.owner_id, NoteShare.permission).where(
+        NoteShare.grantee_id == user_id, owner_alive(NoteShare.owner_id))
+    if after:
+        grants = grants.where(_before(NoteShare.note_created_at, NoteShare.note_id, dialect, after))
+    # La page de partages d'abord (index du destinataire), puis ses notes par PK: le coût
+    # ne dépend pas du nombre de partages reçus (une jointure puis un tri les lirait tous)
+    grants = grants.order_by(NoteShare.note_created_at.desc(), NoteShare.note_id.desc()).limit(limit).subquery()
+    return (
+        select(*columns, grants.c.permission.label("access"))
+        .select_from(grants)
+        .join(Note, and_(Note.id == grants.c.note_id, Note.owner_id == grants.c.owner_id))
+    )
+
+
+def shared_list_statement(dialect: str, user_id: uuid.UUID, scope: str, per_page: int,
+                          fields: tuple[str, ...] = FULL_FIELDS, after=None):
+    """
+    GET /notes?scope=shared|all: notes partagées avec user_id (et ses propres notes pour
+    all), created_at desc, id desc, per_page + 1 lignes (la dernière signale la suite).
+    Chaque branche est un parcours d'index borné: (owner_id, created_at, id) sur notes,
+    (grantee_id, note_created_at, note_id) sur note_shares; pas de OR ni de tri global
+    de toutes les notes accessibles. La colonne access vaut owner, read ou write.
+    """
+    names = fields if "created_at" in fields else fields + ("created_at",)
+    columns = [Note.__table__.c[name] for name in names]
+    limit = per_page + 1
+    merged = _shared_page(columns, user_id, dialect, after, limit)
+    if scope == "all":
+        merged = union_all(merged, _owned_page(columns, user_id, dialect, after, limit))
+    merged = merged.subquery()
+    return select(*merged.c).order_by(merged.c.created_at.desc(), merged.c.id.desc()).limit(limit)
+
+
+def keyset_page(rows, per_page: int) -> dict:
+    items = [dict(r) for r in rows]
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor([last["created_at"].isoformat(), str(last["id"])])
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def get_statement(note_id: uuid.UUID, user_id: uuid.UUID | None = None):
+    """Lecture d'une note; avec user_id, seulement si elle lui est accessible (sinon aucune ligne)."""
+    stmt = select(*NOTE_COLUMNS).where(Note.id == note_id)
+    if user_id is not None:
+        stmt = stmt.where(access_predicate(user_id))
+    return stmt
@@ -1,16 +1,37 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.extensions import db
-from app.notes.models import Note
-from app.notes.schemas import NoteIn, NoteOut
+from app.notes.models import Note, NoteShare, SHARE_WRITE
+from app.notes.schemas import NoteIn, NoteOut, NoteSearchOut, NoteChangeOut, NoteStatsOut, NoteShareIn, NoteShareOut
+from app.notes.queries import (parse_pagination, parse_projection, parse_scope, parse_keyset, projection_schema,
+                               list_statements, shared_list_statement, keyset_page)
+from app.notes.shares import accessible_note, share_note, shares_statement, revoke_share
+from app.notes.search import parse_search_args, search_statement, search_page
+from app.notes.changes import record_change, parse_changes_args, changes_statement, changes_page
+from app.notes.stats import record_stats, stats_statement, content_bytes
 from app.common.errors import ApiError
+from app.common.db import fetch_all
+from app.common.idempotency import idempotent
+from app.common.authz import roles_required
+from app.notes.cache import note_cache
+from app.notes.events import publish_note_event, CREATE, UPDATE, DELETE
+from app.attachments.models import Attachment
+from app.attachments.jobs import blob_refs, discard_blobs
+from app.auth.service import normalize_email
+from app.users.models import User
+from sqlalchemy import delete, select
 import uuid
 
 bp = Blueprint("notes", __name__)
 
 note_in = NoteIn()
 note_out = NoteOut()
-note_out_many = NoteOut(many=True)
+note_search_out_many = NoteSearchOut(many=True)
+note_change_out_many = NoteChangeOut(many=True)
+note_stats_out = NoteStatsOut()
+note_share_in = NoteShareIn()
+note_share_out = NoteShareOut()
+note_share_out_many = NoteShareOut(many=True)
 
 def _current_user_id() -> uuid.UUID:
     return uuid.UUID(get_jwt_identity())
@@ -30,55 +51,145 @@ def _ensure_can_access(note: Note, user_id: uuid.UUID):
             details={"note_id": str(note.id)}
         )
 
+def _owned_note(note_id: uuid.UUID) -> Note:
+    """Suppression, gestion des partages: propriétaire (ou admin) seulement."""
+    note = db.session.get(Note, note_id)
+    if not note:
+        raise ApiError("Note not found.", 404, "not_found")
+    _ensure_can_access(note, _current_user_id())
+    return note
+
+def _reader_cache():
+    # Admins: lectures hors de leur espace -> pas de cache (cf. app.notes.cache)
+    return None if _is_admin() else note_cache()
+
+def _bump_cache(owner_id: uuid.UUID):
+    cache = note_cache()
+    if cache:
+        cache.bump(owner_id)
+
+def _cached_response(body: bytes):
+    resp = current_app.response_class(body, mimetype="application/json")
+    resp.headers["X-Cache"] = "HIT"
+    return resp
+
+def _store_response(cache, key, resp):
+    cache.store(key, resp.get_data())
+    resp.headers["X-Cache"] = "MISS"
+    return resp
+
 @bp.post("/")
 @jwt_required()
+@idempotent("notes.create")
 def create_note():
     payload = request.get_json(silent=True) or {}
     data = note_in.load(payload)
     owner_id = _current_user_id()
     note = Note(title=data["title"], content=data["content"], owner_id=owner_id)
     db.session.add(note)
+    db.session.flush()
+    seq = record_change(note)
+    record_stats(owner_id, notes=1, content_delta=content_bytes(note.content))
     db.session.commit()
-    return jsonify(note_out.dump(note)), 201
+    _bump_cache(owner_id)
+    body = note_out.dump(note)
+    publish_note_event(owner_id, CREATE, note.id, seq, body)
+    return jsonify(body), 201
 
 @bp.get("/")
 @jwt_required()
 def list_notes():
     user_id = _current_user_id()
-    q = db.session.query(Note)
-    if not _is_admin():
-        q = q.filter(Note.owner_id == user_id)
-    # Pagination simple bornée
-    try:
-        page = max(int(request.args.get("page", 1)), 1)
-        per_page = int(request.args.get("per_page", 10))
-        per_page = 1 if per_page < 1 else 100 if per_page > 100 else per_page
-    except ValueError:
-        raise ApiError("Invalid pagination params.", 400, "validation_error")
-    total = q.count()
-    items = q.order_by(Note.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
-    return jsonify({
+    page, per_page = parse_pagination(request.args)
+    fields = parse_projection(request.args)
+    scope = parse_scope(request.args)
+    if scope != "own":
+        return _list_shared_notes(user_id, scope, per_page, fields)
+    # 1re page seulement: c'est l'écrasante majorité des listes
+    cache = _reader_cache() if page == 1 else None
+    if cache:
+        key, body = cache.lookup("list", user_id, per_page, ",".join(fields))
+        if body is not None:
+            return _cached_response(body)
+    count_stmt, page_stmt = list_statements(user_id, _is_admin(), page, per_page, fields)
+    # count + page: indépendants -> un seul aller-retour en pipeline
+    count_rows, items = fetch_all(count_stmt, page_stmt)
+    total = count_rows[0]["total"]
+    resp = jsonify({
         "status": "success",
-        "data": note_out_many.dump(items),
+        "data": projection_schema(fields).dump(items),
         "meta": {"page": page, "per_page": per_page, "total": total}
+    })
+    if cache:
+        _store_response(cache, key, resp)
+    return resp, 200
+
+def _list_shared_notes(user_id: uuid.UUID, scope: str, per_page: int, fields: tuple[str, ...]):
+    """?scope=shared|all: keyset sur (created_at, id), pas de total ni de cache (invalidé par owner)."""
+    stmt = shared_list_statement(db.engine.dialect.name, user_id, scope, per_page, fields,
+                                 parse_keyset(request.args))
+    page = keyset_page(db.session.execute(stmt).mappings(), per_page)
+    return jsonify({
+        "status": "success",
+        "data": projection_schema(fields + ("access",)).dump(page["items"]),
+        "meta": {"per_page": per_page, "scope": scope, "next_cursor": page["next_cursor"],
+                 "has_more": page["has_more"]}
+    }), 200
+
+@bp.get("/search")
+@jwt_required()
+def search_notes():
+    q, per_page, after = parse_search_args(request.args)
+    stmt = search_statement(db.engine.dialect.name, _current_user_id(), _is_admin(), q, per_page, after)
+    page = search_page(db.session.execute(stmt).mappings(), per_page)
+    return jsonify({
+        "status": "success",
+        "data": note_search_out_many.dump(page["items"]),
+        "meta": {"per_page": per_page, "next_cursor": page["next_cursor"]}
     }), 200
 
+@bp.get("/changes")
+@jwt_required()
+def note_changes():
+    """Delta-sync: notes créées/modifiées/supprimées depuis le curseur since (ses propres notes)."""
+    since, limit = parse_changes_args(request.args)
+    stmt = changes_statement(_current_user_id(), since, limit)
+    page = changes_page(db.session.execute(stmt).mappings(), since, limit)
+    return jsonify({
+        "status": "success",
+        "data": note_change_out_many.dump(page["items"]),
+        "meta": {"next_cursor": page["next_cursor"], "has_more": page["has_more"]}
+    }), 200
+
+@bp.get("/stats")
+@jwt_required()
+def note_stats():
+    """Compteurs de ses propres notes (note_count, content_bytes, last_write_at)."""
+    row = db.session.execute(stats_statement(_current_user_id())).mappings().first()
+    data = note_stats_out.dump(row) if row else {"note_count": 0, "content_bytes": 0, "last_write_at": None}
+    return jsonify({"status": "success", "data": data}), 200
+
 @bp.get("/<uuid:note_id>")
 @jwt_required()
 def get_note(note_id):
-    note = db.session.get(Note, note_id)
-    if not note:
-        raise ApiError("Note not found.", 404, "not_found")
-    _ensure_can_access(note, _current_user_id())
-    return jsonify(note_out.dump(note)), 200
+    user_id = _current_user_id()
+    cache = _reader_cache()
+    if cache:
+        # Espace de l'appelant: un hit ne peut être qu'une de ses notes
+        key, body = cache.lookup("note", user_id, note_id)
+        if body is not None:
+            return _cached_response(body)
+    note = accessible_note(note_id, _current_user_id(), _is_admin())
+    resp = jsonify(note_out.dump(note))
+    if cache and note.owner_id == user_id:
+        # Note partagée: invalidée dans l'espace de son owner, jamais mise en cache ici
+        _store_response(cache, key, resp)
+    return resp, 200
 
 @bp.patch("/<uuid:note_id>")
 @jwt_required()
 def update_note(note_id):
-    note = db.session.get(Note, note_id)
-    if not note:
-        raise ApiError("Note not found.", 404, "not_found")
-    _ensure_can_access(note, _current_user_id())
+    note = accessible_note(note_id, _current_user_id(), _is_admin(), SHARE_WRITE)
 
     payload = request.get_json(silent=True) or {}
     # Validations partielles (autorise subset des champs)
@@ -90,21 +201,78 @@ def update_note(note_id):
 
     if "title" in data:
         note.title = data["title"]
+    content_delta = 0
     if "content" in data:
+        content_delta = content_bytes(data["content"]) - content_bytes(note.content)
         note.content = data["content"]
 
+    seq = record_change(note)
+    record_stats(note.owner_id, content_delta=content_delta)
     db.session.commit()
+    _bump_cache(note.owner_id)
+    body = note_out.dump(note)
+    publish_note_event(note.owner_id, UPDATE, note.id, seq, body)
     # IMPORTANT: toujours retourner quelque chose
-    return jsonify(note_out.dump(note)), 200
+    return jsonify(body), 200
 
 @bp.delete("/<uuid:note_id>")
 @jwt_required()
 def delete_note(note_id):
-    note = db.session.get(Note, note_id)
-    if not note:
-        raise ApiError("Note not found.", 404, "not_found")
-    _ensure_can_access(note, _current_user_id())
+    note = _owned_note(note_id)
 
+    owner_id = note.owner_id
+    # Pièces jointes: lignes supprimées avec la note, octets nettoyés par un job après commit
+    attachments = blob_refs(Attachment.note_id == note.id)
+    if attachments:
+        db.session.execute(delete(Attachment).where(Attachment.note_id == note.id))
+    # Partages: cascade de la FK sous Postgres, explicite pour SQLite
+    db.session.execute(delete(NoteShare).where(NoteShare.note_id == note.id))
+    seq = record_change(note, deleted=True)
+    record_stats(owner_id, notes=-1, content_delta=-content_bytes(note.content))
     db.session.delete(note)
     db.session.commit()
+    _bump_cache(owner_id)
+    publish_note_event(owner_id, DELETE, note_id, seq)
+    discard_blobs(attachments)
+    return ("", 204)
+
+@bp.post("/<uuid:note_id>/shares")
+@jwt_required()
+def share(note_id):
+    """Partage la note avec un utilisateur (par email); re-partager change la permission."""
+    note = _owned_note(note_id)
+    data = note_share_in.load(request.get_json(silent=True) or {})
+    grantee = db.session.execute(
+        select(User).where(User.email == normalize_email(data["email"]), User.deleted_at.is_(None))
+    ).scalar_one_or_none()
+    if grantee is None:
+        raise ApiError("User not found.", 404, "not_found")
+    if grantee.id == note.owner_id:
+        raise ApiError("Cannot share a note with its owner.", 400, "validation_error")
+    share_note(note, grantee.id, data["permission"])
+    db.session.commit()
+    row = db.session.execute(shares_statement(note.id).where(NoteShare.grantee_id == grantee.id)).mappings().one()
+    return jsonify(note_share_out.dump(row)), 201
+
+@bp.get("/<uuid:note_id>/shares")
+@jwt_required()
+def list_shares(note_id):
+    note = _owned_note(note_id)
+    rows = db.session.execute(shares_statement(note.id)).mappings().all()
+    return jsonify({"status": "success", "data": note_share_out_many.dump(rows)}), 200
+
+@bp.delete("/<uuid:note_id>/shares/<uuid:grantee_id>")
+@jwt_required()
+def unshare(note_id, grantee_id):
+    note = _owned_note(note_id)
+    if not revoke_share(note.id, grantee_id):
+        raise ApiError("Share not found.", 404, "not_found")
+    db.session.commit()
     return ("", 204)
+
+@bp.get("/cache/stats")
+@roles_required("admin")
+def cache_stats():
+    """Hits/misses/hit_rate du cache de lecture (compteurs du process qui répond)."""
+    cache = note_cache()
+    return jsonify({"status": "success", "data": cache.stats() if cache else {"enabled": False}}), 200
@@ -11,3 +11,38 @@ class NoteOut(Schema):
     owner_id = fields.UUID(required=True)
     created_at = fields.DateTime(required=True)
     updated_at = fields.DateTime(required=True)
+
+class NoteProjectionOut(NoteOut):
+    # Champs disponibles via ?fields= / ?view=summary sur les listings
+    excerpt = fields.String()
+    content_length = fields.Integer()
+    # ?scope=shared|all: owner, read ou write
+    access = fields.String()
+
+class NoteSearchOut(NoteOut):
+    rank = fields.Float(required=True)
+    highlight = fields.Function(lambda row: {"title": row["title_highlight"], "content": row["content_highlight"]})
+
+class NoteShareIn(Schema):
+    email = fields.Email(required=True)
+    permission = fields.String(load_default="read", validate=validate.OneOf(["read", "write"]))
+
+class NoteShareOut(Schema):
+    grantee_id = fields.UUID(required=True)
+    email = fields.String(required=True)
+    permission = fields.String(required=True)
+    created_at = fields.DateTime(required=True)
+
+class NoteStatsOut(Schema):
+    note_count = fields.Integer(required=True)
+    content_bytes = fields.Integer(required=True)
+    last_write_at = fields.DateTime(allow_none=True)
+
+_note_out = NoteOut()
+
+class NoteChangeOut(Schema):
+    id = fields.UUID(required=True)
+    op = fields.Function(lambda row: "delete" if row["deleted"] else "upsert")
+    seq = fields.Integer(required=True)
+    # null pour un tombstone
+    note = fields.Function(lambda row: None if row["deleted"] else _note_out.dump(row))
@@ -0,0 +1,121 @@
+# app/notes/search.py
+# GET /notes/search: requêtes Core par dialecte (Postgres tsvector/GIN, SQLite FTS5),
+# partagées entre l'app Flask et l'app ASGI comme app.notes.queries.
+import html
+import uuid
+from sqlalchemy import select, func, or_, and_, literal_column, table, column, Float
+from app.notes.models import Note
+from app.notes.queries import NOTE_COLUMNS
+from app.common.errors import ApiError
+from app.common.utils import decode_cursor, encode_cursor
+
+SEARCH_CONFIG = "simple"  # pas de stemming: le corpus mélange les langues
+MARK_START, MARK_END = "<mark>", "</mark>"
+# Le SQL encadre les termes de caractères de contrôle; search_page échappe le texte
+# (contenu brut des notes) puis seulement les remplace par les balises <mark>
+RAW_START, RAW_END = "\x02", "\x03"
+HEADLINE_OPTIONS = f"StartSel={RAW_START}, StopSel={RAW_END}, MaxFragments=2, MaxWords=20, MinWords=5"
+
+# SQLite uniquement: rowid FTS = notes_fts_keys.key, clé stable de chaque note.id
+notes_fts = table("notes_fts", column("rowid"))
+notes_fts_keys = table("notes_fts_keys", column("key"), column("note_id"))
+
+
+def parse_search_args(args) -> tuple[str, int, tuple[float, uuid.UUID] | None]:
+    q = (args.get("q") or "").strip()
+    if not q or len(q) > 200:
+        raise ApiError("Query parameter q is required (1-200 chars).", 400, "validation_error",
+                       details={"q": ["Length must be between 1 and 200."]})
+    try:
+        limit = int(args.get("per_page", 10))
+    except ValueError:
+        raise ApiError("Invalid pagination params.", 400, "validation_error")
+    limit = 1 if limit < 1 else 100 if limit > 100 else limit
+    after = None
+    if args.get("cursor"):
+        rank, note_id = decode_cursor(args["cursor"], 2)
+        try:
+            after = (float(rank), uuid.UUID(note_id))
+        except (TypeError, ValueError):
+            raise ApiError("Invalid cursor.", 400, "validation_error", details={"cursor": args["cursor"]})
+    return q, limit, after
+
+
+def _keyset(rank, after):
+    r, note_id = after
+    return or_(rank < r, and_(rank == r, Note.id < note_id))
+
+
+def _fts5_query(q: str) -> str:
+    # Chaque mot devient une chaîne FTS5 littérale: pas d'injection de syntaxe MATCH
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in q.split())
+
+
+def search_statement(dialect: str, user_id: uuid.UUID, is_admin: bool, q: str, limit: int, after=None):
+    """SELECT des notes correspondant à q, triées par pertinence (rank desc, id desc).
+
+    limit + 1 lignes: la dernière signale la page suivante (cf. search_page).
+    """
+    limit += 1
+    if dialect == "postgresql":
+        tsq = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        vector = literal_column("notes.search_vector")
+        rank = func.ts_rank_cd(vector, tsq).cast(Float)
+        page = select(*NOTE_COLUMNS, rank.label("rank")).where(vector.op("@@")(tsq))
+        if not is_admin:
+            page = page.where(Note.owner_id == user_id)
+        if after:
+            page = page.where(_keyset(rank, after))
+        page = page.order_by(rank.desc(), Note.id.desc()).limit(limit).subquery()
+        # ts_headline relit le contenu: calculé seulement sur la page retenue
+        return select(
+            *(page.c[col.name] for col in NOTE_COLUMNS),
+            page.c.rank,
+            func.ts_headline(SEARCH_CONFIG, page.c.title, tsq, HEADLINE_OPTIONS).label("title_highlight"),
+            func.ts_headline(SEARCH_CONFIG, page.c.content, tsq, HEADLINE_OPTIONS).label("content_highlight"),
+        ).order_by(page.c.rank.desc(), page.c.id.desc())
+
+    if dialect == "sqlite":
+        fts = literal_column("notes_fts")
+        rank = (-func.bm25(fts)).cast(Float)  # bm25: plus petit = meilleur
+        stmt = (
+            select(
+                *NOTE_COLUMNS,
+                rank.label("rank"),
+                func.highlight(fts, 0, RAW_START, RAW_END).label("title_highlight"),
+                func.snippet(fts, 1, RAW_START, RAW_END, "…", 20).label("content_highlight"),
+            )
+            .select_from(Note.__table__
+                         .join(notes_fts_keys, notes_fts_keys.c.note_id == Note.id)
+                         .join(notes_fts, notes_fts.c.rowid == notes_fts_keys.c.key))
+            .where(fts.op("MATCH")(_fts5_query(q)))
+        )
+        if not is_admin:
+            stmt = stmt.where(Note.owner_id == user_id)
+        if after:
+            stmt = stmt.where(_keyset(rank, after))
+        return stmt.order_by(rank.desc(), Note.id.desc()).limit(limit)
+
+    raise ApiError("Search is not supported on this database.", 501, "not_implemented")
+
+
+def highlight_html(text: str | None) -> str | None:
+    """Extrait surligné -> HTML sûr: contenu échappé, seules les balises <mark> sont ajoutées."""
+    if text is None:
+        return None
+    return html.escape(text).replace(RAW_START, MARK_START).replace(RAW_END, MARK_END)
+
+
+def search_page(rows, limit: int) -> dict:
+    """Met en forme une page de résultats (limit + 1 lignes lues) + curseur suivant."""
+    items = [dict(r) for r in rows]
+    has_more = len(items) > limit
+    items = items[:limit]
+    for item in items:
+        item["title_highlight"] = highlight_html(item["title_highlight"])
+        item["content_highlight"] = highlight_html(item["content_highlight"])
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor([last["rank"], str(last["id"])])
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,88 @@
+# app/notes/shares.py
+# Partage de notes (note_shares): une ligne par (note, destinataire), permission read|write.
+# Le contrôle d'accès ne charge jamais la note puis l'ACL: access_predicate() est un
+# EXISTS corrélé sur la PK de note_shares, ajouté au WHERE de la requête qui lit ou
+# écrit la note -> une seule requête, un seul aller-retour, sur index.
+import uuid
+
+from sqlalchemy import and_, delete, exists, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.notes.models import Note, NoteShare, SHARE_READ, SHARE_WRITE
+from app.users.models import User
+from app.common.errors import ApiError
+
+
+def owner_alive(owner_id_column):
+    """Le propriétaire n'est pas supprimé: ses partages cessent dès la suppression logique,
+    sans attendre que la purge par lots (app.users.deletion) efface les lignes."""
+    return exists().where(User.id == owner_id_column, User.deleted_at.is_(None))
+
+
+def access_predicate(user_id: uuid.UUID, permission: str = SHARE_READ):
+    """Critère "user_id peut lire (ou écrire) la note": propriétaire, ou partage suffisant."""
+    share = exists().where(
+        NoteShare.note_id == Note.id,
+        NoteShare.owner_id == Note.owner_id,
+        NoteShare.grantee_id == user_id,
+    )
+    if permission == SHARE_WRITE:
+        share = share.where(NoteShare.permission == SHARE_WRITE)
+    return or_(Note.owner_id == user_id, and_(share, owner_alive(Note.owner_id)))
+
+
+def accessible_note(note_id: uuid.UUID, user_id: uuid.UUID, is_admin: bool, permission: str = SHARE_READ) -> Note:
+    """
+    Charge la note si user_id y a accès (propriétaire, partage suffisant, admin):
+    l'ACL est dans le WHERE, une seule requête dans le cas nominal. Seul un refus
+    paie une 2e requête, pour distinguer 404 (absente) de 403 (pas d'accès).
+    """
+    stmt = select(Note).where(Note.id == note_id)
+    if not is_admin:
+        stmt = stmt.where(access_predicate(user_id, permission))
+    note = db.session.execute(stmt).scalar_one_or_none()
+    if note is None:
+        if db.session.execute(select(Note.id).where(Note.id == note_id)).scalar() is None:
+            raise ApiError("Note not found.", 404, "not_found")
+        raise ApiError("Forbidden: you do not have access to this note.", 403, "forbidden",
+                       details={"note_id": str(note_id)})
+    return note
+
+
+def share_note(note: Note, grantee_id: uuid.UUID, permission: str) -> None:
+    """Crée ou met à jour le partage (upsert), dans la transaction de l'appelant."""
+    session = db.session
+    dialect = session.get_bind(clause=NoteShare.__table__.insert()).dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise ApiError("Note sharing is not supported on this database.", 501, "not_implemented")
+    # note_created_at recopié par le SGBD (même représentation que notes.created_at)
+    source = select(Note.id, Note.owner_id, literal(grantee_id, NoteShare.grantee_id.type),
+                    literal(permission), Note.created_at).where(Note.id == note.id, Note.owner_id == note.owner_id)
+    stmt = insert(NoteShare).from_select(
+        ["note_id", "owner_id", "grantee_id", "permission", "note_created_at"], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NoteShare.note_id, NoteShare.grantee_id],
+        set_={"permission": stmt.excluded.permission},
+    )
+    session.execute(stmt)
+
+
+def shares_statement(note_id: uuid.UUID):
+    """Partages d'une note avec l'email du destinataire (comptes supprimés exclus)."""
+    return (
+        select(NoteShare.grantee_id, User.email, NoteShare.permission, NoteShare.created_at)
+        .join(User, and_(User.id == NoteShare.grantee_id, User.deleted_at.is_(None)))
+        .where(NoteShare.note_id == note_id)
+        .order_by(NoteShare.created_at)
+    )
+
+
+def revoke_share(note_id: uuid.UUID, grantee_id: uuid.UUID) -> int:
+    return db.session.execute(
+        delete(NoteShare).where(NoteShare.note_id == note_id, NoteShare.grantee_id == grantee_id)
+    ).rowcount
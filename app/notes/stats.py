@@ -0,0 +1,98 @@
+# app/notes/stats.py
+# Statistiques matérialisées par owner (note_stats): nombre de notes, octets de
+# contenu, dernière écriture. Chaque create/update/delete applique un delta
+# (upsert) dans sa propre transaction: le coût d'une page de liste ne dépend plus
+# de la taille de la collection (plus de COUNT(*) sur notes).
+#
+# Les écritures d'un même owner se sérialisent déjà sur le verrou advisory de
+# record_change: la ligne note_stats n'ajoute pas de contention.
+# Dérive (SQL manuel, restauration partielle...): flask notes rebuild-stats.
+import uuid
+
+from sqlalchemy import BigInteger, cast, delete, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.notes.models import Note, NoteStats
+from app.common.errors import ApiError
+
+_stats = NoteStats.__table__
+
+# Taille en octets (UTF-8) côté SQL, pour la reconstruction
+_CONTENT_BYTES_SQL = {
+    "postgresql": func.octet_length(Note.content),
+    "sqlite": func.length(cast(Note.content, db.LargeBinary)),
+}
+
+
+def content_bytes(content: str | None) -> int:
+    return len((content or "").encode("utf-8"))
+
+
+def _dialect(session) -> str:
+    return session.get_bind(clause=_stats.insert()).dialect.name
+
+
+def record_stats(owner_id: uuid.UUID, notes: int = 0, content_delta: int = 0) -> None:
+    """À appeler dans la transaction qui modifie les notes de owner_id, avant commit."""
+    session = db.session
+    dialect = _dialect(session)
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        raise ApiError("Note statistics are not supported on this database.", 501, "not_implemented")
+    stmt = insert(NoteStats).values(owner_id=owner_id, note_count=notes, content_bytes=content_delta,
+                                    last_write_at=func.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NoteStats.owner_id],
+        set_={
+            "note_count": _stats.c.note_count + stmt.excluded.note_count,
+            "content_bytes": _stats.c.content_bytes + stmt.excluded.content_bytes,
+            "last_write_at": stmt.excluded.last_write_at,
+        },
+    )
+    session.execute(stmt)
+
+
+def total_statement(user_id: uuid.UUID, is_admin: bool):
+    """meta.total de GET /notes: une ligne par clé primaire (une ligne par user pour un admin)."""
+    if is_admin:
+        return select(func.coalesce(cast(func.sum(NoteStats.note_count), BigInteger), 0).label("total"))
+    owned = select(NoteStats.note_count).where(NoteStats.owner_id == user_id).scalar_subquery()
+    return select(func.coalesce(owned, 0).label("total"))
+
+
+def stats_statement(owner_id: uuid.UUID):
+    return select(NoteStats.note_count, NoteStats.content_bytes, NoteStats.last_write_at).where(
+        NoteStats.owner_id == owner_id)
+
+
+def rebuild_stats(owner_id: uuid.UUID | None = None) -> int:
+    """
+    Recalcule note_stats depuis notes (tous les owners, ou un seul) et commite.
+    Sous Postgres la table est verrouillée le temps du calcul: les écritures
+    concurrentes attendent puis appliquent leur delta sur la valeur recalculée.
+    """
+    session = db.session
+    dialect = _dialect(session)
+    if dialect not in _CONTENT_BYTES_SQL:
+        raise ApiError("Note statistics are not supported on this database.", 501, "not_implemented")
+    if dialect == "postgresql":
+        session.execute(text("LOCK TABLE note_stats IN EXCLUSIVE MODE"))
+    computed = select(
+        Note.owner_id,
+        func.count().label("note_count"),
+        func.coalesce(func.sum(_CONTENT_BYTES_SQL[dialect]), 0).label("content_bytes"),
+        func.max(Note.updated_at).label("last_write_at"),
+    ).group_by(Note.owner_id)
+    purge = delete(NoteStats)
+    if owner_id is not None:
+        computed = computed.where(Note.owner_id == owner_id)
+        purge = purge.where(NoteStats.owner_id == owner_id)
+    session.execute(purge)
+    result = session.execute(
+        _stats.insert().from_select(["owner_id", "note_count", "content_bytes", "last_write_at"], computed))
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,410 @@
+# app/profiling/profiler.py
+# Profilage à la demande en production (PROFILING_ENABLED; sinon rien n'est installé).
+#
+# 1. Une requête: en-tête X-Profile signé (délivré à un admin, durée courte) ->
+#    cProfile sur toute la requête WSGI (corps streamé compris, sans le bufferiser),
+#    profil stocké (pstats) à la fermeture du corps, id renvoyé dans
+#    X-Profile-Id. Un seul profil à la fois par process (cProfile est exclusif).
+# 2. Échantillonnage: une fraction des requêtes par endpoint (taux réglables à chaud)
+#    est suivie par un thread qui relève la pile du thread de la requête toutes les
+#    PROFILING_SAMPLE_INTERVAL_MS; agrégat en piles repliées ("folded", format
+#    flamegraph.pl / speedscope) par minute, fenêtre glissante.
+# Stockage: PROFILING_STORAGE_URI (memory:// par process, redis:// partagé entre workers).
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+
+from flask import g, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from app.common.storage import redis_from_uri
+
+log = logging.getLogger("app.profiling")
+
+HEADER = "X-Profile"
+_SALT = "x-profile"
+RATES_REFRESH_SECONDS = 5
+MAX_DEPTH = 128
+
+
+# --- Stockage ---
+class MemoryProfileStore:
+    def __init__(self, keep: int, window_minutes: int):
+        self._profiles: dict[str, tuple[dict, bytes]] = {}
+        self._order: deque = deque()
+        self._keep = keep
+        self._buckets: dict[int, Counter] = {}
+        self._window = window_minutes
+        self._rates: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def put_profile(self, meta: dict, data: bytes, ttl: int) -> None:
+        with self._lock:
+            self._profiles[meta["id"]] = (meta, data)
+            self._order.appendleft(meta["id"])
+            while len(self._order) > self._keep:
+                self._profiles.pop(self._order.pop(), None)
+
+    def get_profile(self, profile_id: str):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list_profiles(self) -> list[dict]:
+        with self._lock:
+            return [self._profiles[i][0] for i in self._order if i in self._profiles]
+
+    def add_folded(self, minute: int, counts: Counter) -> None:
+        with self._lock:
+            self._buckets.setdefault(minute, Counter()).update(counts)
+            for old in [m for m in self._buckets if m <= minute - self._window]:
+                del self._buckets[old]
+
+    def folded(self, since_minute: int) -> Counter:
+        with self._lock:
+            total = Counter()
+            for minute, counts in self._buckets.items():
+                if minute >= since_minute:
+                    total.update(counts)
+            return total
+
+    def get_rates(self) -> dict | None:
+        return dict(self._rates) if self._rates else None
+
+    def set_rates(self, rates: dict) -> None:
+        self._rates = dict(rates)
+
+
+class RedisProfileStore:
+    def __init__(self, client, keep: int, window_minutes: int, prefix: str = "prof:"):
+        self._redis = client
+        self._keep = keep
+        self._window = window_minutes
+        self._prefix = prefix
+
+    def put_profile(self, meta: dict, data: bytes, ttl: int) -> None:
+        pipe = self._redis.pipeline()
+        pipe.set(f"{self._prefix}p:{meta['id']}", data, ex=ttl)
+        pipe.set(f"{self._prefix}m:{meta['id']}", json.dumps(meta), ex=ttl)
+        pipe.lpush(f"{self._prefix}index", meta["id"])
+        pipe.ltrim(f"{self._prefix}index", 0, self._keep - 1)
+        pipe.execute()
+
+    def get_profile(self, profile_id: str):
+        meta, data = self._redis.mget(f"{self._prefix}m:{profile_id}", f"{self._prefix}p:{profile_id}")
+        return (json.loads(meta), data) if meta and data else None
+
+    def list_profiles(self) -> list[dict]:
+        ids = [i.decode() for i in self._redis.lrange(f"{self._prefix}index", 0, -1)]
+        metas = self._redis.mget([f"{self._prefix}m:{i}" for i in ids]) if ids else []
+        return [json.loads(m) for m in metas if m]
+
+    def add_folded(self, minute: int, counts: Counter) -> None:
+        key = f"{self._prefix}f:{minute}"
+        pipe = self._redis.pipeline()
+        for stack, n in counts.items():
+            pipe.hincrby(key, stack, n)
+        pipe.expire(key, (self._window + 1) * 60)
+        pipe.execute()
+
+    def folded(self, since_minute: int) -> Counter:
+        total = Counter()
+        now = int(time.time() // 60)
+        for minute in range(since_minute, now + 1):
+            for stack, n in self._redis.hgetall(f"{self._prefix}f:{minute}").items():
+                total[stack.decode()] += int(n)
+        return total
+
+    def get_rates(self) -> dict | None:
+        raw = self._redis.get(f"{self._prefix}rates")
+        return json.loads(raw) if raw else None
+
+    def set_rates(self, rates: dict) -> None:
+        self._redis.set(f"{self._prefix}rates", json.dumps(rates))
+
+
+# --- 1. Profil d'une requête (middleware WSGI) ---
+class ProfileTokens:
+    def __init__(self, secret: str, max_age: int):
+        self._serializer = URLSafeTimedSerializer(secret, salt=_SALT)
+        self.max_age = max_age
+
+    def issue(self, admin_id: str, ttl: int) -> str:
+        return self._serializer.dumps({"by": admin_id, "exp": time.time() + min(ttl, self.max_age)})
+
+    def verify(self, token: str) -> dict | None:
+        try:
+            data = self._serializer.loads(token, max_age=self.max_age)
+        except BadSignature:
+            return None
+        return data if data.get("exp", 0) >= time.time() else None
+
+
+class _ProfiledBody:
+    """Corps WSGI servi morceau par morceau sous le profileur (rien n'est bufferisé).
+
+    Le profileur n'est actif que dans l'app (appel, next(), close()), pas pendant
+    l'écriture sur le socket; le profil est finalisé à close(), appelé par le serveur.
+    """
+
+    def __init__(self, profiler: cProfile.Profile, on_close):
+        self._profiler = profiler
+        self._on_close = on_close
+        self._result = None
+        self._chunks = None
+        self._elapsed = 0.0
+        self._closed = False
+
+    def _run(self, fn, *args):
+        t0 = time.perf_counter()
+        self._profiler.enable()
+        try:
+            return fn(*args)
+        finally:
+            self._profiler.disable()
+            self._elapsed += time.perf_counter() - t0
+
+    def start(self, wsgi_app, environ, start_response):
+        self._result = self._run(wsgi_app, environ, start_response)
+        self._chunks = self._run(iter, self._result)
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._run(next, self._chunks)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if hasattr(self._result, "close"):
+                self._run(self._result.close)
+        finally:
+            self._on_close(self._profiler, round(self._elapsed * 1000, 2))
+
+
+class ProfilingMiddleware:
+    def __init__(self, wsgi_app, tokens: ProfileTokens, store, profile_ttl: int):
+        self.wsgi_app = wsgi_app
+        self.tokens = tokens
+        self.store = store
+        self.profile_ttl = profile_ttl
+        self._busy = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        token = environ.get("HTTP_X_PROFILE")
+        if not token:
+            return self.wsgi_app(environ, start_response)
+        grant = self.tokens.verify(token)
+        if grant is None or not self._busy.acquire(blocking=False):
+            # Jeton invalide/expiré ou profil déjà en cours: requête servie normalement
+            return self.wsgi_app(environ, start_response)
+        try:
+            return self._profile(environ, start_response, grant)
+        except BaseException:
+            self._busy.release()
+            raise
+
+    def _profile(self, environ, start_response, grant):
+        profile_id = uuid.uuid4().hex
+        captured = {}
+
+        def _start_response(status, headers, exc_info=None):
+            captured["status"] = status
+            return start_response(status, headers + [("X-Profile-Id", profile_id)], exc_info)
+
+        def _finish(profiler, duration_ms):
+            # Corps entièrement servi (ou abandonné): profil stocké, verrou rendu
+            try:
+                self._store(profiler, profile_id, grant, environ, captured.get("status"), duration_ms)
+            finally:
+                self._busy.release()
+
+        return _ProfiledBody(cProfile.Profile(), _finish).start(self.wsgi_app, environ, _start_response)
+
+    def _store(self, profiler, profile_id, grant, environ, status, duration_ms):
+        profiler.create_stats()
+        meta = {
+            "id": profile_id, "by": grant["by"], "method": environ.get("REQUEST_METHOD"),
+            "path": environ.get("PATH_INFO"), "status": status,
+            "duration_ms": duration_ms, "created_at": time.time(), "pid": os.getpid(),
+        }
+        try:
+            self.store.put_profile(meta, marshal.dumps(profiler.stats), self.profile_ttl)
+        except Exception:
+            log.warning("profile_store_failed", exc_info=True)
+        log.info("request_profiled", extra={"profile_id": profile_id, "by": grant["by"],
+                                            "path": meta["path"], "duration_ms": duration_ms})
+
+
+def profile_as_text(data: bytes, sort: str = "cumulative", limit: int = 60) -> str:
+    """Stats pstats (marshal) -> rapport texte."""
+    out = io.StringIO()
+    stats = pstats.Stats(_StatsLoader(data), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class _StatsLoader:
+    # pstats.Stats accepte un objet exposant create_stats()/stats (comme cProfile.Profile)
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+# --- 2. Échantillonnage par endpoint ---
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    def __init__(self, store, default_rates: dict, interval_ms: float):
+        self.store = store
+        self.default_rates = default_rates
+        self.interval = interval_ms / 1000
+        self._rates = dict(default_rates)
+        self._rates_at = 0.0
+        self._active: dict[int, str] = {}       # thread ident -> endpoint
+        self._has_active = threading.Event()
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def rates(self) -> dict:
+        now = time.monotonic()
+        if now - self._rates_at > RATES_REFRESH_SECONDS:
+            self._rates_at = now
+            try:
+                self._rates = self.store.get_rates() or dict(self.default_rates)
+            except Exception:
+                log.warning("profile_rates_unavailable", exc_info=True)
+        return self._rates
+
+    def set_rates(self, rates: dict) -> None:
+        """Taux partagés (store): ce process les applique tout de suite, les autres sous 5 s."""
+        self.store.set_rates(rates)
+        self._rates = dict(rates) or dict(self.default_rates)
+        self._rates_at = time.monotonic()
+
+    def begin(self, endpoint: str | None) -> None:
+        rates = self.rates()
+        if not rates or endpoint is None:
+            return
+        rate = rates.get(endpoint, rates.get("*", 0.0))
+        if rate <= 0 or random.random() >= rate:
+            return
+        self._ensure_started()
+        with self._lock:
+            self._active[threading.get_ident()] = endpoint
+            self._has_active.set()
+        g._profiling_sampled = True
+
+    def end(self) -> None:
+        if not g.pop("_profiling_sampled", False):
+            return
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            if not self._active:
+                self._has_active.clear()
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="profiling-sampler", daemon=True).start()
+
+    def _sample(self) -> None:
+        with self._lock:
+            active = dict(self._active)
+        frames = sys._current_frames()
+        counts = Counter()
+        for ident, endpoint in active.items():
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                counts[";".join([endpoint, *reversed(stack)])] += 1
+        with self._lock:
+            self._counts.update(counts)
+
+    def _flush(self) -> None:
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        try:
+            self.store.add_folded(int(time.time() // 60), counts)
+        except Exception:
+            log.warning("profile_flush_failed", exc_info=True)
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            # Aucun coût hors requêtes échantillonnées: on dort jusqu'à la prochaine
+            if not self._has_active.wait(timeout=10):
+                self._flush()
+                continue
+            self._sample()
+            if time.monotonic() - last_flush > 5:
+                self._flush()
+                last_flush = time.monotonic()
+            time.sleep(self.interval)
+
+    def flamegraph(self, minutes: int) -> str:
+        self._flush()
+        since = int(time.time() // 60) - minutes + 1
+        counts = self.store.folded(since)
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(counts.items()))
+
+
+def parse_rates(value: str) -> dict[str, float]:
+    """"notes.list_notes=0.05,*=0.001" -> {endpoint: taux}."""
+    rates = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            endpoint, rate = item.split("=", 1)
+            rates[endpoint.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def init_profiling(app) -> None:
+    cfg = app.config
+    if not cfg.get("PROFILING_ENABLED"):
+        return  # rien d'installé: coût nul
+    client = redis_from_uri(cfg.get("PROFILING_STORAGE_URI"))
+    keep, window = cfg["PROFILING_KEEP"], cfg["PROFILING_WINDOW_MINUTES"]
+    store = RedisProfileStore(client, keep, window) if client else MemoryProfileStore(keep, window)
+    tokens = ProfileTokens(cfg["SECRET_KEY"], cfg["PROFILING_TOKEN_SECONDS"])
+    sampler = Sampler(store, parse_rates(cfg.get("PROFILING_SAMPLE_RATES")), cfg["PROFILING_SAMPLE_INTERVAL_MS"])
+    app.extensions["profiling"] = {"store": store, "tokens": tokens, "sampler": sampler}
+    app.wsgi_app = ProfilingMiddleware(app.wsgi_app, tokens, store, cfg["PROFILING_PROFILE_TTL"])
+
+    @app.before_request
+    def _profiling_sample_begin():
+        sampler.begin(request.endpoint)
+
+    @app.teardown_request
+    def _profiling_sample_end(exc):
+        sampler.end()
+
+    from app.profiling.routes import bp
+    app.register_blueprint(bp, url_prefix="/api/v1/admin/profiling")
@@ -0,0 +1,95 @@
+# app/profiling/routes.py
+# Endpoints admin du profilage (enregistrés seulement si PROFILING_ENABLED).
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from marshmallow import Schema, fields, validate
+
+from app.common.authz import roles_required
+from app.common.errors import ApiError
+from app.profiling.profiler import HEADER, profile_as_text
+
+bp = Blueprint("profiling", __name__)
+
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+
+class TokenIn(Schema):
+    ttl = fields.Integer(load_default=300, validate=validate.Range(min=10, max=3600))
+
+
+class RatesIn(Schema):
+    rates = fields.Dict(keys=fields.String(validate=validate.Length(min=1, max=200)),
+                        values=fields.Float(validate=validate.Range(min=0, max=1)), required=True)
+
+
+token_in = TokenIn()
+rates_in = RatesIn()
+
+
+def _profiling():
+    return current_app.extensions["profiling"]
+
+
+@bp.post("/token")
+@roles_required("admin")
+def issue_token():
+    """Jeton signé à poser en en-tête X-Profile sur la (les) requête(s) à profiler."""
+    data = token_in.load(request.get_json(silent=True) or {})
+    tokens = _profiling()["tokens"]
+    ttl = min(data["ttl"], tokens.max_age)
+    return jsonify({"header": HEADER, "token": tokens.issue(get_jwt_identity(), ttl), "expires_in": ttl}), 201
+
+
+@bp.get("/profiles")
+@roles_required("admin")
+def list_profiles():
+    return jsonify({"status": "success", "data": _profiling()["store"].list_profiles()}), 200
+
+
+@bp.get("/profiles/<profile_id>")
+@roles_required("admin")
+def get_profile(profile_id):
+    """?format=text (défaut, &sort=cumulative|tottime|ncalls) ou pstats (fichier pour snakeviz)."""
+    found = _profiling()["store"].get_profile(profile_id)
+    if found is None:
+        raise ApiError("Profile not found.", 404, "not_found")
+    meta, data = found
+    if request.args.get("format") == "pstats":
+        return Response(data, mimetype="application/octet-stream",
+                        headers={"Content-Disposition": f"attachment; filename={profile_id}.pstats"})
+    sort = request.args.get("sort", "cumulative")
+    if sort not in SORT_KEYS:
+        raise ApiError("Invalid sort.", 400, "validation_error", details={"sort": list(SORT_KEYS)})
+    return Response(profile_as_text(data, sort), mimetype="text/plain")
+
+
+@bp.get("/sampling")
+@roles_required("admin")
+def get_sampling():
+    sampler = _profiling()["sampler"]
+    return jsonify({"status": "success", "data": {
+        "rates": sampler.rates(),
+        "interval_ms": sampler.interval * 1000,
+        "window_minutes": current_app.config["PROFILING_WINDOW_MINUTES"],
+    }}), 200
+
+
+@bp.put("/sampling")
+@roles_required("admin")
+def set_sampling():
+    """{"rates": {"notes.list_notes": 0.05, "*": 0}}: appliqué par chaque process sous 5 s."""
+    data = rates_in.load(request.get_json(silent=True) or {})
+    _profiling()["sampler"].set_rates(data["rates"])
+    return jsonify({"status": "success", "data": {"rates": data["rates"]}}), 200
+
+
+@bp.get("/flamegraph")
+@roles_required("admin")
+def flamegraph():
+    """Piles repliées ("endpoint;f1;f2 N"), à passer à flamegraph.pl ou speedscope."""
+    window = current_app.config["PROFILING_WINDOW_MINUTES"]
+    try:
+        minutes = min(max(int(request.args.get("minutes", window)), 1), window)
+    except ValueError:
+        raise ApiError("Invalid minutes.", 400, "validation_error")
+    return Response(_profiling()["sampler"].flamegraph(minutes), mimetype="text/plain")
@@ -0,0 +1,186 @@
+# app/users/bulk_import.py
+# Import massif de users (flask users import): lecture en flux CSV/NDJSON, bcrypt
+# parallélisé sur un pool de process, insertion par lots (COPY + INSERT ... ON CONFLICT
+# sous Postgres, INSERT multi-lignes sinon). Un commit par lot -> reprise via offset.
+import csv
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from marshmallow import ValidationError, fields, validate
+from passlib.hash import bcrypt
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.auth.schemas import RegisterSchema
+from app.auth.service import normalize_email
+from app.users.models import User
+
+ROLES = ("user", "admin")
+INSERT_COLUMNS = ("id", "email", "password_hash", "role", "is_active")
+
+
+class ImportUserSchema(RegisterSchema):
+    # Mêmes règles que /register + rôle et statut optionnels
+    role = fields.String(load_default="user", validate=validate.OneOf(ROLES))
+    is_active = fields.Boolean(load_default=True)
+
+
+_import_schema = ImportUserSchema()
+
+
+def hash_password(password: str) -> str:
+    # Exécuté dans les process du pool: même schéma que User.set_password
+    return bcrypt.hash(password)
+
+
+def read_records(path: str, fmt: str | None = None):
+    """Itère (offset, dict) sur le fichier; offset = rang de l'enregistrement (0-based)."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for offset, row in enumerate(csv.DictReader(f)):
+                yield offset, row
+            return
+        offset = 0
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = {"_raw": line.rstrip("\n"), "_error": "invalid json"}
+            yield offset, record if isinstance(record, dict) else {"_raw": line.rstrip("\n"), "_error": "not an object"}
+            offset += 1
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    inserted: int = 0
+    existing: int = 0
+    rejected: int = 0
+    next_offset: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.read / elapsed if elapsed else 0.0
+        return (f"read={self.read} inserted={self.inserted} existing={self.existing} rejected={self.rejected} "
+                f"rate={rate:.0f}/s next_offset={self.next_offset}")
+
+
+class UserImporter:
+    def __init__(self, batch_size: int = 1000, workers: int | None = None, rejects=None, progress=None):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.rejects = rejects      # fichier texte ouvert (NDJSON) ou None
+        self.progress = progress    # callable(ImportStats) appelé après chaque lot
+        self.stats = ImportStats()
+
+    def _reject(self, offset: int, record: dict, reason) -> None:
+        self.stats.rejected += 1
+        if self.rejects is not None:
+            safe = {k: v for k, v in record.items() if k != "password"}  # jamais de mot de passe en clair
+            self.rejects.write(json.dumps({"offset": offset, "reason": reason, "record": safe}, default=str) + "\n")
+
+    def _validate(self, batch):
+        valid, seen = [], set()
+        for offset, record in batch:
+            if "_error" in record:
+                self._reject(offset, record, record["_error"])
+                continue
+            payload = {k: v for k, v in record.items() if v not in (None, "")}
+            if isinstance(payload.get("email"), str):
+                payload["email"] = normalize_email(payload["email"])
+            try:
+                data = _import_schema.load(payload)
+            except ValidationError as e:
+                self._reject(offset, record, e.messages)
+                continue
+            if data["email"] in seen:
+                self._reject(offset, record, "duplicate in file")
+                continue
+            seen.add(data["email"])
+            valid.append((offset, record, data))
+        return valid
+
+    def _drop_existing(self, valid):
+        # Évite de payer bcrypt pour des comptes déjà présents (re-run, reprise)
+        emails = [data["email"] for _, _, data in valid]
+        existing = set(db.session.scalars(select(User.email).where(User.email.in_(emails)))) if emails else set()
+        keep = []
+        for offset, record, data in valid:
+            if data["email"] in existing:
+                self.stats.existing += 1
+                self._reject(offset, record, "already exists")
+            else:
+                keep.append((offset, record, data))
+        return keep
+
+    def _insert(self, rows: list[dict]) -> set[str]:
+        """Insère rows (ON CONFLICT email DO NOTHING); retourne les emails réellement créés."""
+        if not rows:
+            return set()
+        conn = db.session.connection()
+        if conn.dialect.driver == "psycopg":
+            raw = conn.connection.driver_connection
+            with raw.cursor() as cur:
+                cur.execute("CREATE TEMP TABLE IF NOT EXISTS users_import "
+                            "(LIKE users INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+                with cur.copy(f"COPY users_import ({', '.join(INSERT_COLUMNS)}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(tuple(row[c] for c in INSERT_COLUMNS))
+            cols = ", ".join(INSERT_COLUMNS)
+            result = conn.execute(text(
+                f"INSERT INTO users ({cols}) SELECT {cols} FROM users_import "
+                "ON CONFLICT (email) DO NOTHING RETURNING email"
+            ))
+            return set(result.scalars())
+        insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(User).values(rows).on_conflict_do_nothing(index_elements=["email"]).returning(User.email)
+        return set(db.session.scalars(stmt))
+
+    def run(self, records, offset: int = 0) -> ImportStats:
+        self.stats.next_offset = offset
+        ctx = multiprocessing.get_context("spawn")  # pas de fork d'un process qui a des threads/connexions
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx) as pool:
+            batch = []
+            for rec_offset, record in records:
+                if rec_offset < offset:
+                    continue
+                batch.append((rec_offset, record))
+                if len(batch) >= self.batch_size:
+                    self._process(batch, pool)
+                    batch = []
+            if batch:
+                self._process(batch, pool)
+        return self.stats
+
+    def _process(self, batch, pool) -> None:
+        valid = self._drop_existing(self._validate(batch))
+        hashes = pool.map(hash_password, [data["password"] for _, _, data in valid],
+                          chunksize=max(len(valid) // (4 * self.workers), 1))
+        rows = [
+            {"id": uuid.uuid4(), "email": data["email"], "password_hash": pw_hash,
+             "role": data["role"], "is_active": data["is_active"]}
+            for (_, _, data), pw_hash in zip(valid, hashes)
+        ]
+        created = self._insert(rows)
+        db.session.commit()
+        for offset, record, data in valid:
+            if data["email"] not in created:  # créé entre-temps par un autre process
+                self.stats.existing += 1
+                self._reject(offset, record, "already exists")
+        self.stats.inserted += len(created)
+        self.stats.read += len(batch)
+        self.stats.next_offset = batch[-1][0] + 1
+        if self.rejects is not None:
+            self.rejects.flush()
+        if self.progress:
+            self.progress(self.stats)
@@ -0,0 +1,36 @@
+# app/users/cli.py
+# Commandes "flask users ..." (enregistrées dans create_app).
+import sys
+import click
+from flask.cli import AppGroup
+from app.users.bulk_import import UserImporter, read_records
+
+users_cli = AppGroup("users", help="Administration des utilisateurs.")
+
+
+@users_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None,
+              help="Format du fichier (défaut: d'après l'extension).")
+@click.option("--batch-size", default=1000, show_default=True, help="Users par lot (un commit par lot).")
+@click.option("--workers", type=int, default=None, help="Process de hachage bcrypt (défaut: nb de CPU).")
+@click.option("--offset", default=0, show_default=True, help="Reprendre à cet enregistrement (next_offset affiché).")
+@click.option("--rejects", type=click.Path(dir_okay=False), default=None,
+              help="Fichier NDJSON des lignes rejetées (sans mot de passe).")
+def import_users(path, fmt, batch_size, workers, offset, rejects):
+    """Importe des users depuis un CSV/NDJSON (colonnes: email, password, role?, is_active?)."""
+    rejects_file = open(rejects, "a", encoding="utf-8") if rejects else None
+
+    def progress(stats):
+        click.echo(f"[users import] {stats.summary()}", err=True)
+
+    importer = UserImporter(batch_size=batch_size, workers=workers, rejects=rejects_file, progress=progress)
+    try:
+        stats = importer.run(read_records(path, fmt), offset=offset)
+    except KeyboardInterrupt:
+        click.echo(f"[users import] interrupted, resume with --offset {importer.stats.next_offset}", err=True)
+        sys.exit(130)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+    click.echo(f"[users import] done: {stats.summary()}")
@@ -0,0 +1,129 @@
+# app/users/deletion.py
+# Suppression de compte en deux temps, sans transaction géante:
+#   1. request_deletion(): users.deleted_at posé -> tokens refusés immédiatement
+#      (app.auth.service.token_revoked_statement), suivi dans user_deletions, job empilé;
+#   2. job users.purge: notes (+ pièces jointes, partages, journal de synchro) et partages
+#      reçus supprimés par lots de USER_PURGE_BATCH_SIZE, un commit par lot, pause
+#      USER_PURGE_PAUSE_MS entre deux (WAL, réplicas, verrous courts), puis la ligne users.
+# Le job rend la main après USER_PURGE_SLICE_SECONDS et se ré-empile: il reste sous la
+# visibilité d'un job (JOBS_VISIBILITY_TIMEOUT) et les autres jobs passent entre deux tranches.
+# Chaque lot est idempotent: un job rejoué (ou en double) reprend là où en est la base.
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+
+from app.extensions import db
+from app.users.models import User, UserDeletion
+from app.notes.models import Note, NoteChange, NoteShare, NoteStats
+from app.notes.cache import note_cache
+from app.attachments.models import Attachment
+from app.attachments.jobs import blob_refs, discard_blobs
+from app.jobs.queue import enqueue, job
+
+log = logging.getLogger("app.users.deletion")
+
+PENDING = "pending"
+PURGING = "purging"
+DONE = "done"
+
+
+def request_deletion(user: User, requested_by: uuid.UUID | None) -> UserDeletion:
+    """Suppression logique immédiate + purge en fond. Idempotent (relancer = ré-empiler la purge)."""
+    deletion = db.session.get(UserDeletion, user.id)
+    if deletion is None:
+        total = db.session.execute(select(NoteStats.note_count).where(NoteStats.owner_id == user.id)).scalar()
+        deletion = UserDeletion(user_id=user.id, requested_by=requested_by, status=PENDING,
+                                notes_total=total or 0, notes_deleted=0)
+        db.session.add(deletion)
+    if user.deleted_at is None:
+        user.deleted_at = datetime.now(timezone.utc)
+    db.session.commit()
+    cache = note_cache()
+    if cache:
+        cache.bump(user.id)
+    enqueue("users.purge", user_id=str(user.id))
+    return deletion
+
+
+def _purge_notes_batch(user_id: uuid.UUID, batch_size: int) -> int:
+    """Supprime au plus batch_size notes de user_id (un commit); retourne le nombre traité."""
+    ids = db.session.execute(select(Note.id).where(Note.owner_id == user_id).limit(batch_size)).scalars().all()
+    if not ids:
+        return 0
+    refs = blob_refs(Attachment.note_id.in_(ids))
+    if refs:
+        db.session.execute(delete(Attachment).where(Attachment.note_id.in_(ids)))
+    db.session.execute(delete(NoteShare).where(NoteShare.note_id.in_(ids)))
+    # owner_id dans le WHERE: une seule partition visitée (Postgres)
+    deleted = db.session.execute(
+        delete(Note).where(Note.owner_id == user_id, Note.id.in_(ids)).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.execute(update(NoteStats).where(NoteStats.owner_id == user_id)
+                       .values(note_count=NoteStats.note_count - deleted))
+    db.session.execute(update(UserDeletion).where(UserDeletion.user_id == user_id)
+                       .values(notes_deleted=UserDeletion.notes_deleted + deleted))
+    db.session.commit()
+    discard_blobs(refs)
+    return len(ids)
+
+
+def _purge_changes_batch(user_id: uuid.UUID, batch_size: int) -> int:
+    ids = select(NoteChange.note_id).where(NoteChange.owner_id == user_id).limit(batch_size)
+    deleted = db.session.execute(
+        delete(NoteChange).where(NoteChange.note_id.in_(ids)).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+def _purge_grants_batch(user_id: uuid.UUID, batch_size: int) -> int:
+    """Partages reçus par user_id (index grantee_id)."""
+    ids = select(NoteShare.note_id).where(NoteShare.grantee_id == user_id).limit(batch_size)
+    deleted = db.session.execute(
+        delete(NoteShare).where(NoteShare.grantee_id == user_id, NoteShare.note_id.in_(ids))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+def _finish(deletion: UserDeletion) -> None:
+    user_id = deletion.user_id
+    # Plus aucune note: la cascade de la FK n'a plus rien à parcourir
+    db.session.execute(delete(NoteStats).where(NoteStats.owner_id == user_id))
+    db.session.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False))
+    deletion.status = DONE
+    deletion.completed_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+
+@job("users.purge", max_attempts=10)
+def purge_user(user_id: str) -> None:
+    cfg = current_app.config
+    uid = uuid.UUID(user_id)
+    deletion = db.session.get(UserDeletion, uid)
+    if deletion is None or deletion.status == DONE:
+        return
+    if deletion.status == PENDING:
+        deletion.status = PURGING
+        deletion.started_at = datetime.now(timezone.utc)
+        db.session.commit()
+
+    batch_size = cfg["USER_PURGE_BATCH_SIZE"]
+    pause = cfg["USER_PURGE_PAUSE_MS"] / 1000
+    deadline = time.monotonic() + cfg["USER_PURGE_SLICE_SECONDS"]
+    for purge_batch in (_purge_notes_batch, _purge_grants_batch, _purge_changes_batch):
+        while purge_batch(uid, batch_size) >= batch_size:
+            if time.monotonic() >= deadline:
+                db.session.refresh(deletion)
+                log.info("user_purge_progress", extra={
+                    "user_id": user_id, "notes_deleted": deletion.notes_deleted, "notes_total": deletion.notes_total})
+                enqueue("users.purge", user_id=user_id)  # tranche suivante
+                return
+            time.sleep(pause)
+    _finish(deletion)
+    log.info("user_purge_done", extra={"user_id": user_id, "notes_deleted": deletion.notes_deleted})
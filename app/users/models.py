@@ -1,6 +1,6 @@
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import func
+from sqlalchemy import func, BigInteger
 from passlib.hash import bcrypt
 from app.extensions import db
 
@@ -13,12 +13,19 @@ class User(db.Model):
     # roles simples: "user" | "admin"
     role = db.Column(db.String(32), nullable=False, default="user", index=True)
     is_active = db.Column(db.Boolean, nullable=False, default=True)
+    email_verified_at = db.Column(db.DateTime(timezone=True), nullable=True)  # null = email non confirmé
+    # Suppression logique: tokens refusés dès cet instant, purge en fond (app.users.deletion)
+    deleted_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Incrémenté à chaque changement de mot de passe: les tokens portant une autre valeur
+    # (claim "epoch") sont révoqués d'un coup (app.auth.service.token_revoked_statement)
+    token_epoch = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
-    # relation vers Note
-    notes = db.relationship("Note", back_populates="owner", lazy="selectin")
+    # relation vers Note: chargée à la demande seulement (un user peut avoir des centaines de
+    # milliers de notes) et jamais parcourue à la suppression (cascade laissée à la base)
+    notes = db.relationship("Note", back_populates="owner", lazy="select", passive_deletes=True)
 
     # helpers mot de passe
     def set_password(self, raw_password: str) -> None:
@@ -26,3 +33,20 @@ class User(db.Model):
 
     def check_password(self, raw_password: str) -> bool:
         return bcrypt.verify(raw_password, self.password_hash)
+
+
+class UserDeletion(db.Model):
+    """
+    Suivi d'une suppression de compte (purge par lots). Pas de FK vers users:
+    la ligne survit à la suppression du user pour que le statut reste consultable.
+    """
+    __tablename__ = "user_deletions"
+
+    user_id = db.Column(UUID(as_uuid=True), primary_key=True)
+    requested_by = db.Column(UUID(as_uuid=True), nullable=True)
+    status = db.Column(db.String(16), nullable=False, default="pending")  # pending | purging | done
+    notes_total = db.Column(BigInteger, nullable=False, default=0)        # à la demande (note_stats)
+    notes_deleted = db.Column(BigInteger, nullable=False, default=0)
+    requested_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    completed_at = db.Column(db.DateTime(timezone=True), nullable=True)
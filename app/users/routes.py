@@ -1,11 +1,16 @@
-from flask import Blueprint, request, jsonify
+import uuid
+from flask import Blueprint, request, jsonify, url_for
+from flask_jwt_extended import get_jwt_identity
 from app.extensions import db
-from app.users.models import User
-from app.users.schemas import UserOut
+from app.users.models import User, UserDeletion
+from app.users.schemas import UserOut, UserDeletionOut
+from app.users.deletion import request_deletion
 from app.common.authz import roles_required
+from app.common.errors import ApiError
 
 bp = Blueprint("users", __name__)
 user_out = UserOut()
+deletion_out = UserDeletionOut()
 
 @bp.get("/")
 @roles_required("admin")
@@ -14,6 +19,32 @@ def list_users():
     users = User.query.order_by(User.created_at.desc()).all()
     data = [user_out.dump({
         "id": u.id, "email": u.email, "role": u.role,
-        "is_active": u.is_active, "created_at": u.created_at, "updated_at": u.updated_at
+        "is_active": u.is_active, "created_at": u.created_at, "updated_at": u.updated_at,
+        "deleted_at": u.deleted_at,
     }) for u in users]
     return jsonify({"status": "success", "data": data}), 200
+
+@bp.delete("/<uuid:user_id>")
+@roles_required("admin")
+def delete_user(user_id):
+    """Suppression logique immédiate (tokens refusés) puis purge des données en fond."""
+    user = db.session.get(User, user_id)
+    if user is None:
+        deletion = db.session.get(UserDeletion, user_id)
+        if deletion is None:
+            raise ApiError("User not found.", 404, "not_found")
+        return jsonify({"status": "success", "data": deletion_out.dump(deletion)}), 202
+    requested_by = uuid.UUID(get_jwt_identity())
+    if user.id == requested_by:
+        raise ApiError("You cannot delete your own account here.", 409, "conflict")
+    deletion = request_deletion(user, requested_by)
+    location = url_for(".deletion_status", user_id=user_id)
+    return jsonify({"status": "success", "data": deletion_out.dump(deletion)}), 202, {"Location": location}
+
+@bp.get("/<uuid:user_id>/deletion")
+@roles_required("admin")
+def deletion_status(user_id):
+    deletion = db.session.get(UserDeletion, user_id)
+    if deletion is None:
+        raise ApiError("No deletion requested for this user.", 404, "not_found")
+    return jsonify({"status": "success", "data": deletion_out.dump(deletion)}), 200
@@ -7,3 +7,20 @@ class UserOut(Schema):
     is_active = fields.Boolean(required=True)
     created_at = fields.DateTime(required=True)
     updated_at = fields.DateTime(required=True)
+    deleted_at = fields.DateTime(allow_none=True)
+
+def _deletion_progress(d) -> float:
+    if d.status == "done":
+        return 1.0
+    return round(min(d.notes_deleted / d.notes_total, 1.0), 4) if d.notes_total else 0.0
+
+class UserDeletionOut(Schema):
+    user_id = fields.UUID(required=True)
+    status = fields.String(required=True)
+    notes_total = fields.Integer(required=True)
+    notes_deleted = fields.Integer(required=True)
+    progress = fields.Function(lambda d: _deletion_progress(d))
+    requested_by = fields.UUID(allow_none=True)
+    requested_at = fields.DateTime(required=True)
+    started_at = fields.DateTime(allow_none=True)
+    completed_at = fields.DateTime(allow_none=True)
@@ -0,0 +1,4 @@
+from app.asgi.app import create_asgi_app
+
+# Mode ASGI: uvicorn asgi:app (voir docker/entrypoint.sh, SERVER_MODE=asgi)
+app = create_asgi_app()
@@ -0,0 +1,172 @@
+"""
+Benchmark WSGI (gunicorn threads) vs ASGI (uvicorn) sur les routes de lecture.
+
+Ouvre --connections connexions keep-alive par cible, dont --active envoient des
+requêtes en boucle; les autres restent ouvertes et inactives (clients mobiles
+"idle-heavy") et envoient une requête toutes les --idle-interval secondes.
+
+Exemple (deux stacks lancées avec SERVER_MODE=wsgi puis SERVER_MODE=asgi):
+
+    python bench/serving.py --target wsgi=http://localhost:8000 \
+        --target asgi=http://localhost:8001 \
+        --email bench@example.com --password SuperSecret123 \
+        --connections 2000 --active 200 --duration 30 --path /api/v1/auth/me
+
+Le blueprint Notes est limité à 60/min par IP: pour /api/v1/notes/, prévoir
+une IP source par client ou s'attendre à des 429 (comptés en erreurs).
+
+Aucune dépendance externe: client HTTP/1.1 minimal en asyncio.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+class Conn:
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, headers=None, body=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", "Connection: keep-alive",
+                 f"Content-Length: {len(payload)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        for k, v in (headers or {}).items():
+            lines.append(f"{k}: {v}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        length, chunked = 0, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value.strip())
+            elif name == "transfer-encoding" and "chunked" in value:
+                chunked = True
+        if chunked:
+            data = b""
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                data += chunk[:-2]
+        else:
+            data = await self.reader.readexactly(length)
+        return status, data
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def login(host, port, email, password):
+    c = Conn(host, port)
+    await c.open()
+    await c.request("POST", "/api/v1/auth/register", body={"email": email, "password": password})
+    status, data = await c.request("POST", "/api/v1/auth/login", body={"email": email, "password": password})
+    c.close()
+    if status != 200:
+        raise SystemExit(f"login failed ({status}): {data[:200]!r}")
+    return json.loads(data)["access_token"]
+
+
+async def run_target(name, url, args):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    token = args.token or await login(host, port, args.email, args.password)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    conns = []
+    for _ in range(args.connections):
+        c = Conn(host, port)
+        try:
+            await c.open()
+        except OSError:
+            break
+        conns.append(c)
+
+    latencies, errors = [], 0
+    deadline = time.monotonic() + args.duration
+
+    async def worker(conn, idle):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            try:
+                status, _ = await conn.request("GET", args.path, headers)
+                if status >= 400:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - t0)
+            except Exception:
+                errors += 1
+                return
+            if idle:
+                await asyncio.sleep(args.idle_interval)
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker(c, i >= args.active) for i, c in enumerate(conns)))
+    elapsed = time.monotonic() - started
+    for c in conns:
+        c.close()
+
+    lat = sorted(latencies)
+
+    def pct(p):
+        return lat[min(int(len(lat) * p), len(lat) - 1)] * 1000 if lat else float("nan")
+
+    return {
+        "target": name,
+        "connections": len(conns),
+        "requests": len(lat),
+        "errors": errors,
+        "rps": round(len(lat) / elapsed, 1),
+        "p50_ms": round(pct(0.50), 2),
+        "p99_ms": round(pct(0.99), 2),
+        "mean_ms": round(statistics.fmean(lat) * 1000, 2) if lat else None,
+    }
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--target", action="append", required=True, help="nom=url, répétable")
+    ap.add_argument("--path", default="/api/v1/auth/me")
+    ap.add_argument("--token")
+    ap.add_argument("--email", default="bench@example.com")
+    ap.add_argument("--password", default="SuperSecret123")
+    ap.add_argument("--connections", type=int, default=1000)
+    ap.add_argument("--active", type=int, default=100)
+    ap.add_argument("--idle-interval", type=float, default=5.0)
+    ap.add_argument("--duration", type=float, default=20.0)
+    args = ap.parse_args()
+
+    results = []
+    for spec in args.target:
+        name, _, url = spec.partition("=")
+        results.append(await run_target(name, url, args))
+
+    cols = ["target", "connections", "requests", "errors", "rps", "p50_ms", "p99_ms", "mean_ms"]
+    print("\t".join(cols))
+    for r in results:
+        print("\t".join(str(r[c]) for c in cols))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -33,16 +33,20 @@ else:
 PY
 
 
-# Migrations DB
+# Migrations DB: check de révision rapide + verrou advisory (une seule instance migre)
 echo "[entrypoint] Running migrations..."
 export FLASK_APP=wsgi.py
-flask db upgrade
+python migrate.py
 
-# Lancement gunicorn
+# Mode de service: "wsgi" (gunicorn threads, défaut) ou "asgi" (uvicorn, routes chaudes en async)
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    echo "[entrypoint] Starting uvicorn (ASGI)..."
+    exec uvicorn asgi:app --host 0.0.0.0 --port 8000 \
+        --workers ${UVICORN_WORKERS:-${GUNICORN_WORKERS:-3}} \
+        --timeout-keep-alive ${UVICORN_KEEPALIVE:-75} \
+        --no-access-log
+fi
+
+# Lancement gunicorn (bind/workers/threads/preload/warm-up: voir gunicorn.conf.py)
 echo "[entrypoint] Starting gunicorn..."
-# Workers: 2 * CPU + 1 ; threads 4 (API I/O bound)
-exec gunicorn --bind 0.0.0.0:8000 \
-    --workers ${GUNICORN_WORKERS:-3} \
-    --threads ${GUNICORN_THREADS:-4} \
-    --timeout ${GUNICORN_TIMEOUT:-30} \
-    wsgi:app
+exec gunicorn -c gunicorn.conf.py wsgi:app
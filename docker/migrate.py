@@ -0,0 +1,103 @@
+# docker/migrate.py
+# Remplace "flask db upgrade" au démarrage du conteneur.
+# 1) Compare alembic_version aux heads des scripts, sans importer l'app Flask.
+#    Une révision inconnue des scripts (base plus récente que le code: déploiement d'un
+#    rollback) arrête le conteneur: ni upgrade ni démarrage sur un schéma inattendu.
+# 2) Si en retard: verrou advisory Postgres -> une seule instance migre, les autres attendent
+#    puis constatent que le schéma est à jour.
+import os
+import sys
+import time
+
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+MIGRATIONS_DIR = os.getenv("MIGRATIONS_DIR", "migrations")
+LOCK_KEY = 0x67_78_74_5F_6D_69_67  # "gxt_mig": identifiant du verrou advisory
+LOCK_TIMEOUT = float(os.getenv("MIGRATE_LOCK_TIMEOUT", "300"))
+
+_t0 = time.monotonic()
+
+
+def log(msg: str) -> None:
+    print(f"[migrate] {msg} (+{int((time.monotonic() - _t0) * 1000)} ms)", flush=True)
+
+
+def current_revisions(conn) -> set[str]:
+    exists = conn.dialect.has_table(conn, "alembic_version")
+    if not exists:
+        return set()
+    return {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+
+
+def check_known(current: set[str], script: ScriptDirectory) -> None:
+    """Échoue si la base est à une révision absente des scripts (ni head ni ancêtre d'un head)."""
+    known = {rev.revision for rev in script.walk_revisions()}
+    unknown = current - known
+    if unknown:
+        raise SystemExit(f"[migrate] database revision {sorted(unknown)} is not in the script heads "
+                         f"{sorted(script.get_heads())} or their ancestors: the database is ahead of "
+                         "this code (rollback deploy?); refusing to start")
+
+
+def run_upgrade() -> None:
+    # Seul chemin qui paie l'import complet de l'app (env.py d'Alembic en a besoin)
+    from flask_migrate import upgrade
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+
+
+def acquire_lock(conn) -> None:
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": LOCK_KEY}).scalar():
+        if time.monotonic() > deadline:
+            raise SystemExit(f"[migrate] could not acquire migration lock within {LOCK_TIMEOUT:.0f}s")
+        time.sleep(0.5)
+
+
+def main() -> int:
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise SystemExit("[migrate] DATABASE_URL is not set")
+    script = ScriptDirectory(MIGRATIONS_DIR)
+    heads = set(script.get_heads())
+    engine = create_engine(url, poolclass=NullPool)
+
+    with engine.connect() as conn:
+        current = current_revisions(conn)
+        conn.rollback()
+        if current == heads:
+            log(f"schema already at head {sorted(heads)}")
+            return 0
+        check_known(current, script)
+        log(f"schema at {sorted(current) or 'base'}, head is {sorted(heads)}")
+
+        if conn.dialect.name != "postgresql":
+            run_upgrade()
+            log("upgrade done")
+            return 0
+
+        # Verrou de session (autocommit): tenu pendant que l'upgrade tourne sur sa propre connexion
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        log("waiting for migration lock")
+        acquire_lock(conn)
+        try:
+            log("migration lock acquired")
+            current = current_revisions(conn)
+            if current == heads:
+                log("schema migrated by another instance")
+                return 0
+            check_known(current, script)
+            run_upgrade()
+            log("upgrade done")
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": LOCK_KEY})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
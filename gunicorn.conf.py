@@ -0,0 +1,52 @@
+# gunicorn.conf.py
+# Config gunicorn (docker/entrypoint.sh: gunicorn -c gunicorn.conf.py wsgi:app).
+# GUNICORN_PRELOAD=true: l'app est importée et chauffée une seule fois dans le master,
+# puis les workers sont forkés (mémoire partagée en copy-on-write, démarrage rapide).
+import os
+import time
+
+from app.common.warmup import warm_up, freeze_heap, reset_after_fork, memory_usage
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+# Workers: 2 * CPU + 1 ; threads 4 (API I/O bound)
+workers = int(os.getenv("GUNICORN_WORKERS", "3"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+WARMUP = os.getenv("APP_WARMUP", "true").lower() == "true"
+
+_boot_started = time.monotonic()
+
+
+def when_ready(server):
+    # Appelé dans le master, après le chargement de l'app (preload) et avant le 1er fork
+    if preload_app:
+        app = server.app.wsgi()
+        if WARMUP:
+            warm_up(app)
+        freeze_heap()
+    server.log.info("master ready: preload=%s startup_ms=%d memory=%s", preload_app,
+                    int((time.monotonic() - _boot_started) * 1000), memory_usage())
+
+
+def post_fork(server, worker):
+    worker._forked_at = time.monotonic()
+    if preload_app:
+        reset_after_fork(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    # Sans preload, chaque worker a importé l'app lui-même: on le chauffe ici
+    app = worker.wsgi
+    if not preload_app and WARMUP:
+        warm_up(app)
+    app.extensions["health"].ensure_started()
+    worker.log.info("worker %s ready: startup_ms=%d memory=%s", worker.pid,
+                    int((time.monotonic() - worker._forked_at) * 1000), memory_usage())
+
+
+def worker_exit(server, worker):
+    # Vide le journal d'audit en attente avant la sortie du worker
+    audit = getattr(worker, "wsgi", None) and worker.wsgi.extensions.get("audit")
+    if audit is not None:
+        audit.close()
@@ -0,0 +1,54 @@
+"""notes full-text search: tsvector + GIN (postgres), FTS5 (sqlite)
+
+Revision ID: 3f1c2a9b7d10
+Revises: 985eae7e9714
+Create Date: 2026-10-19 10:12:04.118230
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = '985eae7e9714'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Colonne générée: Postgres la maintient à chaque INSERT/UPDATE (réécrit la table une fois)
+        op.execute(
+            "ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(content, '')), 'B')) STORED"
+        )
+        op.execute("CREATE INDEX ix_notes_search_vector ON notes USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE notes_fts USING fts5(title, content, content='notes', content_rowid='rowid')")
+        op.execute(
+            "CREATE TRIGGER notes_fts_ai AFTER INSERT ON notes BEGIN "
+            "INSERT INTO notes_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER notes_fts_ad AFTER DELETE ON notes BEGIN "
+            "INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.rowid, old.title, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER notes_fts_au AFTER UPDATE ON notes BEGIN "
+            "INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.rowid, old.title, old.content); "
+            "INSERT INTO notes_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content); END"
+        )
+        op.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_notes_search_vector")
+        op.execute("ALTER TABLE notes DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('notes_fts_ai', 'notes_fts_ad', 'notes_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS notes_fts")
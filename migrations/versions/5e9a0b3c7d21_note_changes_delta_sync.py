@@ -0,0 +1,56 @@
+"""note_changes: change sequence + tombstones for delta sync
+
+Revision ID: 5e9a0b3c7d21
+Revises: c41d7e2a9f08
+Create Date: 2026-10-19 16:05:41.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5e9a0b3c7d21'
+down_revision = 'c41d7e2a9f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    is_pg = op.get_bind().dialect.name == 'postgresql'
+    if is_pg:
+        op.execute(sa.schema.CreateSequence(sa.Sequence('note_changes_seq')))
+    op.create_table('note_changes',
+    sa.Column('note_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'),
+              server_default=sa.text("nextval('note_changes_seq')") if is_pg else None, nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('note_id'),
+    sa.UniqueConstraint('seq')
+    )
+    with op.batch_alter_table('note_changes', schema=None) as batch_op:
+        batch_op.create_index('ix_note_changes_owner_id_seq', ['owner_id', 'seq'], unique=False)
+
+    # Backfill: toutes les notes existantes, dans l'ordre de dernière modification
+    if is_pg:
+        op.execute("""
+            INSERT INTO note_changes (note_id, owner_id, seq, deleted, changed_at)
+            SELECT id, owner_id, nextval('note_changes_seq'), false, updated_at
+            FROM (SELECT id, owner_id, updated_at FROM notes ORDER BY updated_at, id) AS n
+        """)
+    else:
+        op.execute("""
+            INSERT INTO note_changes (note_id, owner_id, seq, deleted, changed_at)
+            SELECT id, owner_id, row_number() OVER (ORDER BY updated_at, id), 0, updated_at FROM notes
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table('note_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_note_changes_owner_id_seq')
+
+    op.drop_table('note_changes')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(sa.schema.DropSequence(sa.Sequence('note_changes_seq')))
@@ -0,0 +1,43 @@
+"""notes partitions: rename the notes_new_pXX_* indexes left by the partitioning swap
+
+Revision ID: 6a2f8c4e1d97
+Revises: bc0d3f51df19
+Create Date: 2026-10-20 11:02:45.118204
+
+9d4f6b2e1a87 renomme les partitions (notes_new_pXX -> notes_pXX) mais pas leurs index,
+nommés par Postgres d'après la table de l'époque: notes_new_pXX_pkey,
+notes_new_pXX_search_vector_idx. Postgres uniquement; une base créée par db.create_all()
+a déjà les noms notes_pXX_* (rien à renommer).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a2f8c4e1d97'
+down_revision = 'bc0d3f51df19'
+branch_labels = None
+depends_on = None
+
+PARTITIONS = 16
+SUFFIXES = ("pkey", "search_vector_idx")
+
+
+def _rename(old_prefix: str, new_prefix: str):
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for i in range(PARTITIONS):
+        for suffix in SUFFIXES:
+            old, new = f"{old_prefix}_p{i:02d}_{suffix}", f"{new_prefix}_p{i:02d}_{suffix}"
+            if bind.execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": old}).scalar():
+                # Renommer l'index d'une contrainte (pkey) renomme aussi la contrainte
+                op.execute(f"ALTER INDEX {old} RENAME TO {new}")
+
+
+def upgrade():
+    _rename("notes_new", "notes")
+
+
+def downgrade():
+    _rename("notes", "notes_new")
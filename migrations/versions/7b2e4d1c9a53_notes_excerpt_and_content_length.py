@@ -0,0 +1,53 @@
+"""notes: excerpt + content_length for summary listings
+
+Revision ID: 7b2e4d1c9a53
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-19 11:02:47.530912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e4d1c9a53'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+EXCERPT_CHARS = 200
+
+
+def upgrade():
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=EXCERPT_CHARS), server_default='', nullable=False))
+        batch_op.add_column(sa.Column('content_length', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill: même règle que app.notes.models.make_excerpt
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(f"""
+            UPDATE notes SET
+                content_length = char_length(content),
+                excerpt = CASE
+                    WHEN char_length(btrim(regexp_replace(content, '\\s+', ' ', 'g'))) <= {EXCERPT_CHARS}
+                        THEN btrim(regexp_replace(content, '\\s+', ' ', 'g'))
+                    ELSE left(btrim(regexp_replace(content, '\\s+', ' ', 'g')), {EXCERPT_CHARS - 1}) || '…'
+                END
+        """)
+    else:
+        # SQLite (dev): pas de regexp, approximation sur les retours à la ligne
+        op.execute(f"""
+            UPDATE notes SET
+                content_length = length(content),
+                excerpt = CASE
+                    WHEN length(trim(replace(replace(content, char(13), ' '), char(10), ' '))) <= {EXCERPT_CHARS}
+                        THEN trim(replace(replace(content, char(13), ' '), char(10), ' '))
+                    ELSE substr(trim(replace(replace(content, char(13), ' '), char(10), ' ')), 1, {EXCERPT_CHARS - 1}) || '…'
+                END
+        """)
+
+
+def downgrade():
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.drop_column('content_length')
+        batch_op.drop_column('excerpt')
@@ -0,0 +1,85 @@
+"""notes_fts (sqlite): key the FTS5 index on a stable integer per note id, not notes.rowid
+
+Revision ID: 8e3b5d7a2c64
+Revises: 6a2f8c4e1d97
+Create Date: 2026-10-20 14:26:51.907342
+
+notes a une clé primaire UUID: son rowid implicite peut être renuméroté par VACUUM,
+ce qui désynchronise un index FTS5 dont content_rowid est ce rowid. La clé FTS devient
+notes_fts_keys.key (INTEGER PRIMARY KEY, stable) associée à notes.id; le contenu
+externe est lu par la vue notes_fts_content. SQLite uniquement (Postgres: no-op).
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3b5d7a2c64'
+down_revision = '6a2f8c4e1d97'
+branch_labels = None
+depends_on = None
+
+TRIGGERS = ('notes_fts_ai', 'notes_fts_ad', 'notes_fts_au')
+
+
+def _drop_fts():
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS notes_fts")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _drop_fts()
+    op.execute("CREATE TABLE notes_fts_keys (key INTEGER PRIMARY KEY, note_id CHAR(32) NOT NULL UNIQUE)")
+    op.execute("INSERT INTO notes_fts_keys(note_id) SELECT id FROM notes")
+    op.execute(
+        "CREATE VIEW notes_fts_content AS SELECT k.key, n.title, n.content "
+        "FROM notes_fts_keys k JOIN notes n ON n.id = k.note_id"
+    )
+    op.execute(
+        "CREATE VIRTUAL TABLE notes_fts USING fts5(title, content, content='notes_fts_content', content_rowid='key')"
+    )
+    op.execute(
+        "CREATE TRIGGER notes_fts_ai AFTER INSERT ON notes BEGIN "
+        "INSERT INTO notes_fts_keys(note_id) VALUES (new.id); "
+        "INSERT INTO notes_fts(rowid, title, content) "
+        "SELECT key, new.title, new.content FROM notes_fts_keys WHERE note_id = new.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER notes_fts_ad AFTER DELETE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+        "SELECT 'delete', key, old.title, old.content FROM notes_fts_keys WHERE note_id = old.id; "
+        "DELETE FROM notes_fts_keys WHERE note_id = old.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER notes_fts_au AFTER UPDATE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+        "SELECT 'delete', key, old.title, old.content FROM notes_fts_keys WHERE note_id = old.id; "
+        "INSERT INTO notes_fts(rowid, title, content) "
+        "SELECT key, new.title, new.content FROM notes_fts_keys WHERE note_id = new.id; END"
+    )
+    op.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _drop_fts()
+    op.execute("DROP VIEW IF EXISTS notes_fts_content")
+    op.execute("DROP TABLE IF EXISTS notes_fts_keys")
+    op.execute("CREATE VIRTUAL TABLE notes_fts USING fts5(title, content, content='notes', content_rowid='rowid')")
+    op.execute(
+        "CREATE TRIGGER notes_fts_ai AFTER INSERT ON notes BEGIN "
+        "INSERT INTO notes_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER notes_fts_ad AFTER DELETE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.rowid, old.title, old.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER notes_fts_au AFTER UPDATE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, content) VALUES ('delete', old.rowid, old.title, old.content); "
+        "INSERT INTO notes_fts(rowid, title, content) VALUES (new.rowid, new.title, new.content); END"
+    )
+    op.execute("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
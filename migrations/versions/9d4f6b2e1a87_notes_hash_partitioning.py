@@ -0,0 +1,143 @@
+"""notes: hash partitioning by owner_id (postgres), online copy + swap
+
+Revision ID: 9d4f6b2e1a87
+Revises: 5e9a0b3c7d21
+Create Date: 2026-10-19 16:31:12.540377
+
+Postgres uniquement (SQLite: no-op). Déroulé en ligne:
+  1. notes_new partitionnée HASH(owner_id), PK (id, owner_id), mêmes index;
+  2. trigger sur notes qui répercute INSERT/UPDATE/DELETE dans notes_new;
+  3. recopie par lots (commit par lot, lignes source verrouillées FOR SHARE le temps
+     du lot pour qu'une suppression concurrente ne laisse pas de fantôme);
+  4. bascule courte sous ACCESS EXCLUSIVE: suppression du trigger, échange des noms.
+Les écritures continuent pendant 1-3; seule l'étape 4 les bloque (quelques ms).
+"""
+import os
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f6b2e1a87'
+down_revision = '5e9a0b3c7d21'
+branch_labels = None
+depends_on = None
+
+PARTITIONS = 16
+BATCH_SIZE = int(os.getenv("NOTES_PARTITION_BATCH", "5000"))
+
+COLUMNS = "id, title, content, excerpt, content_length, owner_id, created_at, updated_at"
+SEARCH_VECTOR = (
+    "search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(content, '')), 'B')) STORED"
+)
+
+
+def _cleanup(target: str):
+    # Reprise après un échec: la recopie commite par lots, table cible et trigger peuvent rester
+    op.execute("DROP TRIGGER IF EXISTS notes_mirror ON notes")
+    op.execute("DROP FUNCTION IF EXISTS notes_mirror()")
+    op.execute(f"DROP TABLE IF EXISTS {target}")
+
+
+def _create_table(name: str, partitioned: bool):
+    _cleanup(name)
+    op.execute(f"""
+        CREATE TABLE {name} (
+            id uuid NOT NULL,
+            title varchar(200) NOT NULL,
+            content text NOT NULL,
+            excerpt varchar(200) NOT NULL DEFAULT '',
+            content_length integer NOT NULL DEFAULT 0,
+            owner_id uuid NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            {SEARCH_VECTOR},
+            CONSTRAINT {name}_pkey PRIMARY KEY ({'id, owner_id' if partitioned else 'id'}),
+            -- nom final dès la création (unicité par table seulement pour une FK)
+            CONSTRAINT notes_owner_id_fkey FOREIGN KEY (owner_id) REFERENCES users (id) ON DELETE CASCADE
+        ){' PARTITION BY HASH (owner_id)' if partitioned else ''}
+    """)
+    if partitioned:
+        for i in range(PARTITIONS):
+            op.execute(f"CREATE TABLE {name}_p{i:02d} PARTITION OF {name} "
+                       f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {i})")
+    op.execute(f"CREATE INDEX {name}_owner_id_idx ON {name} (owner_id)")
+    op.execute(f"CREATE INDEX {name}_search_vector_idx ON {name} USING gin (search_vector)")
+
+
+def _online_copy(target: str, conflict_key: str):
+    # 2. Trigger miroir: toute écriture sur notes est répercutée dans target
+    op.execute(f"""
+        CREATE FUNCTION notes_mirror() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM {target} WHERE id = OLD.id AND owner_id = OLD.owner_id;
+                RETURN OLD;
+            END IF;
+            INSERT INTO {target} ({COLUMNS})
+            VALUES (NEW.id, NEW.title, NEW.content, NEW.excerpt, NEW.content_length,
+                    NEW.owner_id, NEW.created_at, NEW.updated_at)
+            ON CONFLICT ({conflict_key}) DO UPDATE SET
+                title = EXCLUDED.title, content = EXCLUDED.content, excerpt = EXCLUDED.excerpt,
+                content_length = EXCLUDED.content_length, updated_at = EXCLUDED.updated_at;
+            RETURN NEW;
+        END $$
+    """)
+    op.execute("CREATE TRIGGER notes_mirror AFTER INSERT OR UPDATE OR DELETE ON notes "
+               "FOR EACH ROW EXECUTE FUNCTION notes_mirror()")
+
+    # 3. Recopie par lots, hors transaction de migration (un commit par lot).
+    #    autocommit_block commite d'abord la table cible et le trigger: dès cet instant
+    #    chaque écriture concurrente est répercutée.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = None
+        while True:
+            # Keyset sur la PK: chaque lot est un parcours d'index borné
+            after = "" if last_id is None else "WHERE id > CAST(:last_id AS uuid)"
+            row = bind.execute(sa.text(f"""
+                WITH batch AS (
+                    SELECT {COLUMNS} FROM notes {after}
+                    ORDER BY id LIMIT :n FOR SHARE
+                ), ins AS (
+                    INSERT INTO {target} ({COLUMNS}) SELECT {COLUMNS} FROM batch
+                    ON CONFLICT ({conflict_key}) DO NOTHING
+                )
+                SELECT max(id::text) AS last_id, count(*) AS n FROM batch
+            """), {"last_id": last_id, "n": BATCH_SIZE}).one()
+            if not row.n:
+                break
+            last_id = row.last_id
+
+
+def _swap(target: str, old: str):
+    # 4. Bascule: verrou court, plus aucune écriture ne passe par le trigger
+    op.execute("LOCK TABLE notes IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER notes_mirror ON notes")
+    op.execute("DROP FUNCTION notes_mirror()")
+    op.execute(f"ALTER TABLE notes RENAME TO {old}")
+    op.execute(f"DROP TABLE {old}")
+    op.execute(f"ALTER TABLE {target} RENAME TO notes")
+    op.execute(f"ALTER TABLE notes RENAME CONSTRAINT {target}_pkey TO notes_pkey")
+    op.execute(f"ALTER INDEX {target}_owner_id_idx RENAME TO ix_notes_owner_id")
+    op.execute(f"ALTER INDEX {target}_search_vector_idx RENAME TO ix_notes_search_vector")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _create_table("notes_new", partitioned=True)
+    _online_copy("notes_new", "id, owner_id")
+    _swap("notes_new", "notes_unpartitioned")
+    for i in range(PARTITIONS):
+        op.execute(f"ALTER TABLE notes_new_p{i:02d} RENAME TO notes_p{i:02d}")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _create_table("notes_new", partitioned=False)
+    _online_copy("notes_new", "id")
+    _swap("notes_new", "notes_partitioned")
@@ -0,0 +1,48 @@
+"""note_shares: per-note ACL + (owner_id, created_at, id) listing index on notes
+
+Revision ID: a4c7e1f9b382
+Revises: f8b1d4e7c259
+Create Date: 2026-10-19 21:02:41.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e1f9b382'
+down_revision = 'f8b1d4e7c259'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Le nouvel index couvre owner_id seul (préfixe): l'ancien devient redondant
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.create_index('ix_notes_owner_id_created_at_id', ['owner_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_notes_owner_id')
+
+    op.create_table('note_shares',
+    sa.Column('note_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('grantee_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('permission', sa.String(length=8), nullable=False),
+    sa.Column('note_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['grantee_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['note_id', 'owner_id'], ['notes.id', 'notes.owner_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('note_id', 'grantee_id')
+    )
+    with op.batch_alter_table('note_shares', schema=None) as batch_op:
+        batch_op.create_index('ix_note_shares_grantee_id_note_created_at', ['grantee_id', 'note_created_at', 'note_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('note_shares', schema=None) as batch_op:
+        batch_op.drop_index('ix_note_shares_grantee_id_note_created_at')
+
+    op.drop_table('note_shares')
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.create_index('ix_notes_owner_id', ['owner_id'], unique=False)
+        batch_op.drop_index('ix_notes_owner_id_created_at_id')
@@ -0,0 +1,27 @@
+"""users: email_verified_at (email verification flow)
+
+Revision ID: b7e3c9d2f415
+Revises: 9d4f6b2e1a87
+Create Date: 2026-10-19 17:48:05.214630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3c9d2f415'
+down_revision = '9d4f6b2e1a87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Colonne nullable sans défaut: ajout instantané, comptes existants non vérifiés
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('email_verified_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('email_verified_at')
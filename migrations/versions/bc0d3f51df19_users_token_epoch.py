@@ -0,0 +1,27 @@
+"""users.token_epoch: revoke every token of a user on password reset
+
+Revision ID: bc0d3f51df19
+Revises: a4c7e1f9b382
+Create Date: 2026-10-20 09:14:27.530611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bc0d3f51df19'
+down_revision = 'a4c7e1f9b382'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # DEFAULT constant: ajout sans réécriture de la table sous Postgres 11+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('token_epoch', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('token_epoch')
@@ -0,0 +1,46 @@
+"""auth_events: write-behind audit log for logins, failures, refreshes, logouts
+
+Revision ID: c41d7e2a9f08
+Revises: 7b2e4d1c9a53
+Create Date: 2026-10-19 15:52:10.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e2a9f08'
+down_revision = '7b2e4d1c9a53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('auth_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event', sa.String(length=32), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('email', sa.String(length=320), nullable=True),
+    sa.Column('ip', sa.String(length=45), nullable=True),
+    sa.Column('user_agent', sa.String(length=255), nullable=True),
+    sa.Column('reason', sa.String(length=64), nullable=True),
+    sa.Column('jti', sa.String(length=36), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('auth_events', schema=None) as batch_op:
+        batch_op.create_index('ix_auth_events_occurred_at', ['occurred_at'], unique=False)
+        batch_op.create_index('ix_auth_events_user_id_occurred_at', ['user_id', 'occurred_at'], unique=False)
+        batch_op.create_index('ix_auth_events_email_occurred_at', ['email', 'occurred_at'], unique=False)
+        batch_op.create_index('ix_auth_events_event_occurred_at', ['event', 'occurred_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('auth_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_auth_events_event_occurred_at')
+        batch_op.drop_index('ix_auth_events_email_occurred_at')
+        batch_op.drop_index('ix_auth_events_user_id_occurred_at')
+        batch_op.drop_index('ix_auth_events_occurred_at')
+
+    op.drop_table('auth_events')
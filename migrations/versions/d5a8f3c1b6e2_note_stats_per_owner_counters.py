@@ -0,0 +1,42 @@
+"""note_stats: per-owner note counters (count, content bytes, last write)
+
+Revision ID: d5a8f3c1b6e2
+Revises: b7e3c9d2f415
+Create Date: 2026-10-19 18:42:27.903114
+
+Backfill depuis notes. Les écritures servies par l'ancien code entre cette
+migration et le déploiement ne sont pas comptées: lancer ensuite
+"flask notes rebuild-stats" (recalcul sous verrou, sans arrêt).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8f3c1b6e2'
+down_revision = 'b7e3c9d2f415'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    is_pg = op.get_bind().dialect.name == 'postgresql'
+    op.create_table('note_stats',
+    sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('note_count', sa.BigInteger(), nullable=False),
+    sa.Column('content_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('last_write_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+    content_bytes = "octet_length(content)" if is_pg else "length(CAST(content AS BLOB))"
+    op.execute(f"""
+        INSERT INTO note_stats (owner_id, note_count, content_bytes, last_write_at)
+        SELECT owner_id, count(*), coalesce(sum({content_bytes}), 0), max(updated_at)
+        FROM notes GROUP BY owner_id
+    """)
+
+
+def downgrade():
+    op.drop_table('note_stats')
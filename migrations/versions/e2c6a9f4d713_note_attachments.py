@@ -0,0 +1,52 @@
+"""note_attachments: resumable uploads, bytes in the blob store
+
+Revision ID: e2c6a9f4d713
+Revises: d5a8f3c1b6e2
+Create Date: 2026-10-19 19:26:50.417932
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2c6a9f4d713'
+down_revision = 'd5a8f3c1b6e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # Postgres: (id, owner_id) est déjà la PK des notes partitionnées
+        op.create_index('uq_notes_id_owner_id', 'notes', ['id', 'owner_id'], unique=True)
+    op.create_table('note_attachments',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('note_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('owner_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_type', sa.String(length=255), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('received', sa.BigInteger(), nullable=False),
+    sa.Column('parts', sa.Integer(), nullable=False),
+    sa.Column('upload_token', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['note_id', 'owner_id'], ['notes.id', 'notes.owner_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('note_attachments', schema=None) as batch_op:
+        batch_op.create_index('ix_note_attachments_note_id', ['note_id'], unique=False)
+        batch_op.create_index('ix_note_attachments_status_created_at', ['status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('note_attachments', schema=None) as batch_op:
+        batch_op.drop_index('ix_note_attachments_status_created_at')
+        batch_op.drop_index('ix_note_attachments_note_id')
+
+    op.drop_table('note_attachments')
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index('uq_notes_id_owner_id', table_name='notes')
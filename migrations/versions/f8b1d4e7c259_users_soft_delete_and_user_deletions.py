@@ -0,0 +1,41 @@
+"""users: deleted_at (soft delete) + user_deletions (batched purge tracking)
+
+Revision ID: f8b1d4e7c259
+Revises: e2c6a9f4d713
+Create Date: 2026-10-19 20:08:13.662190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8b1d4e7c259'
+down_revision = 'e2c6a9f4d713'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Colonne nullable sans défaut: ajout instantané
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table('user_deletions',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('requested_by', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('notes_total', sa.BigInteger(), nullable=False),
+    sa.Column('notes_deleted', sa.BigInteger(), nullable=False),
+    sa.Column('requested_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_deletions')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,116 @@
+# tests/test_asgi.py
+# App ASGI (asgi.py) pilotée en messages ASGI bruts: routes natives async (aiosqlite ici)
+# comparées aux mêmes routes servies par Flask, relais WSGI, compression.
+import asyncio
+import gzip
+import json
+import uuid
+
+import pytest
+
+
+@pytest.fixture()
+def file_app(tmp_path, monkeypatch):
+    # Base SQLite sur fichier: l'engine sync (Flask) et l'engine async (aiosqlite) la partagent
+    from app import create_app
+    from app.config import TestConfig
+    from app.extensions import db
+
+    monkeypatch.setattr(TestConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'asgi.db'}")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+async def _call(asgi, method, path, token=None, query="", body=None, headers=()):
+    raw = json.dumps(body).encode() if body is not None else b""
+    hdrs = [(k.lower().encode(), v.encode()) for k, v in headers]
+    if token:
+        hdrs.append((b"authorization", f"Bearer {token}".encode()))
+    if raw:
+        hdrs += [(b"content-type", b"application/json"), (b"content-length", str(len(raw)).encode())]
+    scope = {"type": "http", "http_version": "1.1", "method": method, "path": path, "raw_path": path.encode(),
+             "root_path": "", "query_string": query.encode(), "headers": hdrs, "scheme": "http",
+             "client": ("127.0.0.1", 1), "server": ("test", 80)}
+    done = asyncio.Event()
+    sent = {"status": None, "headers": {}, "body": b""}
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": raw, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent["status"] = message["status"]
+            sent["headers"] = {k.decode().lower(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            sent["body"] += message.get("body", b"")
+            if not message.get("more_body"):
+                done.set()
+
+    await asyncio.wait_for(asgi(scope, receive, send), 10)
+    return sent
+
+
+def test_asgi_native_routes_match_flask(file_app):
+    from app.asgi.app import AsgiApp
+
+    client = file_app.test_client()
+    tokens = {}
+    for e in ("asgi-a@example.com", "asgi-b@example.com"):
+        r = client.post("/api/v1/auth/register", json={"email": e, "password": "SuperSecret123"})
+        tokens[e] = r.get_json()["access_token"]
+    a, b = tokens["asgi-a@example.com"], tokens["asgi-b@example.com"]
+    ha = {"Authorization": f"Bearer {a}"}
+    ids = [client.post("/api/v1/notes/", headers=ha, json={"title": f"N{i}", "content": "lorem ipsum " * 60})
+           .get_json()["id"] for i in range(3)]
+    client.post(f"/api/v1/notes/{ids[0]}/shares", headers=ha, json={"email": "asgi-b@example.com"})
+
+    asgi = AsgiApp(file_app)
+
+    async def scenario():
+        # Mêmes requêtes Core, mêmes schémas: mêmes corps que Flask
+        for token, path, query in ((a, "/api/v1/notes/", "per_page=2"),
+                                   (a, "/api/v1/notes/", "fields=title,excerpt"),
+                                   (b, "/api/v1/notes/", "scope=all"),
+                                   (a, f"/api/v1/notes/{ids[1]}", ""),
+                                   (b, f"/api/v1/notes/{ids[0]}", ""),
+                                   (a, "/api/v1/auth/me", "")):
+            r = await _call(asgi, "GET", path, token, query)
+            expected = await asyncio.to_thread(
+                client.get, f"{path}?{query}", headers={"Authorization": f"Bearer {token}"})
+            assert r["status"] == expected.status_code == 200, (path, query, r["body"])
+            assert json.loads(r["body"]) == expected.get_json(), (path, query)
+            assert r["headers"]["x-content-type-options"] == "nosniff" and r["headers"]["x-request-id"]
+
+        # Erreurs au format de l'API
+        r = await _call(asgi, "GET", f"/api/v1/notes/{ids[1]}", b)
+        assert r["status"] == 403 and json.loads(r["body"])["error"]["code"] == "forbidden"
+        r = await _call(asgi, "GET", f"/api/v1/notes/{uuid.uuid4()}", a)
+        assert r["status"] == 404
+        r = await _call(asgi, "GET", "/api/v1/notes/")
+        assert r["status"] == 401 and json.loads(r["body"])["error"]["code"] == "authorization_required"
+
+        # Route non native: relayée à Flask (pont WSGI), visible ensuite en natif
+        r = await _call(asgi, "POST", "/api/v1/notes/", a, body={"title": "via wsgi", "content": "x"})
+        assert r["status"] == 201
+        created = json.loads(r["body"])["id"]
+        r = await _call(asgi, "GET", f"/api/v1/notes/{created}", a)
+        assert r["status"] == 200 and json.loads(r["body"])["title"] == "via wsgi"
+
+        # Compression négociée comme côté Flask
+        r = await _call(asgi, "GET", "/api/v1/notes/", a, headers=[("Accept-Encoding", "gzip")])
+        assert r["headers"]["content-encoding"] == "gzip" and "accept-encoding" in r["headers"]["vary"].lower()
+        assert len(json.loads(gzip.decompress(r["body"]))["data"]) == 4
+        await asgi.engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+# tests/test_attachments.py
+import os
+
+
+def test_chunked_upload_resume_and_range_download(client):
+    users = {}
+    for e in ("att-owner@example.com", "att-other@example.com"):
+        r = client.post("/api/v1/auth/register", json={"email": e, "password": "SuperSecret123"})
+        users[e] = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    h, other = users["att-owner@example.com"], users["att-other@example.com"]
+    note_id = client.post("/api/v1/notes/", headers=h, json={"title": "A", "content": "a"}).get_json()["id"]
+    base = f"/api/v1/notes/{note_id}/attachments"
+    blob = os.urandom(3000)
+
+    r = client.post(base, headers=h, json={"filename": "scan é.bin", "size": len(blob)})
+    assert r.status_code == 201 and r.get_json()["status"] == "uploading"
+    upload_url = r.headers["Location"]
+    att_id = r.get_json()["id"]
+    assert client.post(base, headers=other, json={"filename": "x", "size": 1}).status_code == 403
+
+    def put(start, end, headers=h):
+        return client.put(upload_url, data=blob[start:end],
+                          headers={**headers, "Content-Range": f"bytes {start}-{end - 1}/{len(blob)}"})
+
+    assert put(0, 1000).get_json()["received"] == 1000
+    # Morceau rejoué / trou: 409 avec l'offset de reprise
+    r = put(2000, 3000)
+    assert r.status_code == 409 and r.get_json()["error"]["details"]["offset"] == 1000
+    assert client.get(f"{base}/{att_id}/content", headers=h).status_code == 409
+    assert put(1000, 2000, headers=other).status_code == 403
+    assert put(1000, 2000).status_code == 200
+    r = put(2000, 3000)
+    assert r.status_code == 200 and r.get_json()["status"] == "ready" and r.headers["Upload-Offset"] == "3000"
+    assert put(2000, 3000).get_json()["error"]["code"] == "upload_completed"
+
+    r = client.get(f"{base}/{att_id}/content", headers=h)
+    assert r.status_code == 200 and r.data == blob and "attachment" in r.headers["Content-Disposition"]
+    r = client.get(f"{base}/{att_id}/content", headers={**h, "Range": "bytes=100-199"})
+    assert r.status_code == 206 and r.data == blob[100:200]
+    assert r.headers["Content-Range"] == f"bytes 100-199/{len(blob)}"
+    assert client.get(f"{base}/{att_id}/content", headers=other).status_code == 403
+    assert [a["id"] for a in client.get(base, headers=h).get_json()["data"]] == [att_id]
+
+    # Upload en une fois (sans Content-Range), puis suppression de la note: blobs nettoyés
+    r = client.post(base, headers=h, json={"filename": "b.txt", "content_type": "text/plain", "size": 5})
+    assert client.put(r.headers["Location"], headers=h, data=b"hello").get_json()["status"] == "ready"
+    store = client.application.extensions["blob_store"]
+    paths = [store.local_path(key) for key in _keys(client, note_id)]
+    assert all(os.path.exists(p) for p in paths) and len(paths) == 2
+    assert client.delete(f"/api/v1/notes/{note_id}", headers=h).status_code == 204
+    assert not any(os.path.exists(p) for p in paths)
+
+
+def _keys(client, note_id):
+    import uuid
+    from app.attachments.models import Attachment
+    with client.application.app_context():
+        return [a.storage_key for a in Attachment.query.filter_by(note_id=uuid.UUID(note_id)).all()]
+
+
+def test_concurrent_chunk_upload_loses_cleanly(client, monkeypatch):
+    # Le corps est lu hors transaction: un autre PUT au même offset peut passer pendant
+    # ce temps; le plus lent reçoit 409 sans toucher au blob déjà accepté
+    import app.attachments.routes as routes
+
+    r = client.post("/api/v1/auth/register", json={"email": "att-race@example.com", "password": "SuperSecret123"})
+    h = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    note_id = client.post("/api/v1/notes/", headers=h, json={"title": "R", "content": "r"}).get_json()["id"]
+    upload_url = client.post(f"/api/v1/notes/{note_id}/attachments", headers=h,
+                             json={"filename": "r.bin", "size": 8}).headers["Location"]
+    copy_stream = routes.copy_stream
+    racers = []
+
+    def slow_copy(stream, dst, length):
+        if not racers:
+            racers.append(None)  # le PUT concurrent repasse par ici
+            racers[0] = client.put(upload_url, headers=h, data=b"winner!!")
+        copy_stream(stream, dst, length)
+
+    monkeypatch.setattr(routes, "copy_stream", slow_copy)
+    r = client.put(upload_url, headers=h, data=b"loser!!!")
+    assert racers[0].status_code == 200 and racers[0].get_json()["status"] == "ready"
+    assert r.status_code == 409 and r.get_json()["error"]["details"]["offset"] == 8
+    content = client.get(upload_url, headers=h)
+    assert content.status_code == 200 and content.data == b"winner!!"
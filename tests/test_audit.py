@@ -0,0 +1,92 @@
+# tests/test_audit.py
+from app.audit.writer import AuditWriter
+
+
+def _register_admin(client, email):
+    from app.extensions import db
+    from app.users.models import User
+    client.post("/api/v1/auth/register", json={"email": email, "password": "SuperSecret123"})
+    with client.application.app_context():
+        u = User.query.filter_by(email=email).first()
+        u.role = "admin"
+        db.session.commit()
+
+
+def test_auth_events_recorded_and_queryable(client):
+    _register_admin(client, "audit-admin@example.com")
+    client.post("/api/v1/auth/register", json={"email": "audit-user@example.com", "password": "SuperSecret123"})
+
+    r = client.post("/api/v1/auth/login", json={"email": "audit-user@example.com", "password": "WrongPassword1"})
+    assert r.status_code == 401
+    toks = client.post("/api/v1/auth/login",
+                       json={"email": "audit-user@example.com", "password": "SuperSecret123"}).get_json()
+    client.post("/api/v1/auth/refresh", headers={"Authorization": f"Bearer {toks['refresh_token']}"})
+    client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {toks['access_token']}"})
+
+    admin = client.post("/api/v1/auth/login",
+                        json={"email": "audit-admin@example.com", "password": "SuperSecret123"}).get_json()
+    auth = {"Authorization": f"Bearer {admin['access_token']}"}
+
+    r = client.get("/api/v1/audit/events?email=audit-user@example.com", headers=auth)
+    assert r.status_code == 200
+    events = r.get_json()["data"]
+    assert [e["event"] for e in events] == ["login", "login_failed"]
+    assert events[1]["reason"] == "invalid_credentials"
+    user_id = events[0]["user_id"]
+
+    # refresh/logout rattachés au user; pagination keyset 1 par 1
+    r = client.get(f"/api/v1/audit/events?user_id={user_id}&per_page=1", headers=auth)
+    page1 = r.get_json()
+    assert page1["data"][0]["event"] == "logout"
+    r = client.get(f"/api/v1/audit/events?user_id={user_id}&per_page=1&cursor={page1['meta']['next_cursor']}",
+                   headers=auth)
+    assert r.get_json()["data"][0]["event"] == "refresh"
+
+    # Curseur forgé (id non entier): 400, pas 500
+    from app.common.utils import encode_cursor
+    for bad in (["2026-01-01T00:00:00+00:00", "1 OR 1=1"], ["2026-01-01T00:00:00+00:00", True], [1, 2]):
+        r = client.get(f"/api/v1/audit/events?cursor={encode_cursor(bad)}", headers=auth)
+        assert r.status_code == 400 and r.get_json()["error"]["code"] == "validation_error"
+
+    # non-admin (access token valide) -> 403; refresh token -> refusé aussi
+    user = client.post("/api/v1/auth/login",
+                       json={"email": "audit-user@example.com", "password": "SuperSecret123"}).get_json()
+    r = client.get("/api/v1/audit/events", headers={"Authorization": f"Bearer {user['access_token']}"})
+    assert r.status_code == 403 and r.get_json()["error"]["code"] == "forbidden"
+    assert client.get("/api/v1/audit/events",
+                      headers={"Authorization": f"Bearer {toks['refresh_token']}"}).status_code == 422
+
+
+def test_writer_flushes_batches_on_close(app):
+    from datetime import datetime, timezone
+    from app.extensions import db
+    from app.audit.models import AuthEvent
+
+    writer = AuditWriter(app)
+    writer.mode, writer.flush_interval = "async", 60
+    for i in range(3):
+        writer.record({"occurred_at": datetime.now(timezone.utc), "event": "login_failed",
+                       "email": f"batch{i}@example.com", "reason": "invalid_credentials"})
+    writer.close()
+    with app.app_context():
+        assert AuthEvent.query.filter(AuthEvent.email.like("batch%")).count() == 3
+
+
+def test_writer_cuts_long_values_and_drops_only_bad_rows(app, client):
+    from datetime import datetime, timezone
+    from app.audit.models import AuthEvent
+
+    long_email = "x" * 400 + "@example.com"
+    r = client.post("/api/v1/auth/login", json={"email": long_email, "password": "whatever"})
+    assert r.status_code == 400
+    now = datetime.now(timezone.utc)
+    writer = AuditWriter(app)
+    writer.write([
+        {"occurred_at": now, "event": "login_failed", "email": "cut-" + long_email, "reason": "r" * 100},
+        {"occurred_at": now, "event": None, "email": "cut-bad@example.com"},  # NOT NULL: rejetée seule
+        {"occurred_at": now, "event": "login_failed", "email": "cut-ok@example.com"},
+    ])
+    with app.app_context():
+        rows = AuthEvent.query.filter(AuthEvent.email.like("cut-%")).all()
+        assert sorted(len(e.email) for e in rows) == [len("cut-ok@example.com"), 320]
+        assert max(len(e.reason or "") for e in rows) == 64
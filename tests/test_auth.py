@@ -35,3 +35,137 @@ def test_register_login_me_refresh_logout(client):
     assert r.status_code == 401
     err = r.get_json()["error"]["code"]
     assert err in ("token_revoked", "authorization_required")  # selon ordre des callbacks
+
+
+def test_asymmetric_signing_and_jwks(app, tmp_path, monkeypatch):
+    import jwt as pyjwt
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from app.config import TestConfig
+    from app.extensions import db
+
+    # Clé active Ed25519 (privée) + ancienne clé RSA publiée en vérification seule
+    (tmp_path / "2026-10.pem").write_bytes(ed25519.Ed25519PrivateKey.generate().private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    (tmp_path / "2026-01.pem").write_bytes(rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        .public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo))
+    monkeypatch.setattr(TestConfig, "JWT_KEYS_DIR", str(tmp_path))
+    signed_app = create_app()
+    with signed_app.app_context():
+        db.create_all()
+    client = signed_app.test_client()
+
+    r = client.post("/api/v1/auth/register", json={"email": "jwks@example.com", "password": "SuperSecret123"})
+    access = r.get_json()["access_token"]
+    header = pyjwt.get_unverified_header(access)
+    assert header == {"alg": "EdDSA", "kid": "2026-10", "typ": "JWT"}
+    assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {access}"}).status_code == 200
+
+    # JWKS cacheable; vérification locale comme le ferait un autre service
+    r = client.get("/.well-known/jwks.json")
+    assert r.status_code == 200 and "max-age=" in r.headers["Cache-Control"]
+    keys = {k["kid"]: k for k in r.get_json()["keys"]}
+    assert set(keys) == {"2026-10", "2026-01"} and keys["2026-01"]["kty"] == "RSA"
+    claims = pyjwt.decode(access, pyjwt.PyJWK(keys[header["kid"]]).key, algorithms=["EdDSA"])
+    assert claims["type"] == "access"
+    assert client.get("/.well-known/jwks.json", headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+    # Transition: un token HS256 (sans kid) émis avant la bascule reste valable
+    with app.app_context():
+        legacy = create_access_token(identity=claims["sub"])
+    assert "kid" not in pyjwt.get_unverified_header(legacy)
+    assert client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {legacy}"}).status_code == 200
+
+    # kid inconnu -> token invalide
+    forged = pyjwt.encode({"sub": claims["sub"], "type": "access", "jti": "x"},
+                          ed25519.Ed25519PrivateKey.generate(), algorithm="EdDSA", headers={"kid": "nope"})
+    r = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {forged}"})
+    assert r.status_code == 422 and r.get_json()["error"]["code"] == "token_invalid"
+
+
+def test_introspect_single_and_batch(client):
+    r = client.post("/api/v1/auth/register", json={"email": "intro@example.com", "password": "SuperSecret123"})
+    toks = r.get_json()
+    access, refresh = toks["access_token"], toks["refresh_token"]
+    key = {"X-Introspection-Key": "test-introspection-key"}
+
+    # Appelant non authentifié
+    assert client.post("/api/v1/auth/introspect", json={"token": access}).status_code == 401
+    assert client.post("/api/v1/auth/introspect", json={"token": access},
+                       headers={"X-Introspection-Key": "wrong"}).status_code == 401
+
+    # Single (JSON et form RFC 7662)
+    r = client.post("/api/v1/auth/introspect", json={"token": access}, headers=key)
+    assert r.status_code == 200 and r.headers["Cache-Control"] == "no-store"
+    body = r.get_json()
+    assert body["active"] is True and body["token_type"] == "access" and body["role"] == "user"
+    assert {"sub", "jti", "exp", "iat"} <= set(body)
+    r = client.post("/api/v1/auth/introspect", data={"token": refresh}, headers=key)
+    assert r.get_json()["token_type"] == "refresh"
+
+    # Batch: ordre conservé, révoqués et invalides -> inactive
+    client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {access}"})
+    r = client.post("/api/v1/auth/introspect", json={"tokens": [refresh, access, "not-a-jwt"]}, headers=key)
+    results = r.get_json()["results"]
+    assert [x["active"] for x in results] == [True, False, False]
+    assert results[1] == {"active": False}
+
+    # Ni token ni tokens -> 400
+    r = client.post("/api/v1/auth/introspect", json={}, headers=key)
+    assert r.status_code == 400
+
+
+def test_breached_passwords_rejected_offline(app, client, tmp_path, monkeypatch):
+    import hashlib
+    import os
+    from app.auth.breached import BreachedPasswords
+    from app.auth.schemas import PasswordResetConfirmSchema
+
+    leaked = ["password123", "Summer2024!", "correcthorsebattery"]
+    lines = {hashlib.sha1(p.encode()).hexdigest().upper(): 100 for p in leaked}
+    lines[hashlib.sha1(b"RarelySeen42").hexdigest().upper()] = 1
+    lines.update({os.urandom(20).hex().upper(): 3 for _ in range(2000)})
+    source = tmp_path / "pwned.txt"
+    source.write_text("".join(f"{h}:{c}\r\n" for h, c in sorted(lines.items())))
+
+    out = str(tmp_path / "breached.bin")
+    r = app.test_cli_runner().invoke(args=["auth", "import-breached", str(source), "--out", out,
+                                           "--prefix-bytes", "8", "--min-count", "2"])
+    assert r.exit_code == 0, r.output
+    assert os.path.exists(out + ".bloom")
+    checker = BreachedPasswords(out, out + ".bloom")
+    assert checker.count == 2003 and checker.record_size == 8
+    assert all(checker.is_breached(p) for p in leaked)
+    assert not checker.is_breached("RarelySeen42")  # sous --min-count
+    assert not checker.is_breached("SuperSecret123")
+    monkeypatch.setitem(app.extensions, "breached_passwords", checker)
+
+    r = client.post("/api/v1/auth/register", json={"email": "leak@example.com", "password": "password123"})
+    assert r.status_code == 400
+    err = r.get_json()["error"]
+    assert err["code"] == "validation_error" and "breach" in err["details"]["password"][0]
+    r = client.post("/api/v1/auth/register", json={"email": "leak@example.com", "password": "SuperSecret123"})
+    assert r.status_code == 201
+    # Même règle pour tout nouveau mot de passe (reset, import...)
+    with app.app_context():
+        errors = PasswordResetConfirmSchema().validate({"token": "t", "password": "Summer2024!"})
+    assert "password" in errors
+
+    # Bloom d'un autre import: ignoré (faux négatifs sinon); --no-bloom supprime l'ancien
+    import shutil
+    shutil.copy(out + ".bloom", str(tmp_path / "old.bloom"))
+    assert app.test_cli_runner().invoke(args=["auth", "import-breached", str(source), "--out", out]).exit_code == 0
+    stale = BreachedPasswords(out, str(tmp_path / "old.bloom"))
+    assert stale._bloom is None and stale.is_breached("RarelySeen42")
+    assert BreachedPasswords(out, out + ".bloom")._bloom is not None
+    assert app.test_cli_runner().invoke(args=["auth", "import-breached", str(source), "--out", out,
+                                              "--no-bloom"]).exit_code == 0
+    assert not os.path.exists(out + ".bloom")
+
+    # Entrée non triée: refusée, rien n'est remplacé
+    source.write_text("".join(f"{h}:5\n" for h in sorted(lines, reverse=True)))
+    r = app.test_cli_runner().invoke(args=["auth", "import-breached", str(source), "--out", out])
+    assert r.exit_code != 0 and "not sorted" in r.output
+    assert BreachedPasswords(out).count == 2004 and not os.path.exists(out + ".tmp")
@@ -0,0 +1,137 @@
+# tests/test_events.py
+# Flux SSE servi par l'app ASGI; écritures faites par l'app Flask (thread) -> broker memory://
+import asyncio
+import json
+
+import pytest
+
+
+def _parse(text: str) -> list[dict]:
+    events = []
+    for block in text.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            key, _, value = line.partition(": ")
+            fields[key] = value
+        if "data" in fields:
+            events.append({"id": fields["id"], "event": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+class _Stream:
+    def __init__(self, asgi, token, last_event_id=None):
+        headers = [(b"authorization", f"Bearer {token}".encode())]
+        if last_event_id:
+            headers.append((b"last-event-id", last_event_id.encode()))
+        self.scope = {"type": "http", "method": "GET", "path": "/api/v1/notes/events", "query_string": b"",
+                      "headers": headers, "scheme": "http", "client": ("127.0.0.1", 1), "server": ("test", 80)}
+        self.asgi = asgi
+        self.status = None
+        self.text = ""
+        self._chunk = asyncio.Event()
+        self._gone = asyncio.Event()
+
+    async def _receive(self):
+        await self._gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        else:
+            self.text += message.get("body", b"").decode()
+            self._chunk.set()
+
+    def open(self):
+        self.task = asyncio.ensure_future(self.asgi(self.scope, self._receive, self._send))
+
+    async def wait_for(self, predicate, timeout=5):
+        async def loop():
+            while not predicate(self.text):
+                self._chunk.clear()
+                await self._chunk.wait()
+        await asyncio.wait_for(loop(), timeout)
+
+    async def close(self):
+        self._gone.set()
+        await asyncio.wait_for(self.task, 5)
+
+
+def test_note_events_stream_and_resume(app, client, monkeypatch):
+    from app.asgi.app import AsgiApp
+    from app.extensions import db
+
+    # La config peut différer de l'engine réellement créé (conftest): on suit l'engine
+    with app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        pytest.skip("l'engine async de l'app ASGI ne voit pas la base SQLite en mémoire")
+    monkeypatch.setitem(app.config, "ASYNC_DATABASE_URL", url.render_as_string(hide_password=False))
+
+    r = client.post("/api/v1/auth/register", json={"email": "sse@example.com", "password": "SuperSecret123"})
+    token = r.get_json()["access_token"]
+    h = {"Authorization": f"Bearer {token}"}
+    app.config["NOTES_EVENTS_HEARTBEAT_SECONDS"] = 0.2
+    asgi = AsgiApp(app)
+
+    async def scenario():
+        stream = _Stream(asgi, token)
+        stream.open()
+        await stream.wait_for(lambda t: "retry:" in t)
+        assert stream.status == 200
+
+        a = (await asyncio.to_thread(client.post, "/api/v1/notes/", headers=h,
+                                     json={"title": "A", "content": "a"})).get_json()["id"]
+        await stream.wait_for(lambda t: len(_parse(t)) == 1)
+        resume_from = _parse(stream.text)[0]["id"]
+        b = (await asyncio.to_thread(client.post, "/api/v1/notes/", headers=h,
+                                     json={"title": "B", "content": "b"})).get_json()["id"]
+        await asyncio.to_thread(client.patch, f"/api/v1/notes/{a}", headers=h, json={"title": "A2"})
+        await asyncio.to_thread(client.delete, f"/api/v1/notes/{b}", headers=h)
+        await stream.wait_for(lambda t: len(_parse(t)) == 4 and ": ping" in t)
+        await stream.close()
+
+        events = _parse(stream.text)
+        assert [(e["data"]["op"], e["data"]["id"]) for e in events] == [
+            ("create", a), ("create", b), ("update", a), ("delete", b)]
+        assert events[2]["data"]["note"]["title"] == "A2" and events[3]["data"]["note"] is None
+        seqs = [e["data"]["seq"] for e in events]
+        assert seqs == sorted(seqs)
+
+        # Reprise: ce qui a changé après le 1er événement, relu dans note_changes
+        resumed = _Stream(asgi, token, last_event_id=resume_from)
+        resumed.open()
+        await resumed.wait_for(lambda t: len(_parse(t)) == 2)
+        await resumed.close()
+        replayed = _parse(resumed.text)
+        assert {(e["data"]["op"], e["data"]["id"]) for e in replayed} == {("upsert", a), ("delete", b)}
+        assert replayed[-1]["id"] == events[-1]["id"]
+
+        # Sans jeton: refus avant tout flux
+        anonymous = _Stream(asgi, "bogus")
+        anonymous.scope["headers"] = []
+        anonymous.open()
+        await asyncio.wait_for(anonymous.task, 5)
+        assert anonymous.status == 401
+        await asgi.engine.dispose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        app.config["NOTES_EVENTS_HEARTBEAT_SECONDS"] = 15
+
+
+def test_memory_broker_overflow_requests_resync():
+    from app.notes.events import MemoryBroker, RESYNC
+
+    async def scenario():
+        broker = MemoryBroker(queue_size=2)
+        async with broker.subscribe("u1") as queue:
+            for i in range(3):
+                broker.publish("u1", str(i))
+            broker.publish("u2", "ignored")
+            await asyncio.sleep(0)  # livraison via call_soon_threadsafe
+            assert queue.get_nowait() is RESYNC and queue.empty()
+        assert not broker._fanout.has("u1")
+
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+# tests/test_health.py
+
+
+def test_readiness_gated_until_probes_ran(app, client):
+    monitor = app.extensions["health"]
+    monitor.warm, monitor.results = False, {}
+
+    assert client.get("/livez").status_code == 200
+    r = client.get("/readyz")
+    assert r.status_code == 503
+    assert r.get_json()["status"] == "unavailable"
+
+    monitor.run_once()
+    r = client.get("/readyz")
+    assert r.status_code == 200
+    assert r.get_json()["checks"]["db"]["ok"] is True
+    assert client.get("/healthz").get_json()["db"] == "up"
+
+    # probe en échec -> plus prêt, mais toujours vivant
+    monitor.results["db"] = {**monitor.results["db"], "ok": False, "error": "down"}
+    assert client.get("/readyz").status_code == 503
+    assert client.get("/livez").status_code == 200
@@ -0,0 +1,130 @@
+# tests/test_jobs.py
+import re
+from datetime import datetime, timedelta, timezone
+
+
+def _last_token(app, subject: str) -> str:
+    mails = [m for m in app.extensions["mailer"].outbox if m["Subject"] == subject]
+    return re.search(r"token=([^\s]+)", mails[-1].get_content()).group(1).replace("%3A", ":")
+
+
+def test_email_verification_and_password_reset(client, app):
+    r = client.post("/api/v1/auth/register", json={"email": "jobs@example.com", "password": "SuperSecret123"})
+    headers = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    refresh = {"Authorization": f"Bearer {r.get_json()['refresh_token']}"}
+    assert client.get("/api/v1/auth/me", headers=headers).get_json()["email_verified_at"] is None
+
+    # register a empilé le mail de vérification (exécuté tout de suite en JOBS_EAGER)
+    token = _last_token(app, "Confirm your email address")
+    r = client.post("/api/v1/auth/verify-email/confirm", json={"token": token})
+    assert r.status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).get_json()["email_verified_at"]
+    assert client.post("/api/v1/auth/verify-email/confirm", json={"token": "x" + token}).status_code == 400
+
+    # Reset: 202 même pour un email inconnu (aucun mail envoyé)
+    sent = len(app.extensions["mailer"].outbox)
+    assert client.post("/api/v1/auth/password-reset", json={"email": "nobody@example.com"}).status_code == 202
+    assert len(app.extensions["mailer"].outbox) == sent
+    assert client.post("/api/v1/auth/password-reset", json={"email": " Jobs@Example.com"}).status_code == 202
+    token = _last_token(app, "Reset your password")
+    body = {"token": token, "password": "BrandNewSecret456"}
+    assert client.post("/api/v1/auth/password-reset/confirm", json=body).status_code == 200
+    # Sessions ouvertes avant le reset: révoquées (access et refresh)
+    assert client.get("/api/v1/auth/me", headers=headers).get_json()["error"]["code"] == "token_revoked"
+    assert client.post("/api/v1/auth/refresh", headers=refresh).status_code == 401
+    # Lien à usage unique: le hash a changé
+    r = client.post("/api/v1/auth/password-reset/confirm", json=body)
+    assert r.status_code == 400 and r.get_json()["error"]["code"] == "token_invalid"
+    r = client.post("/api/v1/auth/login", json={"email": "jobs@example.com", "password": "BrandNewSecret456"})
+    assert r.status_code == 200
+    fresh = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    assert client.get("/api/v1/auth/me", headers=fresh).status_code == 200
+    r = client.post("/api/v1/auth/introspect", json={"tokens": [headers["Authorization"][7:], fresh["Authorization"][7:]]},
+                    headers={"X-Introspection-Key": "test-introspection-key"})
+    assert [t["active"] for t in r.get_json()["results"]] == [False, True]
+
+    # Compte supprimé (suppression logique): ni mail de reset, ni lien encore valide
+    assert client.post("/api/v1/auth/password-reset", json={"email": "jobs@example.com"}).status_code == 202
+    token = _last_token(app, "Reset your password")
+    from app.extensions import db
+    from app.users.models import User
+    with app.app_context():
+        User.query.filter_by(email="jobs@example.com").one().deleted_at = datetime.now(timezone.utc)
+        db.session.commit()
+    sent = len(app.extensions["mailer"].outbox)
+    assert client.post("/api/v1/auth/password-reset", json={"email": "jobs@example.com"}).status_code == 202
+    assert len(app.extensions["mailer"].outbox) == sent
+    r = client.post("/api/v1/auth/password-reset/confirm", json={"token": token, "password": "AnotherSecret789"})
+    assert r.status_code == 400 and r.get_json()["error"]["code"] == "token_invalid"
+
+
+def test_worker_retries_with_backoff_and_prunes_blocklist(app):
+    from app.extensions import db
+    from app.auth.models import TokenBlocklist
+    from app.jobs.queue import JOBS, JobQueue, job
+    from app.jobs.worker import Worker
+
+    calls = []
+
+    @job("test.flaky", max_attempts=3)
+    def flaky(n):
+        calls.append(n)
+        if len(calls) < 2:
+            raise RuntimeError("boom")
+
+    @job("test.broken", max_attempts=2)
+    def broken():
+        raise RuntimeError("always")
+
+    try:
+        app.config.update(JOBS_EAGER=False, JOBS_BACKOFF_BASE=0.01, JOBS_BACKOFF_MAX=0.01)
+        jobs = JobQueue(app)
+        jobs._pid = __import__("os").getpid()  # pas de thread: on pilote le worker à la main
+        worker = Worker(app, jobs)
+        jobs.enqueue("test.flaky", n=7)
+        jobs.enqueue("test.broken")
+        for _ in range(20):
+            worker.run_once(timeout=0.05)
+        assert calls == [7, 7]  # échec puis succès au 2e essai
+        dead = list(jobs.backend.dead_jobs)
+        assert [d["name"] for d in dead] == ["test.broken"] and dead[0]["attempts"] == 2
+        assert "RuntimeError: always" in dead[0]["last_error"]
+    finally:
+        app.config.update(JOBS_EAGER=True, JOBS_BACKOFF_BASE=5, JOBS_BACKOFF_MAX=600)
+        JOBS.pop("test.flaky", None)
+        JOBS.pop("test.broken", None)
+
+    with app.app_context():
+        old = datetime.now(timezone.utc) - timedelta(days=30)
+        db.session.add_all([TokenBlocklist(jti="old-jti", token_type="refresh", revoked_at=old),
+                            TokenBlocklist(jti="new-jti", token_type="access")])
+        db.session.commit()
+        app.extensions["jobs"].enqueue("auth.prune_blocklist")
+        assert not TokenBlocklist.is_revoked("old-jti") and TokenBlocklist.is_revoked("new-jti")
+
+
+def test_console_mailer_never_logs_the_body_and_is_refused_in_production(caplog):
+    import logging
+    from email.message import EmailMessage
+    import pytest
+    from flask import Flask
+    from app.common.mailer import ConsoleMailer, init_mailer
+    from app.config import ProdConfig
+
+    msg = EmailMessage()
+    msg["To"], msg["Subject"] = "a@example.com", "Reset your password"
+    msg.set_content("https://app/reset?token=secret-token")
+    with caplog.at_level(logging.INFO, logger="app.mail"):
+        ConsoleMailer().send(msg)
+    record = caplog.records[-1]
+    assert record.to == "a@example.com" and not hasattr(record, "body")
+    assert "secret-token" not in caplog.text
+
+    prod = Flask(__name__)
+    prod.config.from_object(ProdConfig)
+    for backend in (None, "console"):
+        prod.config["MAIL_BACKEND"] = backend
+        with pytest.raises(RuntimeError):
+            init_mailer(prod)
+    prod.config["MAIL_BACKEND"] = "smtp"
+    init_mailer(prod)
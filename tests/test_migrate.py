@@ -0,0 +1,61 @@
+# tests/test_migrate.py
+# docker/migrate.py (hors paquet app): à jour, en retard, en avance sur les scripts.
+import importlib.util
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture()
+def migrate(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("docker_migrate", os.path.join(ROOT, "docker", "migrate.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "MIGRATIONS_DIR", os.path.join(ROOT, "migrations"))
+    url = f"sqlite:///{tmp_path / 'migrate.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    upgrades = []
+    monkeypatch.setattr(module, "run_upgrade", lambda: upgrades.append(True))
+
+    def at(*revisions):
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            conn.execute(text("DELETE FROM alembic_version"))
+            for rev in revisions:
+                conn.execute(text("INSERT INTO alembic_version VALUES (:r)"), {"r": rev})
+        engine.dispose()
+
+    module.upgrades, module.at = upgrades, at
+    return module
+
+
+def test_migrate_up_to_date_behind_and_ahead(migrate, capsys):
+    script = migrate.ScriptDirectory(migrate.MIGRATIONS_DIR)
+    heads = script.get_heads()
+    previous = script.get_revision(heads[0]).down_revision
+    assert isinstance(previous, str)
+
+    # À jour: rien à faire
+    migrate.at(*heads)
+    assert migrate.main() == 0 and migrate.upgrades == []
+    assert "already at head" in capsys.readouterr().out
+
+    # En retard (et base vide): upgrade
+    for revisions in ((previous,), ()):
+        migrate.at(*revisions)
+        assert migrate.main() == 0
+    assert migrate.upgrades == [True, True]
+
+    # En avance: révision inconnue des scripts -> sortie non nulle, pas d'upgrade
+    migrate.at("f00dcafe1234")
+    with pytest.raises(SystemExit) as excinfo:
+        migrate.main()
+    assert "f00dcafe1234" in str(excinfo.value.code) and "ahead" in str(excinfo.value.code)
+    migrate.at(heads[0], "f00dcafe1234")
+    with pytest.raises(SystemExit):
+        migrate.main()
+    assert migrate.upgrades == [True, True]
@@ -26,6 +26,13 @@ def test_notes_crud_and_acl(client):
     assert r.status_code == 201
     note_id = r.get_json()["id"]
 
+    # Carol liste ses notes (count + page)
+    r = client.get("/api/v1/notes/", headers={"Authorization": f"Bearer {access_carol}"})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["meta"]["total"] == 1
+    assert [n["id"] for n in body["data"]] == [note_id]
+
     # Carol voit sa note
     r = client.get(f"/api/v1/notes/{note_id}", headers={"Authorization": f"Bearer {access_carol}"})
     assert r.status_code == 200
@@ -54,3 +61,272 @@ def test_notes_crud_and_acl(client):
     # re-get -> 404
     r = client.get(f"/api/v1/notes/{note_id}", headers={"Authorization": f"Bearer {access_carol}"})
     assert r.status_code == 404
+
+def test_notes_summary_view_and_fields(client):
+    r = client.post("/api/v1/auth/register", json={"email": "gina@example.com", "password": "SuperSecret123"})
+    headers = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    content = "word " * 100
+    client.post("/api/v1/notes/", headers=headers, json={"title": "Long", "content": content})
+
+    r = client.get("/api/v1/notes/?view=summary", headers=headers)
+    assert r.status_code == 200
+    item = r.get_json()["data"][0]
+    assert "content" not in item
+    assert item["content_length"] == len(content)
+    assert item["excerpt"].endswith("…") and len(item["excerpt"]) == 200
+
+    r = client.get("/api/v1/notes/?fields=title,content_length", headers=headers)
+    assert set(r.get_json()["data"][0]) == {"id", "title", "content_length"}
+
+    assert client.get("/api/v1/notes/?fields=password_hash", headers=headers).status_code == 400
+
+def test_large_list_is_compressed(client):
+    import gzip
+    r = client.post("/api/v1/auth/register", json={"email": "hugo@example.com", "password": "SuperSecret123"})
+    headers = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    for i in range(5):
+        client.post("/api/v1/notes/", headers=headers, json={"title": f"N{i}", "content": "lorem ipsum " * 50})
+
+    r = client.get("/api/v1/notes/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["Vary"]
+    assert r.headers["X-Request-Id"]  # hooks existants toujours appliqués
+    import json
+    assert len(json.loads(gzip.decompress(r.data))["data"]) == 5
+
+    r = client.get("/api/v1/notes/", headers=headers)
+    assert "Content-Encoding" not in r.headers
+
+
+def test_streamed_compression_flushes_each_chunk(app):
+    import zlib
+    from app.common.compression import AVAILABLE_ENCODINGS, compress_stream, skip_compression
+
+    # Chaque morceau émis se décode seul: le client le lit sans attendre la fin du flux
+    chunks = [f"data: {i}\n\n".encode() for i in range(3)]
+    d = zlib.decompressobj(31)
+    for chunk, out in zip(chunks, compress_stream(iter(chunks), "gzip", app.config)):
+        assert d.decompress(out) == chunk
+    for encoding in AVAILABLE_ENCODINGS:  # br/zstd si installés
+        assert len(list(compress_stream(iter(chunks), encoding, app.config))) >= len(chunks)
+
+    # Politique partagée Flask / ASGI
+    json_headers = {"Content-Type": "application/json"}
+    assert not skip_compression(200, json_headers, "application/json", app.config)
+    for status in (204, 206, 304):
+        assert skip_compression(status, json_headers, "application/json", app.config)
+    assert skip_compression(200, {"Content-Encoding": "gzip"}, "application/json", app.config)
+    assert skip_compression(200, {"Cache-Control": "no-transform"}, "application/json", app.config)
+
+
+def test_notes_changes_delta_sync(client):
+    r = client.post("/api/v1/auth/register", json={"email": "ivy@example.com", "password": "SuperSecret123"})
+    headers = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    ids = [client.post("/api/v1/notes/", headers=headers, json={"title": f"S{i}", "content": "c"}).get_json()["id"]
+           for i in range(3)]
+
+    # sync initial, 2 par 2
+    r = client.get("/api/v1/notes/changes?limit=2", headers=headers).get_json()
+    assert [c["id"] for c in r["data"]] == ids[:2] and r["meta"]["has_more"] is True
+    r = client.get(f"/api/v1/notes/changes?since={r['meta']['next_cursor']}", headers=headers).get_json()
+    assert [c["id"] for c in r["data"]] == ids[2:] and r["meta"]["has_more"] is False
+    cursor = r["meta"]["next_cursor"]
+
+    # rien de neuf -> vide, même curseur
+    r = client.get(f"/api/v1/notes/changes?since={cursor}", headers=headers).get_json()
+    assert r["data"] == [] and r["meta"]["next_cursor"] == cursor
+
+    # update + delete -> seulement ces deux notes, tombstone pour la suppression
+    client.patch(f"/api/v1/notes/{ids[0]}", headers=headers, json={"title": "S0 bis"})
+    client.delete(f"/api/v1/notes/{ids[1]}", headers=headers)
+    r = client.get(f"/api/v1/notes/changes?since={cursor}", headers=headers).get_json()
+    assert [(c["id"], c["op"]) for c in r["data"]] == [(ids[0], "upsert"), (ids[1], "delete")]
+    assert r["data"][0]["note"]["title"] == "S0 bis" and r["data"][1]["note"] is None
+
+    assert client.get("/api/v1/notes/changes?since=bogus", headers=headers).status_code == 400
+
+
+def test_idempotency_key_replays_create_and_register(client, app, monkeypatch):
+    import threading, time
+    from app.auth import routes as auth_routes
+    from app.common.idempotency import MemoryIdempotencyStore
+
+    body = {"email": "idem@example.com", "password": "SuperSecret123"}
+    r1 = client.post("/api/v1/auth/register", json=body, headers={"Idempotency-Key": "reg-1"})
+    assert r1.status_code == 201
+    # Les tokens ne sont pas stockés: statut + hash du corps seulement
+    stored = repr(app.extensions["idempotency"]._records)
+    assert r1.get_json()["access_token"] not in stored and r1.get_json()["refresh_token"] not in stored
+    # Retry: ni bcrypt ni INSERT, 409 explicite (pas "email pris") au lieu de rejouer les tokens
+    monkeypatch.setattr(auth_routes.User, "set_password", lambda *a: (_ for _ in ()).throw(AssertionError))
+    r2 = client.post("/api/v1/auth/register", json=body, headers={"Idempotency-Key": "reg-1"})
+    assert r2.status_code == 409
+    assert r2.get_json()["error"] == {"code": "idempotency_replay_unavailable", "details": {"status": 201},
+                                      "message": r2.get_json()["error"]["message"]}
+    monkeypatch.undo()
+
+    headers = {"Authorization": f"Bearer {r1.get_json()['access_token']}", "Idempotency-Key": "note-1"}
+    note = {"title": "Once", "content": "c"}
+    a = client.post("/api/v1/notes/", headers=headers, json=note)
+    b = client.post("/api/v1/notes/", headers=headers, json=note)
+    assert a.status_code == b.status_code == 201 and a.get_json()["id"] == b.get_json()["id"]
+    listing = client.get("/api/v1/notes/", headers={"Authorization": headers["Authorization"]}).get_json()
+    assert listing["meta"]["total"] == 1
+
+    # Même clé, autre corps -> 422; pas de clé -> comportement normal
+    r = client.post("/api/v1/notes/", headers=headers, json={"title": "Other", "content": "c"})
+    assert r.status_code == 422 and r.get_json()["error"]["code"] == "idempotency_key_reused"
+    r = client.post("/api/v1/notes/", headers={"Authorization": headers["Authorization"]}, json=note)
+    assert r.status_code == 201 and r.get_json()["id"] != a.get_json()["id"]
+
+    # Doublon concurrent: attend la requête en cours puis reçoit son résultat
+    store = MemoryIdempotencyStore()
+    assert store.claim("k", {"state": "pending", "fp": "x"}, 5)
+    assert not store.claim("k", {"state": "pending", "fp": "x"}, 5)
+    done = {"state": "done", "fp": "x", "status": 201, "headers": [], "body": ""}
+    threading.Timer(0.05, store.complete, ("k", done, 60)).start()
+    t0 = time.monotonic()
+    assert store.wait("k", 2) == done and time.monotonic() - t0 < 1
+
+
+def test_read_cache_versioned_by_owner(client):
+    users = {}
+    for e in ("kim@example.com", "lee@example.com"):
+        r = client.post("/api/v1/auth/register", json={"email": e, "password": "SuperSecret123"})
+        users[e] = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    kim, lee = users["kim@example.com"], users["lee@example.com"]
+    note_id = client.post("/api/v1/notes/", headers=kim, json={"title": "C1", "content": "v1"}).get_json()["id"]
+
+    # get: MISS puis HIT, même corps
+    a = client.get(f"/api/v1/notes/{note_id}", headers=kim)
+    b = client.get(f"/api/v1/notes/{note_id}", headers=kim)
+    assert (a.headers["X-Cache"], b.headers["X-Cache"]) == ("MISS", "HIT") and a.get_json() == b.get_json()
+    # Un autre user ne lit jamais l'entrée de kim
+    assert client.get(f"/api/v1/notes/{note_id}", headers=lee).status_code == 403
+
+    # 1re page de liste: HIT, puis invalidée par une écriture de l'owner
+    assert client.get("/api/v1/notes/", headers=kim).headers["X-Cache"] == "MISS"
+    assert client.get("/api/v1/notes/", headers=kim).headers["X-Cache"] == "HIT"
+    client.patch(f"/api/v1/notes/{note_id}", headers=kim, json={"content": "v2"})
+    r = client.get(f"/api/v1/notes/{note_id}", headers=kim)
+    assert r.headers["X-Cache"] == "MISS" and r.get_json()["content"] == "v2"
+    client.post("/api/v1/notes/", headers=kim, json={"title": "C2", "content": "c"})
+    r = client.get("/api/v1/notes/", headers=kim)
+    assert r.headers["X-Cache"] == "MISS" and r.get_json()["meta"]["total"] == 2
+    # page 2: jamais en cache
+    assert "X-Cache" not in client.get("/api/v1/notes/?page=2", headers=kim).headers
+
+    client.delete(f"/api/v1/notes/{note_id}", headers=kim)
+    assert client.get(f"/api/v1/notes/{note_id}", headers=kim).status_code == 404
+
+    # Stats: admin seulement
+    assert client.get("/api/v1/notes/cache/stats", headers=kim).status_code == 403
+    stats = client.application.extensions["notes_cache"].stats()
+    assert stats["note"]["hits"] >= 1 and 0 < stats["list"]["hit_rate"] < 1
+
+
+def test_note_stats_counters_and_rebuild(client):
+    r = client.post("/api/v1/auth/register", json={"email": "stat@example.com", "password": "SuperSecret123"})
+    h = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    assert client.get("/api/v1/notes/stats", headers=h).get_json()["data"]["note_count"] == 0
+
+    a = client.post("/api/v1/notes/", headers=h, json={"title": "A", "content": "héllo"}).get_json()["id"]
+    client.post("/api/v1/notes/", headers=h, json={"title": "B", "content": "abc"})
+    client.patch(f"/api/v1/notes/{a}", headers=h, json={"content": "hé"})   # 6 -> 3 octets
+    client.patch(f"/api/v1/notes/{a}", headers=h, json={"title": "A2"})     # pas de delta
+    stats = client.get("/api/v1/notes/stats", headers=h).get_json()["data"]
+    assert (stats["note_count"], stats["content_bytes"]) == (2, 6) and stats["last_write_at"]
+    assert client.get("/api/v1/notes/?per_page=1", headers=h).get_json()["meta"]["total"] == 2
+
+    client.delete(f"/api/v1/notes/{a}", headers=h)
+    stats = client.get("/api/v1/notes/stats", headers=h).get_json()["data"]
+    assert (stats["note_count"], stats["content_bytes"]) == (1, 3)
+
+    # Dérive simulée puis recalcul depuis notes
+    from app.extensions import db
+    from app.notes.models import NoteStats
+    with client.application.app_context():
+        db.session.query(NoteStats).update({"note_count": 42})
+        db.session.commit()
+    result = client.application.test_cli_runner().invoke(args=["notes", "rebuild-stats"])
+    assert result.exit_code == 0, result.output
+    stats = client.get("/api/v1/notes/stats", headers=h).get_json()["data"]
+    assert (stats["note_count"], stats["content_bytes"]) == (1, 3)
+
+
+def test_note_sharing_acl_and_keyset_listing(client):
+    users = {}
+    for e in ("sha@example.com", "shb@example.com", "shc@example.com"):
+        r = client.post("/api/v1/auth/register", json={"email": e, "password": "SuperSecret123"})
+        users[e] = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    a, b, c = users["sha@example.com"], users["shb@example.com"], users["shc@example.com"]
+    shared = [client.post("/api/v1/notes/", headers=a, json={"title": f"A{i}", "content": "x"}).get_json()["id"]
+              for i in range(3)]
+    own = [client.post("/api/v1/notes/", headers=b, json={"title": f"B{i}", "content": "y"}).get_json()["id"]
+           for i in range(2)]
+
+    # Pas de partage: 403 (la note existe), 404 si absente
+    assert client.get(f"/api/v1/notes/{shared[0]}", headers=b).status_code == 403
+    assert client.get("/api/v1/notes/00000000-0000-0000-0000-000000000000", headers=b).status_code == 404
+
+    for note_id in shared[:2]:
+        r = client.post(f"/api/v1/notes/{note_id}/shares", headers=a, json={"email": "SHB@example.com"})
+        assert r.status_code == 201 and r.get_json()["permission"] == "read"
+    client.post(f"/api/v1/notes/{shared[2]}/shares", headers=a, json={"email": "shb@example.com", "permission": "write"})
+    assert client.post(f"/api/v1/notes/{shared[0]}/shares", headers=b, json={"email": "shc@example.com"}).status_code == 403
+    assert client.post(f"/api/v1/notes/{shared[0]}/shares", headers=a, json={"email": "sha@example.com"}).status_code == 400
+    assert client.post(f"/api/v1/notes/{shared[0]}/shares", headers=a, json={"email": "nobody@example.com"}).status_code == 404
+    assert len(client.get(f"/api/v1/notes/{shared[0]}/shares", headers=a).get_json()["data"]) == 1
+
+    # read: lecture oui, écriture non; write: écriture oui; suppression: owner seulement
+    # Note partagée: jamais mise en cache dans l'espace du destinataire
+    for _ in range(2):
+        r = client.get(f"/api/v1/notes/{shared[0]}", headers=b)
+        assert r.status_code == 200 and "X-Cache" not in r.headers
+    assert client.patch(f"/api/v1/notes/{shared[0]}", headers=b, json={"title": "no"}).status_code == 403
+    assert client.patch(f"/api/v1/notes/{shared[2]}", headers=b, json={"title": "A2 bis"}).status_code == 200
+    assert client.delete(f"/api/v1/notes/{shared[2]}", headers=b).status_code == 403
+    assert client.get(f"/api/v1/notes/{shared[2]}", headers=a).get_json()["title"] == "A2 bis"
+    assert client.get(f"/api/v1/notes/{shared[0]}", headers=c).status_code == 403
+
+    # scope=all: mes notes + partagées, created_at desc, pages keyset sans doublon
+    seen, cursor = [], None
+    while True:
+        url = "/api/v1/notes/?scope=all&per_page=2" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=b).get_json()
+        seen += body["data"]
+        cursor = body["meta"]["next_cursor"]
+        if not body["meta"]["has_more"]:
+            break
+    assert sorted(n["id"] for n in seen) == sorted(shared + own)
+    keys = [(n["created_at"], n["id"]) for n in seen]
+    assert keys == sorted(keys, reverse=True)
+    access = {n["id"]: n["access"] for n in seen}
+    assert [access[i] for i in shared] == ["read", "read", "write"] and access[own[0]] == "owner"
+
+    body = client.get("/api/v1/notes/?scope=shared&fields=title", headers=b).get_json()
+    assert sorted(n["id"] for n in body["data"]) == sorted(shared)
+    assert set(body["data"][0]) == {"id", "title", "access"}
+    assert client.get("/api/v1/notes/?scope=bogus", headers=b).status_code == 400
+    assert client.get("/api/v1/notes/?scope=all&cursor=bogus", headers=b).status_code == 400
+
+    # Révocation, puis suppression de la note: plus rien de partagé
+    assert client.delete(f"/api/v1/notes/{shared[0]}/shares/{body['data'][0]['id']}", headers=a).status_code == 404
+    grantee = client.get(f"/api/v1/notes/{shared[0]}/shares", headers=a).get_json()["data"][0]["grantee_id"]
+    assert client.delete(f"/api/v1/notes/{shared[0]}/shares/{grantee}", headers=a).status_code == 204
+    assert client.get(f"/api/v1/notes/{shared[0]}", headers=b).status_code == 403
+    client.delete(f"/api/v1/notes/{shared[1]}", headers=a)
+    body = client.get("/api/v1/notes/?scope=shared", headers=b).get_json()
+    assert [n["id"] for n in body["data"]] == [shared[2]]
+
+    # Propriétaire supprimé (avant la purge): ses partages ne donnent plus accès
+    from datetime import datetime, timezone
+    from app.extensions import db
+    from app.users.models import User
+    with client.application.app_context():
+        User.query.filter_by(email="sha@example.com").one().deleted_at = datetime.now(timezone.utc)
+        db.session.commit()
+    assert client.get("/api/v1/notes/?scope=shared", headers=b).get_json()["data"] == []
+    assert sorted(n["id"] for n in client.get("/api/v1/notes/?scope=all", headers=b).get_json()["data"]) == sorted(own)
+    assert client.get(f"/api/v1/notes/{shared[2]}", headers=b).status_code == 403
+    assert client.patch(f"/api/v1/notes/{shared[2]}", headers=b, json={"title": "late"}).status_code == 403
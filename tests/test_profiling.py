@@ -0,0 +1,94 @@
+# tests/test_profiling.py
+import marshal
+
+
+def test_profile_single_request_and_sampling(client, app):
+    from app.extensions import db
+    from app.users.models import User
+    for e in ("prof-admin@example.com", "prof-user@example.com"):
+        client.post("/api/v1/auth/register", json={"email": e, "password": "SuperSecret123"})
+    with app.app_context():
+        User.query.filter_by(email="prof-admin@example.com").first().role = "admin"
+        db.session.commit()
+    tokens = {}
+    for e in ("prof-admin@example.com", "prof-user@example.com"):
+        r = client.post("/api/v1/auth/login", json={"email": e, "password": "SuperSecret123"})
+        tokens[e] = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    admin, user = tokens["prof-admin@example.com"], tokens["prof-user@example.com"]
+
+    assert client.post("/api/v1/admin/profiling/token", headers=user, json={}).status_code == 403
+    r = client.post("/api/v1/admin/profiling/token", headers=admin, json={"ttl": 60})
+    assert r.status_code == 201 and r.get_json()["header"] == "X-Profile"
+    grant = r.get_json()["token"]
+
+    # Le jeton marche sur la requête d'un user quelconque (posé par la gateway / le client)
+    r = client.get("/api/v1/notes/", headers={**user, "X-Profile": grant})
+    assert r.status_code == 200
+    profile_id = r.headers["X-Profile-Id"]
+    # Profil en cours jusqu'à la fermeture du corps (faite par le serveur WSGI)
+    assert "X-Profile-Id" not in client.get("/api/v1/notes/", headers={**user, "X-Profile": grant}).headers
+    r.close()
+    r = client.get("/api/v1/notes/", headers={**user, "X-Profile": grant})
+    assert "X-Profile-Id" in r.headers
+    r.close()
+    assert "X-Profile-Id" not in client.get("/api/v1/notes/", headers={**user, "X-Profile": grant + "x"}).headers
+
+    listed = client.get("/api/v1/admin/profiling/profiles", headers=admin).get_json()["data"]
+    assert listed[1]["id"] == profile_id and listed[0]["path"] == "/api/v1/notes/"
+    text = client.get(f"/api/v1/admin/profiling/profiles/{profile_id}", headers=admin).get_data(as_text=True)
+    assert "list_notes" in text and "cumulative" in text
+    raw = client.get(f"/api/v1/admin/profiling/profiles/{profile_id}?format=pstats", headers=admin).get_data()
+    assert isinstance(marshal.loads(raw), dict)
+
+    # Échantillonnage: taux réglé à chaud, pile relevée sur le thread de la requête
+    r = client.put("/api/v1/admin/profiling/sampling", headers=admin, json={"rates": {"notes.list_notes": 1.0}})
+    assert r.status_code == 200
+    sampler = app.extensions["profiling"]["sampler"]
+    with app.test_request_context("/api/v1/notes/"):
+        sampler.begin("notes.list_notes")
+        sampler._sample()
+        sampler.end()
+    with app.test_request_context("/api/v1/notes/x"):
+        sampler.begin("notes.get_note")  # taux 0 (pas de "*") -> non suivi
+        sampler._sample()
+        sampler.end()
+    folded = client.get("/api/v1/admin/profiling/flamegraph?minutes=5", headers=admin).get_data(as_text=True)
+    lines = folded.strip().splitlines()
+    assert lines and all(line.startswith("notes.list_notes;") for line in lines)
+    assert "test_profile_single_request_and_sampling (test_profiling.py" in lines[0]
+    client.put("/api/v1/admin/profiling/sampling", headers=admin, json={"rates": {}})
+
+
+def test_profiled_body_is_streamed_not_buffered():
+    from app.profiling.profiler import MemoryProfileStore, ProfileTokens, ProfilingMiddleware
+
+    events = []
+
+    def wsgi_app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+
+        def body():
+            for i in range(3):
+                events.append(f"gen{i}")
+                yield b"x"
+        return body()
+
+    store, tokens = MemoryProfileStore(5, 10), ProfileTokens("secret", 60)
+    middleware = ProfilingMiddleware(wsgi_app, tokens, store, 60)
+    environ = {"HTTP_X_PROFILE": tokens.issue("admin-id", 60), "REQUEST_METHOD": "GET", "PATH_INFO": "/stream"}
+    headers = {}
+    body = middleware(environ, lambda status, h, exc_info=None: headers.update(h))
+    for _ in body:
+        events.append("sent")
+    assert events == ["gen0", "sent", "gen1", "sent", "gen2", "sent"]
+    # Profil en cours tant que le serveur n'a pas fermé le corps
+    assert store.list_profiles() == []
+    assert not isinstance(middleware(environ, lambda status, h, exc_info=None: None), type(body))
+    body.close()
+    body.close()
+    (meta,) = store.list_profiles()
+    assert meta["id"] == headers["X-Profile-Id"] and meta["status"] == "200 OK" and meta["path"] == "/stream"
+    stats = marshal.loads(store.get_profile(meta["id"])[1])
+    assert any(func[2] == "body" for func in stats)
+    # Verrou rendu à close()
+    assert isinstance(middleware(environ, lambda status, h, exc_info=None: None), type(body))
@@ -0,0 +1,45 @@
+# tests/test_routing.py
+import time
+from sqlalchemy import create_engine
+from app.common.routing import ReplicaRouter
+
+
+def test_replica_router_read_your_writes():
+    replica = create_engine("sqlite://")
+    router = ReplicaRouter([replica], window=0.2, max_lag=2, check_interval=60, sticky_uri="memory://",
+                           background=False)
+
+    # lag pas encore mesuré -> primaire; choose() ne mesure jamais lui-même
+    assert router.choose("u1") is None
+    assert router.replicas[0].checked_at == 0.0
+
+    # pas d'écriture récente -> réplica (lag mesuré à 0 hors Postgres)
+    router.refresh()
+    assert router.choose("u1") is replica
+
+    # après une écriture: primaire pendant la fenêtre, pour ce user seulement
+    router.mark_write("u1")
+    assert router.choose("u1") is None
+    assert router.choose("u2") is replica
+    time.sleep(0.25)
+    assert router.choose("u1") is replica
+
+    # réplica trop en retard -> écarté
+    router.replicas[0].lag = 10
+    assert router.choose("u2") is None
+
+
+
+def test_replica_router_never_connects_on_the_request_thread():
+    # Réplica injoignable: choose() répond tout de suite, la mesure se fait en fond
+    down = create_engine("postgresql+psycopg://u:p@127.0.0.1:1/db", connect_args={"connect_timeout": 3})
+    router = ReplicaRouter([down], window=0, max_lag=2, check_interval=60, sticky_uri=None)
+    started = time.monotonic()
+    assert router.choose("u1") is None
+    assert time.monotonic() - started < 0.5
+    assert router._thread.name == "replica-health"
+    deadline = time.monotonic() + 5
+    while router.replicas[0].checked_at == 0.0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert router.replicas[0].checked_at > 0 and router.replicas[0].lag is None
+    assert router.choose("u1") is None
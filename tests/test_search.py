@@ -0,0 +1,72 @@
+# tests/test_search.py
+def _token(client, email):
+    client.post("/api/v1/auth/register", json={"email": email, "password": "SuperSecret123"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "SuperSecret123"})
+    return r.get_json()["access_token"]
+
+def test_search_ranked_scoped_and_paginated(client):
+    erin = {"Authorization": f"Bearer {_token(client, 'erin@example.com')}"}
+    frank = {"Authorization": f"Bearer {_token(client, 'frank@example.com')}"}
+
+    client.post("/api/v1/notes/", headers=erin, json={"title": "Kafka tuning", "content": "consumer lag and kafka partitions"})
+    client.post("/api/v1/notes/", headers=erin, json={"title": "Groceries", "content": "buy milk, mention kafka book"})
+    client.post("/api/v1/notes/", headers=erin, json={"title": "Unrelated", "content": "nothing here"})
+    client.post("/api/v1/notes/", headers=frank, json={"title": "Kafka", "content": "frank's kafka note"})
+
+    r = client.get("/api/v1/notes/search?q=kafka&per_page=1", headers=erin)
+    assert r.status_code == 200
+    body = r.get_json()
+    first = body["data"][0]
+    # titre pondéré plus fort que le contenu
+    assert first["title"] == "Kafka tuning"
+    assert "<mark>" in first["highlight"]["title"]
+    assert body["meta"]["next_cursor"]
+
+    r = client.get(f"/api/v1/notes/search?q=kafka&per_page=1&cursor={body['meta']['next_cursor']}", headers=erin)
+    second = r.get_json()["data"]
+    assert [n["title"] for n in second] == ["Groceries"]
+    assert second[0]["rank"] <= first["rank"]
+    # Dernière page pleine: pas de curseur vers une page vide
+    assert r.get_json()["meta"]["next_cursor"] is None
+
+    # scoping propriétaire: les notes de frank n'apparaissent pas
+    r = client.get("/api/v1/notes/search?q=kafka&per_page=10", headers=erin)
+    assert {n["title"] for n in r.get_json()["data"]} == {"Kafka tuning", "Groceries"}
+
+    # Contenu échappé: seules les balises <mark> sont du HTML
+    client.post("/api/v1/notes/", headers=erin,
+                json={"title": "<img src=x onerror=alert(1)> xss", "content": "<script>alert('xss')</script>"})
+    hit = client.get("/api/v1/notes/search?q=xss", headers=erin).get_json()["data"][0]["highlight"]
+    assert hit["title"].endswith("onerror=alert(1)&gt; <mark>xss</mark>")
+    for text in hit.values():
+        assert "<" not in text.replace("<mark>", "").replace("</mark>", "")
+    assert "alert(&#x27;" in hit["content"]
+
+    assert client.get("/api/v1/notes/search", headers=erin).status_code == 400
+    assert client.get("/api/v1/notes/search?q=kafka&cursor=@@", headers=erin).status_code == 400
+
+
+def test_search_survives_notes_rowid_renumbering(client, app):
+    # SQLite: VACUUM peut renuméroter le rowid implicite de notes (PK UUID) sans passer par
+    # les triggers; simulé ici (trigger retiré le temps de l'UPDATE). La clé FTS n'en dépend pas.
+    from app.extensions import db
+    gina = {"Authorization": f"Bearer {_token(client, 'gina@example.com')}"}
+    ids = [client.post("/api/v1/notes/", headers=gina, json={"title": f"Vacuum {word}", "content": f"{word} zebra"})
+           .get_json()["id"] for word in ("alpha", "bravo", "charlie", "delta")]
+    client.delete(f"/api/v1/notes/{ids[0]}", headers=gina)
+    client.delete(f"/api/v1/notes/{ids[2]}", headers=gina)
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            with db.engine.begin() as conn:
+                trigger = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'notes_fts_au'").scalar()
+                conn.exec_driver_sql("DROP TRIGGER notes_fts_au")
+                conn.exec_driver_sql("UPDATE notes SET rowid = rowid + 1000")
+                conn.exec_driver_sql(trigger)
+    assert client.patch(f"/api/v1/notes/{ids[3]}", headers=gina, json={"content": "delta yak"}).status_code == 200
+
+    r = client.get("/api/v1/notes/search?q=delta", headers=gina)
+    assert [(n["id"], n["highlight"]["title"]) for n in r.get_json()["data"]] == \
+        [(ids[3], "Vacuum <mark>delta</mark>")]
+    r = client.get("/api/v1/notes/search?q=zebra", headers=gina)
+    assert [n["id"] for n in r.get_json()["data"]] == [ids[1]]
+    assert client.get("/api/v1/notes/search?q=charlie", headers=gina).get_json()["data"] == []
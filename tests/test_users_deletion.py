@@ -0,0 +1,61 @@
+# tests/test_users_deletion.py
+import os
+import uuid
+
+
+def test_soft_delete_then_batched_purge(client, app, monkeypatch):
+    from app.extensions import db
+    from app.users.models import User
+    from app.notes.models import Note, NoteChange, NoteStats
+
+    tokens = {}
+    for e in ("del-admin@example.com", "del-victim@example.com"):
+        r = client.post("/api/v1/auth/register", json={"email": e, "password": "SuperSecret123"})
+        tokens[e] = r.get_json()
+    with app.app_context():
+        User.query.filter_by(email="del-admin@example.com").first().role = "admin"
+        db.session.commit()
+    r = client.post("/api/v1/auth/login", json={"email": "del-admin@example.com", "password": "SuperSecret123"})
+    admin = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    victim = {"Authorization": f"Bearer {tokens['del-victim@example.com']['access_token']}"}
+    victim_refresh = {"Authorization": f"Bearer {tokens['del-victim@example.com']['refresh_token']}"}
+    victim_id = client.get("/api/v1/auth/me", headers=victim).get_json()["id"]
+
+    note_ids = [client.post("/api/v1/notes/", headers=victim, json={"title": f"n{i}", "content": "x"}).get_json()["id"]
+                for i in range(5)]
+    r = client.post(f"/api/v1/notes/{note_ids[0]}/attachments", headers=victim, json={"filename": "a", "size": 3})
+    client.put(r.headers["Location"], headers=victim, data=b"abc")
+    blob = app.extensions["blob_store"].local_path(f"{victim_id}/{note_ids[0]}/{r.get_json()['id']}")
+
+    assert client.delete(f"/api/v1/users/{victim_id}", headers=victim).status_code == 403
+    admin_id = client.get("/api/v1/auth/me", headers=admin).get_json()["id"]
+    assert client.delete(f"/api/v1/users/{admin_id}", headers=admin).status_code == 409
+    assert client.get(f"/api/v1/users/{victim_id}/deletion", headers=admin).status_code == 404
+
+    # Lots de 2 et tranche de 0 s: la purge se ré-empile à chaque lot (exécution eager)
+    monkeypatch.setitem(app.config, "USER_PURGE_BATCH_SIZE", 2)
+    monkeypatch.setitem(app.config, "USER_PURGE_PAUSE_MS", 0)
+    monkeypatch.setitem(app.config, "USER_PURGE_SLICE_SECONDS", 0)
+    r = client.delete(f"/api/v1/users/{victim_id}", headers=admin)
+    assert r.status_code == 202 and r.headers["Location"].endswith(f"/users/{victim_id}/deletion")
+
+    # Tokens existants refusés, login impossible
+    assert client.get("/api/v1/notes/", headers=victim).get_json()["error"]["code"] == "token_revoked"
+    assert client.post("/api/v1/auth/refresh", headers=victim_refresh).status_code == 401
+    assert client.post("/api/v1/auth/login", json={"email": "del-victim@example.com",
+                                                   "password": "SuperSecret123"}).status_code == 401
+
+    status = client.get(f"/api/v1/users/{victim_id}/deletion", headers=admin).get_json()["data"]
+    assert status["status"] == "done" and status["notes_total"] == status["notes_deleted"] == 5
+    assert status["progress"] == 1.0
+    uid = uuid.UUID(victim_id)
+    with app.app_context():
+        assert db.session.get(User, uid) is None
+        assert Note.query.filter_by(owner_id=uid).count() == 0
+        assert NoteChange.query.filter_by(owner_id=uid).count() == 0
+        assert db.session.get(NoteStats, uid) is None
+    assert not os.path.exists(blob)
+    # Relancer: idempotent; l'email est de nouveau libre
+    assert client.delete(f"/api/v1/users/{victim_id}", headers=admin).status_code == 202
+    assert client.post("/api/v1/auth/register", json={"email": "del-victim@example.com",
+                                                      "password": "SuperSecret123"}).status_code == 201
@@ -0,0 +1,36 @@
+# tests/test_users_import.py
+import json
+
+
+def test_users_import_cli(app, tmp_path):
+    from app.users.models import User
+
+    src = tmp_path / "users.ndjson"
+    src.write_text("\n".join([
+        json.dumps({"email": " Import1@Example.com ", "password": "SuperSecret123"}),
+        json.dumps({"email": "import2@example.com", "password": "short"}),          # rejet: mot de passe
+        "not json",                                                                   # rejet: json
+        json.dumps({"email": "import1@example.com", "password": "SuperSecret123"}),   # doublon (même lot)
+        json.dumps({"email": "import3@example.com", "password": "SuperSecret123", "role": "admin"}),
+    ]) + "\n")
+    rejects = tmp_path / "rejects.ndjson"
+    runner = app.test_cli_runner()
+
+    r = runner.invoke(args=["users", "import", str(src), "--workers", "1", "--batch-size", "2",
+                            "--rejects", str(rejects)])
+    assert r.exit_code == 0, r.output
+    assert "inserted=2" in r.output and "next_offset=5" in r.output
+
+    with app.app_context():
+        u1 = User.query.filter_by(email="import1@example.com").first()
+        assert u1.check_password("SuperSecret123")
+        assert User.query.filter_by(email="import3@example.com").first().role == "admin"
+
+    lines = [json.loads(line) for line in rejects.read_text().splitlines()]
+    assert [line["offset"] for line in lines] == [1, 2, 3]
+    assert all("password" not in line["record"] for line in lines)
+
+    # reprise: rien avant l'offset n'est relu, l'existant n'est pas re-haché
+    r = runner.invoke(args=["users", "import", str(src), "--workers", "1", "--offset", "4"])
+    assert r.exit_code == 0, r.output
+    assert "inserted=0 existing=1" in r.output
@@ -0,0 +1,30 @@
+# tests/test_warmup.py
+import uuid
+from datetime import datetime
+from app.common.db import fetch_all
+from app.common.warmup import warm_up
+from app.extensions import db
+from app.notes.queries import list_statements, FULL_FIELDS, SUMMARY_FIELDS
+
+
+def test_fetch_all_rows_match_sqlalchemy_results(client, app):
+    # Sous psycopg: chemin pipeline (curseur brut) -> mêmes valeurs typées que SQLAlchemy
+    r = client.post("/api/v1/auth/register", json={"email": "pipeline@example.com", "password": "SuperSecret123"})
+    headers = {"Authorization": f"Bearer {r.get_json()['access_token']}"}
+    for i in range(3):
+        client.post("/api/v1/notes/", headers=headers, json={"title": f"P{i}", "content": "pipeline"})
+    uid = uuid.UUID(client.get("/api/v1/auth/me", headers=headers).get_json()["id"])
+    with app.test_request_context():
+        for page, per_page, fields in ((1, 10, FULL_FIELDS), (2, 2, SUMMARY_FIELDS)):
+            statements = list_statements(uid, False, page, per_page, fields)
+            piped = fetch_all(*statements)
+            plain = [[dict(row) for row in db.session.execute(stmt).mappings()] for stmt in statements]
+            assert piped == plain and piped[0] == [{"total": 3}] and piped[1]
+            note = piped[1][0]
+            assert isinstance(note["id"], uuid.UUID) and note["owner_id"] == uid
+            assert isinstance(note["created_at"], datetime)
+        db.session.remove()
+
+
+def test_warm_up_runs_all_steps(app):
+    assert set(warm_up(app)) == {"sql", "schemas", "bcrypt"}
@@ -0,0 +1,13 @@
+import signal
+from app import create_app
+from app.jobs.worker import Worker
+
+# Consommateur de la file de jobs (JOBS_QUEUE_URI=redis://...): python worker.py
+app = create_app()
+
+if __name__ == "__main__":
+    worker = Worker(app)
+    # SIGTERM (docker stop) / Ctrl-C: on finit le job en cours puis on sort
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    worker.run()